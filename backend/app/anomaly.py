@@ -0,0 +1,289 @@
+"""
+Streaming anomaly detection against per-node adaptive baselines.
+
+Fixed thresholds (rules.py) fire all the time on nodes whose normal level
+is high and never on quiet ones. Here every (node, metric) keeps an
+exponentially weighted mean and variance, and each event is scored by its
+z-score against the baseline *before* it is folded in. With `season_s`
+set, each node keeps one baseline per phase bucket of the season (hour of
+day for 86400), so a daily cycle is not mistaken for an anomaly.
+
+- Only the harmful direction counts: high latency, loss, CPU and memory,
+  low throughput.
+- An alert opens after `consecutive` anomalous events in a row and
+  resolves after as many events back under `z_resolve`.
+- Deviations are clamped to `clamp_z` standard deviations before they are
+  folded in, so an incident does not become the new baseline while it lasts.
+- State per node is one flat list of floats, so an update is O(1) and a few
+  microseconds. A background thread checkpoints the arrays of nodes
+  updated since the last pass to the anomaly_baselines table, so a
+  restart resumes without a history scan.
+"""
+import logging
+import math
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from simulator.models import TelemetryEvent
+from . import crud, metrics, pubsub
+from .db_models import AlertRow, AnomalyBaselineRow
+from .settings import AnomalyConfig
+
+log = logging.getLogger(__name__)
+
+# metric, +1 = high is bad / -1 = low is bad
+METRICS: Tuple[Tuple[str, int], ...] = (
+    ("latency_ms", 1),
+    ("packet_loss", 1),
+    ("throughput_mbps", -1),
+    ("cpu_pct", 1),
+    ("mem_pct", 1),
+)
+
+RULE_PREFIX = "anomaly_"
+
+@dataclass
+class Transition:
+    kind: str  # "open" | "resolve"
+    node: str
+    metric: str
+    value: float
+    z: float
+    mean: float
+
+class AnomalyDetector:
+    """
+    Per-node state layout, for B buckets and M metrics:
+    B x [count, mean_0, var_0, ..., mean_M-1, var_M-1], then M streaks
+    (+k anomalous / -k normal events in a row).
+    """
+
+    def __init__(self, cfg: AnomalyConfig):
+        self.cfg = cfg
+        self.alpha = 1.0 - 0.5 ** (1.0 / cfg.half_life_events)
+        self.buckets = cfg.season_buckets if cfg.season_s else 1
+        self._bucket_s = cfg.season_s / self.buckets if cfg.season_s else 0.0
+        self._stride = 1 + 2 * len(METRICS)
+        self._size = self.buckets * self._stride + len(METRICS)
+        self._floors = [cfg.min_std.get(m, 1e-9) for m, _ in METRICS]
+        # zipped once: (name, sign, floor, mean offset, streak offset)
+        self._plan = [
+            (name, sign, self._floors[i], 1 + 2 * i, self.buckets * self._stride + i)
+            for i, (name, sign) in enumerate(METRICS)
+        ]
+        self.layout = f"v1:{cfg.season_s or 0}:{self.buckets}:" + ",".join(m for m, _ in METRICS)
+        # lists, not array("d"): element access is about twice as fast
+        self._state: Dict[str, list] = {}
+        self._open: Dict[Tuple[str, str], int] = {}  # (node, metric) -> alert id
+        self._dirty: set = set()
+        self._lock = threading.Lock()
+        # guards _state and _dirty; separate from _lock, which is held across alert writes,
+        # so concurrent ingest threads only wait for a few-microsecond update
+        self._state_lock = threading.Lock()
+
+    def _bucket(self, ts: int) -> int:
+        if not self._bucket_s:
+            return 0
+        return int((ts % self.cfg.season_s) // self._bucket_s)
+
+    # ---- scoring ----------------------------------------------------------
+
+    def update(self, event: TelemetryEvent) -> List[Transition]:
+        """Score `event`, fold it into the node's baselines and return open/resolve transitions."""
+        with self._state_lock:
+            return self._update(event)
+
+    def _update(self, event: TelemetryEvent) -> List[Transition]:
+        node = event.node
+        st = self._state.get(node)
+        if st is None:
+            st = self._state[node] = [0.0] * self._size
+        self._dirty.add(node)
+        values = event.__dict__
+        b = self._bucket(event.timestamp) * self._stride
+
+        cfg = self.cfg
+        n = st[b] + 1
+        st[b] = n
+        if n == 1:
+            for name, _, _, j, _ in self._plan:
+                st[b + j] = values[name]
+            return []
+        # plain running mean/variance until the EWMA has enough history
+        a = self.alpha if n > cfg.warmup_events else max(self.alpha, 1.0 / n)
+        scoring = n > cfg.warmup_events
+        z_open, z_resolve, k, clamp = cfg.z_open, cfg.z_resolve, cfg.consecutive, cfg.clamp_z
+        out: List[Transition] = []
+
+        for name, sign, floor, j, si in self._plan:
+            x = values[name]
+            mean = st[b + j]
+            var = st[b + j + 1]
+            std = math.sqrt(var)
+            if std < floor:
+                std = floor
+            d = x - mean
+
+            if scoring:
+                z = sign * d / std
+                streak = st[si]
+                if z >= z_open:
+                    streak = streak + 1 if streak > 0 else 1
+                    if streak == k and (node, name) not in self._open:
+                        out.append(Transition("open", node, name, x, z, mean))
+                elif z <= z_resolve:
+                    streak = streak - 1 if streak < 0 else -1
+                    if streak == -k and (node, name) in self._open:
+                        out.append(Transition("resolve", node, name, x, z, mean))
+                else:
+                    streak = 0
+                st[si] = streak
+
+            lim = clamp * std
+            if d > lim:
+                d = lim
+            elif d < -lim:
+                d = -lim
+            st[b + j] = mean + a * d
+            st[b + j + 1] = (1.0 - a) * (var + a * d * d)
+        return out
+
+    def baseline(self, node: str, metric: str, ts: int = 0) -> Optional[Tuple[float, float]]:
+        """(mean, std) of one node and metric in the bucket of `ts`, or None before any event."""
+        b = self._bucket(ts) * self._stride
+        j = 1 + 2 * [m for m, _ in METRICS].index(metric)
+        with self._state_lock:
+            st = self._state.get(node)
+            if st is None:
+                return None
+            return st[b + j], math.sqrt(st[b + j + 1])
+
+    # ---- alerts -----------------------------------------------------------
+
+    def observe(self, db: Session, event: TelemetryEvent) -> List[AlertRow]:
+        """update() plus the alert writes; returns alerts opened by this event."""
+        opened: List[AlertRow] = []
+        for t in self.update(event):
+            rule_id = RULE_PREFIX + t.metric
+            key = (t.node, t.metric)
+            with self._lock:
+                if t.kind == "open":
+                    if key in self._open:
+                        continue
+                    severity = "CRITICAL" if t.z >= self.cfg.z_critical else "WARN"
+                    message = f"Anomalous {t.metric}: {t.value:.4g} vs baseline {t.mean:.4g} (z={t.z:.1f})"
+                    row = crud.create_alert(db, t.node, rule_id, severity, message)
+                    self._open[key] = row.id
+                else:
+                    if self._open.pop(key, None) is None:
+                        continue
+                    resolved = crud.resolve_active_alerts(db, t.node, rule_id)
+                    row = None
+            if row is not None:
+                metrics.alerts.inc((rule_id, "opened"))
+                pubsub.broker.publish_alert("opened", pubsub.alert_payload(row))
+                opened.append(row)
+            else:
+                metrics.alerts.inc((rule_id, "resolved"))
+                for r in resolved:
+                    pubsub.broker.publish_alert("resolved", pubsub.alert_payload(r))
+        return opened
+
+    def forget(self, alert: AlertRow) -> None:
+        """Drop open state for an anomaly alert resolved via the API."""
+        if alert.rule_id.startswith(RULE_PREFIX):
+            key = (alert.node, alert.rule_id[len(RULE_PREFIX):])
+            with self._lock:
+                if self._open.get(key) == alert.id:
+                    del self._open[key]
+
+    # ---- checkpoints ------------------------------------------------------
+
+    def warm(self, db: Session) -> int:
+        """Load checkpointed baselines and open anomaly alerts; returns the number of nodes restored."""
+        state: Dict[str, list] = {}
+        for r in db.execute(select(AnomalyBaselineRow).where(AnomalyBaselineRow.layout == self.layout)).scalars():
+            st = array("d")
+            st.frombytes(r.state)
+            if len(st) == self._size:
+                state[r.node] = st.tolist()
+        open_ = {
+            (r.node, r.rule_id[len(RULE_PREFIX):]): r.id
+            for r in crud.active_alerts(db)
+            if r.rule_id.startswith(RULE_PREFIX)
+        }
+        with self._lock:
+            self._open = open_
+        with self._state_lock:
+            self._state = state
+            self._dirty = set()
+        return len(state)
+
+    def checkpoint(self, db: Session) -> int:
+        """Upsert the state of nodes updated since the last checkpoint; returns rows written."""
+        now = int(time.time())
+        rows = []
+        with self._state_lock:
+            dirty, self._dirty = self._dirty, set()
+            for node in dirty:
+                st = self._state.get(node)
+                if st is not None:
+                    # packed copy, taken between updates; ingest threads keep updating the list
+                    rows.append({"node": node, "layout": self.layout, "state": array("d", st).tobytes(), "updated_ts": now})
+        if not rows:
+            return 0
+        stmt = sqlite_insert(AnomalyBaselineRow.__table__)
+        ex = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["node"],
+            set_={"layout": ex.layout, "state": ex.state, "updated_ts": ex.updated_ts},
+        )
+        db.execute(stmt, rows)
+        db.commit()
+        return len(rows)
+
+    def open_count(self) -> int:
+        return len(self._open)
+
+class BaselineCheckpointer:
+    """Runs AnomalyDetector.checkpoint every `interval_s` on a daemon thread, and once more on stop."""
+
+    def __init__(self, session_factory: Callable[[], Session], detector: AnomalyDetector, interval_s: float):
+        self.session_factory = session_factory
+        self.detector = detector
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_rows = 0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="anomaly-checkpoint", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_s: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout_s)
+            self._thread = None
+        self._checkpoint()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self._checkpoint()
+
+    def _checkpoint(self) -> None:
+        try:
+            with self.session_factory() as db:
+                self.last_rows = self.detector.checkpoint(db)
+        except Exception:
+            log.exception("anomaly baseline checkpoint failed")
@@ -1,45 +1,123 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, insert, tuple_
 from sqlalchemy import and_
 from sqlalchemy import func
-from typing import Optional, List
+from typing import NamedTuple, Optional, List, Sequence, Tuple
 import time
 
 from simulator.models import TelemetryEvent
 from .db_models import TelemetryEventRow, AlertRow
 from .alert_models import AlertOut
 from .stats_models import NodeStats
+from . import retention, rollups, segments, shards, sketches
+from .export import COLUMNS
+from .pagination import encode_cursor
 
-def insert_event(db: Session, event: TelemetryEvent) -> TelemetryEventRow:
+def insert_event(db: Session, event: TelemetryEvent) -> Optional[TelemetryEventRow]:
+    store = _sharded(db)
+    if store is not None:
+        store.insert_events([event])
+        return None
+    if segments.active_store is not None:
+        segments.active_store.insert_events([event])
+        return None
     row = TelemetryEventRow(**event.model_dump())
     db.add(row)
+    if rollups.enabled:
+        rollups.apply_rollups(db, [event])
+    if sketches.enabled:
+        sketches.apply_sketches(db, [event])
     db.commit()
     db.refresh(row)
     return row
 
+def insert_events(db: Session, events: List[TelemetryEvent]) -> int:
+    """
+    Bulk insert a batch of already-validated events in a single transaction.
+    Uses one executemany INSERT instead of add/commit/refresh per row.
+    """
+    if not events:
+        return 0
+    store = _sharded(db)
+    if store is not None:
+        return store.insert_events(events)
+    if segments.active_store is not None:
+        return segments.active_store.insert_events(events)
+    db.execute(insert(TelemetryEventRow), [e.model_dump() for e in events])
+    if rollups.enabled:
+        rollups.apply_rollups(db, events)
+    if sketches.enabled:
+        sketches.apply_sketches(db, events)
+    db.commit()
+    return len(events)
+
+def _sharded(db: Session) -> Optional["shards.ShardedStore"]:
+    """The sharded store, unless `db` already is a session on one of its shards."""
+    store = shards.active_store
+    if store is None or "shard" in db.info:
+        return None
+    return store
+
+_COLS = tuple(getattr(TelemetryEventRow, c) for c in COLUMNS)
+
+def _as_tuple(event: TelemetryEvent) -> tuple:
+    return tuple(getattr(event, c) for c in COLUMNS)
+
+def _event(row: Sequence) -> TelemetryEvent:
+    return TelemetryEvent.model_validate(dict(zip(COLUMNS, row)))
+
 def get_latest(db: Session, node: Optional[str] = None) -> Optional[TelemetryEventRow]:
+    store = _sharded(db)
+    if store is not None:
+        return store.get_latest(node)
+    if segments.active_store is not None:
+        return segments.active_store.get_latest(node)
+    h = retention.current_horizons()
     stmt = select(TelemetryEventRow)
     if node:
         stmt = stmt.where(TelemetryEventRow.node == node)
+    if h is not None:
+        stmt = stmt.where(TelemetryEventRow.timestamp >= h.raw)
     
     stmt = stmt.order_by(desc(TelemetryEventRow.timestamp), desc(TelemetryEventRow.id)).limit(1)
 
     row = db.execute(stmt).scalars().first()
+    if row is None and h is not None:
+        # node quiet for longer than raw retention: newest downsampled bucket
+        older = retention.tier_events(db, h, [node] if node else None, None, None, 1)
+        return older[0][0] if older else None
     return TelemetryEvent.model_validate(row.__dict__) if row else None
 
 
 def get_history(db: Session, node: str, limit: int=100) -> List[TelemetryEventRow]:
-    stmt =(
-        select(TelemetryEventRow)
-        .where(TelemetryEventRow.node == node)
-        .order_by(desc(TelemetryEventRow.timestamp), desc(TelemetryEventRow.id))
+    if segments.active_store is not None:
+        return segments.active_store.get_history(node, limit=limit)
+    return [_event(r) for r in get_history_rows(db, node, limit)]
+
+def get_history_rows(db: Session, node: str, limit: int = 100) -> List[tuple]:
+    """get_history as plain COLUMNS tuples oldest->newest, without building models."""
+    store = _sharded(db)
+    if store is not None:
+        return store.get_history_rows(node, limit)
+    if segments.active_store is not None:
+        return [_as_tuple(e) for e in segments.active_store.get_history(node, limit=limit)]
+    h = retention.current_horizons()
+    T = TelemetryEventRow
+    stmt = (
+        select(*_COLS)
+        .where(T.node == node)
+        .order_by(desc(T.timestamp), desc(T.id))
         .limit(limit)
     )
+    if h is not None:
+        stmt = stmt.where(T.timestamp >= h.raw)
 
-    rows = db.execute(stmt).scalars().all()
+    rows = [tuple(r) for r in db.execute(stmt)]
+    if h is not None and len(rows) < limit:
+        rows += [_as_tuple(e) for e, _ in retention.tier_events(db, h, [node], None, None, limit - len(rows))]
     #reverse so oldest->newest in the response
-    rows = list(reversed(rows))
-    return [TelemetryEvent.model_validate(row.__dict__) for row in rows]
+    rows.reverse()
+    return rows
 
 def query_events(
     db: Session,
@@ -49,30 +127,136 @@ def query_events(
     limit: int = 200,
     offset: int = 0,
 ) -> List[TelemetryEvent]:
-    stmt = select(TelemetryEventRow)
+    events, _ = query_events_page(db, nodes=nodes, start_ts=start_ts, end_ts=end_ts, limit=limit, offset=offset)
+    return events
+
+def query_events_page(
+    db: Session,
+    nodes: Optional[List[str]] = None,
+    start_ts: Optional[int] = None,
+    end_ts: Optional[int] = None,
+    limit: int = 200,
+    offset: int = 0,
+    after: Optional[Tuple[int, int]] = None,
+) -> Tuple[List[TelemetryEvent], Optional[str]]:
+    """
+    One page of events newest->oldest plus the cursor for the next page
+    (None when this page is the last). `after` is a decoded cursor: the
+    (timestamp, id) of the previous page's last row.
+    """
+    if segments.active_store is not None:
+        return segments.active_store.query_events_page(nodes, start_ts, end_ts, limit, offset, after)
+    rows, next_cursor = query_event_rows_page(db, nodes, start_ts, end_ts, limit, offset, after)
+    return [_event(r) for r in rows], next_cursor
+
+def query_event_rows_page(
+    db: Session,
+    nodes: Optional[List[str]] = None,
+    start_ts: Optional[int] = None,
+    end_ts: Optional[int] = None,
+    limit: int = 200,
+    offset: int = 0,
+    after: Optional[Tuple[int, int]] = None,
+) -> Tuple[List[tuple], Optional[str]]:
+    """query_events_page as plain COLUMNS tuples, without building models."""
+    store = _sharded(db)
+    if store is not None:
+        return store.query_event_rows_page(nodes, start_ts, end_ts, limit, offset, after)
+    if segments.active_store is not None:
+        events, next_cursor = segments.active_store.query_events_page(nodes, start_ts, end_ts, limit, offset, after)
+        return [_as_tuple(e) for e in events], next_cursor
+
+    h = retention.current_horizons()
+    if h is not None and after is not None and after[0] < h.raw:
+        # cursor already points into the downsampled tiers
+        events, next_cursor = _tier_events_page(db, h, nodes, start_ts, end_ts, limit, offset, after)
+        return [_as_tuple(e) for e in events], next_cursor
+
+    T = TelemetryEventRow
+    stmt = select(*_COLS, T.id)
 
     if nodes:
-        stmt = stmt.where(TelemetryEventRow.node.in_(nodes))
+        stmt = stmt.where(T.node.in_(nodes))
     if start_ts is not None:
-        stmt = stmt.where(TelemetryEventRow.timestamp >= start_ts)
+        stmt = stmt.where(T.timestamp >= start_ts)
     if end_ts is not None:
-        stmt = stmt.where(TelemetryEventRow.timestamp <= end_ts)
+        stmt = stmt.where(T.timestamp <= end_ts)
+    if h is not None:
+        stmt = stmt.where(T.timestamp >= h.raw)
+    if after is not None:
+        # row-value comparison lets SQLite seek ix_node_timestamp / the timestamp index
+        stmt = stmt.where(tuple_(T.timestamp, T.id) < tuple_(*after))
 
     stmt = (
-        stmt.order_by(desc(TelemetryEventRow.timestamp), desc(TelemetryEventRow.id))
+        stmt.order_by(desc(T.timestamp), desc(T.id))
         .limit(limit)
         .offset(offset)
     )
 
-    rows = db.execute(stmt).scalars().all()
+    rows = db.execute(stmt).all()
+    next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id) if len(rows) == limit else None
     # Return newest->oldest (monitoring-style). If you want oldest->newest, reverse.
-    return [TelemetryEvent.model_validate(r.__dict__) for r in rows]
+    out = [tuple(r)[:-1] for r in rows]
+    if h is None or len(rows) == limit:
+        return out, next_cursor
+
+    # raw rows ran out inside the range: continue with downsampled buckets
+    if offset and not rows:
+        raw_total = db.execute(select(func.count()).select_from(stmt.limit(None).offset(None).subquery())).scalar()
+        offset -= raw_total
+    else:
+        offset = 0
+    older, next_cursor = _tier_events_page(db, h, nodes, start_ts, end_ts, limit - len(rows), offset, None)
+    return out + [_as_tuple(e) for e in older], next_cursor
+
+def _tier_events_page(
+    db: Session,
+    h: retention.Horizons,
+    nodes: Optional[List[str]],
+    start_ts: Optional[int],
+    end_ts: Optional[int],
+    limit: int,
+    offset: int,
+    after: Optional[Tuple[int, int]],
+) -> Tuple[List[TelemetryEvent], Optional[str]]:
+    # downsampled rows are keyed (bucket_ts, rollup rowid) in cursors
+    older = retention.tier_events(db, h, nodes, start_ts, end_ts, limit + offset, after)[offset:]
+    next_cursor = None
+    if len(older) == limit:
+        last, rowid = older[-1]
+        next_cursor = encode_cursor(last.timestamp, rowid)
+    return [e for e, _ in older], next_cursor
 
 def get_node_stats(
     db: Session,
     nodes: Optional[List[str]] = None,
     start_ts: Optional[int] = None,
     end_ts: Optional[int] = None,
+) -> List[NodeStats]:
+    if segments.active_store is not None:
+        return segments.active_store.get_node_stats(nodes, start_ts, end_ts, percentiles=sketches.enabled)
+    store = _sharded(db)
+    if store is not None:
+        return store.get_node_stats(nodes, start_ts, end_ts)
+
+    h = retention.current_horizons()
+    if h is not None:
+        # raw rows past the horizon are gone: each part of the range from its own tier
+        out = rollups.node_stats(db, nodes, start_ts, end_ts, zones=retention.zones(h, start_ts, end_ts))
+    elif rollups.enabled and start_ts is not None and end_ts is not None:
+        # bounded range: answer from the coarsest rollups, raw rows only at the edges
+        out = rollups.node_stats(db, nodes, start_ts, end_ts)
+    else:
+        out = _raw_node_stats(db, nodes, start_ts, end_ts)
+    if sketches.enabled:
+        sketches.attach_percentiles(db, out, nodes, start_ts, end_ts)
+    return out
+
+def _raw_node_stats(
+    db: Session,
+    nodes: Optional[List[str]],
+    start_ts: Optional[int],
+    end_ts: Optional[int],
 ) -> List[NodeStats]:
     stmt = select(
         TelemetryEventRow.node.label("node"),
@@ -117,6 +301,9 @@ def create_alert(
     severity: str,
     message: str,
 ) -> AlertRow:
+    store = _sharded(db)
+    if store is not None:
+        return store.create_alert(node, rule_id, severity, message)
     row = AlertRow(
         node=node,
         rule_id=rule_id,
@@ -132,6 +319,9 @@ def create_alert(
     return row
 
 def get_active_alert(db: Session, node: str, rule_id: str) -> Optional[AlertRow]:
+    store = _sharded(db)
+    if store is not None:
+        return store.get_active_alert(node, rule_id)
     stmt = (
         select(AlertRow)
         .where(AlertRow.node == node, AlertRow.rule_id == rule_id, AlertRow.is_active == True)  # noqa: E712
@@ -141,6 +331,9 @@ def get_active_alert(db: Session, node: str, rule_id: str) -> Optional[AlertRow]
     return db.execute(stmt).scalars().first()
 
 def resolve_alert(db: Session, alert_id: int) -> Optional[AlertRow]:
+    store = _sharded(db)
+    if store is not None:
+        return store.resolve_alert(alert_id)
     row = db.get(AlertRow, alert_id)
     if not row:
         return None
@@ -150,6 +343,41 @@ def resolve_alert(db: Session, alert_id: int) -> Optional[AlertRow]:
     db.refresh(row)
     return row
 
+def resolve_active_alerts(db: Session, node: str, rule_id: str) -> List[AlertRow]:
+    """Resolve every open alert for (node, rule_id); returns the resolved rows."""
+    store = _sharded(db)
+    if store is not None:
+        return store.resolve_active_alerts(node, rule_id)
+    rows = db.scalars(
+        select(AlertRow).where(AlertRow.node == node, AlertRow.rule_id == rule_id, AlertRow.is_active == True)  # noqa: E712
+    ).all()
+    now = _now_ts()
+    for row in rows:
+        row.is_active = False
+        row.resolved_ts = now
+    db.commit()
+    for row in rows:
+        db.refresh(row)
+    return list(rows)
+
+class ActiveAlert(NamedTuple):
+    id: int
+    node: str
+    rule_id: str
+    created_ts: int
+
+def active_alerts(db: Session) -> List[ActiveAlert]:
+    """Every open alert, oldest first (so the newest per node/rule wins when building a dict)."""
+    store = _sharded(db)
+    if store is not None:
+        return store.active_alerts()
+    stmt = (
+        select(AlertRow.id, AlertRow.node, AlertRow.rule_id, AlertRow.created_ts)
+        .where(AlertRow.is_active == True)  # noqa: E712
+        .order_by(AlertRow.created_ts, AlertRow.id)
+    )
+    return [ActiveAlert(*r) for r in db.execute(stmt)]
+
 def list_alerts(
     db: Session,
     node: Optional[str] = None,
@@ -157,15 +385,33 @@ def list_alerts(
     limit: int = 200,
     offset: int = 0,
 ) -> list[AlertOut]:
+    alerts, _ = list_alerts_page(db, node=node, is_active=is_active, limit=limit, offset=offset)
+    return alerts
+
+def list_alerts_page(
+    db: Session,
+    node: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    limit: int = 200,
+    offset: int = 0,
+    after: Optional[Tuple[int, int]] = None,
+) -> Tuple[list[AlertOut], Optional[str]]:
+    """Like query_events_page, keyed on (created_ts, id)."""
+    store = _sharded(db)
+    if store is not None:
+        return store.list_alerts_page(node, is_active, limit, offset, after)
     stmt = select(AlertRow)
 
     if node:
         stmt = stmt.where(AlertRow.node == node)
     if is_active is not None:
         stmt = stmt.where(AlertRow.is_active == is_active)
+    if after is not None:
+        stmt = stmt.where(tuple_(AlertRow.created_ts, AlertRow.id) < tuple_(*after))
 
     stmt = stmt.order_by(desc(AlertRow.created_ts), desc(AlertRow.id)).limit(limit).offset(offset)
     rows = db.execute(stmt).scalars().all()
+    next_cursor = encode_cursor(rows[-1].created_ts, rows[-1].id) if len(rows) == limit else None
 
     return [
         AlertOut(
@@ -179,4 +425,4 @@ def list_alerts(
             is_active=r.is_active,
         )
         for r in rows
-    ]
+    ], next_cursor
@@ -1,7 +1,8 @@
+import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-DB_URL = "sqlite:///./telemetry.db"
+DB_URL = os.environ.get("TELEMETRY_DB_URL", "sqlite:///./telemetry.db")
 
 engine = create_engine(
     DB_URL,
@@ -11,9 +12,43 @@ engine = create_engine(
 
 SessionLocal= sessionmaker(bind=engine, autoflush=False,autocommit=False,future=True)
 
+# statement/commit timings and pool usage for /metrics
+from . import metrics  # noqa: E402
+metrics.instrument_engine(engine)
+metrics.instrument_sessions(SessionLocal)
+metrics.pool_gauges(engine)
+
 Base = declarative_base()
 
-def init_db() -> None:
+def init_db(bind=None) -> None:
+    """Create missing tables on `bind` (default: the main engine)."""
     #import models so tables are registered before create all
     from . import db_models #noqa: F401
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    bind = bind if bind is not None else engine
+    if bind.dialect.name == "sqlite":
+        with bind.connect() as conn:
+            # auto_vacuum can only be switched on before the first table exists;
+            # retention compaction relies on it to hand freed pages back
+            if conn.exec_driver_sql("SELECT count(*) FROM sqlite_master").scalar() == 0:
+                conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+    Base.metadata.create_all(bind=bind)
+    _add_missing_columns(bind)
+
+def _add_missing_columns(bind) -> None:
+    """
+    create_all never alters existing tables; add nullable columns that were
+    introduced after a table first shipped so older databases keep working.
+    """
+    from sqlalchemy import inspect
+    from sqlalchemy.schema import CreateColumn
+
+    insp = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not insp.has_table(table.name):
+                continue
+            existing = {c["name"] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name not in existing and col.nullable:
+                    ddl = CreateColumn(col).compile(dialect=bind.dialect)
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, Index
+from sqlalchemy import Column, Integer, Float, String, Index, LargeBinary
 from sqlalchemy import Boolean
 from .db import Base
 
@@ -31,8 +31,82 @@ class AlertRow(Base):
     message = Column(String, nullable=False)
 
     created_ts = Column(Integer, index=True, nullable=False)
-    resolved_ts = Column(Boolean, default=False, nullable=False)
+    resolved_ts = Column(Integer, nullable=True)
 
     is_active = Column(Boolean, index=True, nullable=False,default=True)
 
 Index("ix_alert_node_rule_active", AlertRow.node, AlertRow.rule_id, AlertRow.is_active)
+
+class TelemetryRollupRow(Base):
+    """
+    Pre-aggregated telemetry per (resolution, node, bucket). Sums carry a
+    Neumaier compensation term so merged averages don't drift from the
+    raw aggregate over long windows.
+    """
+    __tablename__ = "telemetry_rollups"
+
+    resolution_s = Column(Integer, primary_key=True)  # 60, 300 or 3600
+    node = Column(String, primary_key=True)
+    bucket_ts = Column(Integer, primary_key=True)  # bucket start, multiple of resolution_s
+
+    count = Column(Integer, nullable=False)
+
+    latency_sum = Column(Float, nullable=False)
+    latency_comp = Column(Float, nullable=False, default=0.0)
+    latency_min = Column(Float, nullable=False)
+    latency_max = Column(Float, nullable=False)
+
+    packet_loss_sum = Column(Float, nullable=False)
+    packet_loss_comp = Column(Float, nullable=False, default=0.0)
+    throughput_sum = Column(Float, nullable=False)
+    throughput_comp = Column(Float, nullable=False, default=0.0)
+    cpu_sum = Column(Float, nullable=False)
+    cpu_comp = Column(Float, nullable=False, default=0.0)
+    mem_sum = Column(Float, nullable=False)
+    mem_comp = Column(Float, nullable=False, default=0.0)
+
+    # added after the table shipped: NULL on buckets rolled up before that
+    packet_loss_min = Column(Float, nullable=True)
+    packet_loss_max = Column(Float, nullable=True)
+    throughput_min = Column(Float, nullable=True)
+    throughput_max = Column(Float, nullable=True)
+    cpu_min = Column(Float, nullable=True)
+    cpu_max = Column(Float, nullable=True)
+    mem_min = Column(Float, nullable=True)
+    mem_max = Column(Float, nullable=True)
+    worst_status = Column(Integer, nullable=True)  # max severity in the bucket: 0 OK, 1 WARN, 2 CRITICAL
+
+    first_ts = Column(Integer, nullable=False)
+    last_ts = Column(Integer, nullable=False)
+
+Index("ix_rollup_res_bucket", TelemetryRollupRow.resolution_s, TelemetryRollupRow.bucket_ts)
+
+class TelemetrySketchRow(Base):
+    """Serialized DDSketch per (node, 1-minute bucket, metric), see sketches.py."""
+    __tablename__ = "telemetry_sketches"
+
+    node = Column(String, primary_key=True)
+    bucket_ts = Column(Integer, primary_key=True)
+    metric = Column(String, primary_key=True)  # latency_ms | packet_loss | throughput_mbps
+    sketch = Column(LargeBinary, nullable=False)
+
+Index("ix_sketch_bucket", TelemetrySketchRow.bucket_ts)
+
+class AnomalyBaselineRow(Base):
+    """Checkpointed detector state for one node: a packed float64 array, see anomaly.py."""
+    __tablename__ = "anomaly_baselines"
+
+    node = Column(String, primary_key=True)
+    layout = Column(String, nullable=False)  # state is discarded on load when the layout changed
+    state = Column(LargeBinary, nullable=False)
+    updated_ts = Column(Integer, nullable=False)
+
+class ImportCheckpointRow(Base):
+    """How far importer.py got through a JSONL source, committed with the rows it covers."""
+    __tablename__ = "import_checkpoints"
+
+    source = Column(String, primary_key=True)  # absolute path of the file
+    offset = Column(Integer, nullable=False)  # uncompressed bytes consumed
+    rows = Column(Integer, nullable=False)
+    rejected = Column(Integer, nullable=False)
+    updated_ts = Column(Integer, nullable=False)
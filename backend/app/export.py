@@ -0,0 +1,121 @@
+"""
+Streaming bulk export of telemetry ranges.
+
+Rows are read with a streaming cursor in fixed-size chunks straight from
+SQLAlchemy Core (no ORM objects, no pydantic re-validation) and encoded
+chunk by chunk, so memory stays constant regardless of the range size.
+"""
+import csv
+import io
+import json
+import zlib
+from typing import Callable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+# defined before the imports below: crud and shards import it back from here
+COLUMNS = ("node", "latency_ms", "packet_loss", "throughput_mbps", "cpu_pct", "mem_pct", "timestamp", "status")
+
+from . import segments, shards  # noqa: E402
+from .db_models import TelemetryEventRow  # noqa: E402
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+def iter_chunks(
+    session_factory: Callable[[], Session],
+    nodes: Optional[List[str]] = None,
+    start_ts: Optional[int] = None,
+    end_ts: Optional[int] = None,
+    chunk_size: int = 5000,
+) -> Iterator[Sequence[tuple]]:
+    """Yield lists of column tuples oldest->newest, `chunk_size` rows at a time."""
+    if segments.active_store is not None:
+        yield from segments.active_store.iter_chunks(nodes, start_ts, end_ts, chunk_size)
+        return
+    if shards.active_store is not None:
+        yield from shards.active_store.iter_chunks(nodes, start_ts, end_ts, chunk_size)
+        return
+
+    T = TelemetryEventRow
+    stmt = select(*[getattr(T, c) for c in COLUMNS])
+    if nodes:
+        stmt = stmt.where(T.node.in_(nodes))
+    if start_ts is not None:
+        stmt = stmt.where(T.timestamp >= start_ts)
+    if end_ts is not None:
+        stmt = stmt.where(T.timestamp <= end_ts)
+    stmt = stmt.order_by(T.timestamp, T.id)
+
+    # own session: the request-scoped one may be closed before the body is streamed
+    with session_factory() as db:
+        result = db.execute(stmt, execution_options={"stream_results": True, "yield_per": chunk_size})
+        for part in result.partitions(chunk_size):
+            yield [tuple(r) for r in part]
+
+def encode_ndjson(chunks: Iterator[Sequence[tuple]]) -> Iterator[bytes]:
+    dumps = json.JSONEncoder(separators=(",", ":")).encode
+    for rows in chunks:
+        yield "".join(dumps(dict(zip(COLUMNS, r))) + "\n" for r in rows).encode("utf-8")
+
+def encode_csv(chunks: Iterator[Sequence[tuple]]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(COLUMNS)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+def arrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def encode_arrow(chunks: Iterator[Sequence[tuple]]) -> Iterator[bytes]:
+    """Arrow IPC stream, one record batch per chunk. Needs the optional pyarrow dependency."""
+    import pyarrow as pa
+
+    schema = pa.schema([
+        ("node", pa.string()),
+        ("latency_ms", pa.float64()),
+        ("packet_loss", pa.float64()),
+        ("throughput_mbps", pa.float64()),
+        ("cpu_pct", pa.float64()),
+        ("mem_pct", pa.float64()),
+        ("timestamp", pa.int64()),
+        ("status", pa.string()),
+    ])
+    buf = io.BytesIO()
+
+    def drain() -> bytes:
+        data = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return data
+
+    writer = pa.ipc.new_stream(buf, schema)
+    for rows in chunks:
+        columns = list(zip(*rows))
+        arrays = [pa.array(col, type=field.type) for col, field in zip(columns, schema)]
+        writer.write_batch(pa.record_batch(arrays, schema=schema))
+        yield drain()
+    writer.close()
+    yield drain()
+
+def gzip_stream(parts: Iterator[bytes], level: int = 6) -> Iterator[bytes]:
+    comp = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for part in parts:
+        out = comp.compress(part)
+        if out:
+            yield out
+    yield comp.flush()
@@ -0,0 +1,43 @@
+"""
+JSON bodies for the hot read endpoints (/events, /history).
+
+Rows come straight from SQLAlchemy Core as column tuples and are encoded
+into the response body here, skipping ORM entities, per-row pydantic models
+and FastAPI's response_model re-validation. The body keeps the
+TelemetryEvent schema. orjson is used when installed; the stdlib encoder is
+the fallback.
+"""
+from typing import Iterable, List, Sequence
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from simulator.models import TelemetryEvent
+from .export import COLUMNS
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+    import json
+
+_events_adapter = TypeAdapter(List[TelemetryEvent])
+
+class JSONBody(Response):
+    """A pre-encoded JSON body."""
+
+    media_type = "application/json"
+
+def orjson_available() -> bool:
+    return orjson is not None
+
+def dumps_rows(rows: Iterable[Sequence], columns: Sequence[str] = COLUMNS) -> bytes:
+    """Encode column tuples as a JSON array of objects keyed by `columns`."""
+    objs = [dict(zip(columns, r)) for r in rows]
+    if orjson is not None:
+        return orjson.dumps(objs)
+    return json.dumps(objs, separators=(",", ":")).encode("utf-8")
+
+def dumps_events(events: List[TelemetryEvent]) -> bytes:
+    """Encode already-built events (cache hits, downsampled tiers) in one pydantic-core call."""
+    return _events_adapter.dump_json(events)
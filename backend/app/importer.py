@@ -0,0 +1,280 @@
+"""
+Offline bulk import of JSONL telemetry captures into the SQLite database.
+
+    python -m backend.app.importer telemetry_events.jsonl captures/*.jsonl.gz
+
+Files (plain or gzip) are streamed line by line and validated in chunks
+against TelemetryEvent; float timestamps such as 1767310869.0 are
+truncated to int first. Each chunk is written with one executemany in its
+own transaction, together with the byte offset it ends at in
+import_checkpoints, so an interrupted import resumes exactly where the last
+commit left off without duplicating rows. Re-running a finished import only
+picks up lines appended since; a trailing line without its newline is not
+consumed until a later run sees it complete.
+
+Secondary indexes on telemetry_events are dropped for the load and rebuilt
+once at the end (also on a rerun after a crash). Each chunk is folded into
+the rollups and sketches in the same transaction, like ingest does, so
+/stats sees the data and rollups already compacted past the raw retention
+are added to rather than rebuilt. Run it against a stopped backend: it
+writes the DB file directly.
+"""
+import argparse
+import gzip
+import json
+import operator
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import IO, Iterator, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from . import rollups, sketches
+from .db import DB_URL, init_db
+from .db_models import ImportCheckpointRow, TelemetryEventRow
+from .export import COLUMNS
+from .models import TelemetryEvent
+
+try:
+    import orjson
+    _loads = orjson.loads
+    _DecodeError: Tuple[type, ...] = (orjson.JSONDecodeError,)
+except ImportError:  # optional: pip install orjson
+    _loads = json.loads
+    _DecodeError = (json.JSONDecodeError, UnicodeDecodeError)
+
+_EVENTS = TypeAdapter(List[TelemetryEvent])
+
+_as_row = operator.attrgetter(*COLUMNS)
+_TS = COLUMNS.index("timestamp")
+_INSERT = f"INSERT INTO telemetry_events ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+_CHECKPOINT = f"""
+    INSERT INTO {ImportCheckpointRow.__tablename__} (source, "offset", rows, rejected, updated_ts)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(source) DO UPDATE SET
+        "offset" = excluded."offset", rows = excluded.rows,
+        rejected = excluded.rejected, updated_ts = excluded.updated_ts
+"""
+
+@dataclass
+class ImportResult:
+    source: str
+    start_offset: int
+    offset: int = 0
+    rows: int = 0  # inserted by this run
+    rejected: int = 0
+    seconds: float = 0.0
+    min_ts: Optional[int] = None
+    max_ts: Optional[int] = None
+    samples: List[str] = field(default_factory=list)  # first few rejections
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+def _open(path: str) -> IO[bytes]:
+    with open(path, "rb") as f:
+        gzipped = f.read(2) == b"\x1f\x8b"
+    return gzip.open(path, "rb") if gzipped else open(path, "rb")
+
+def _chunks(f: IO[bytes], offset: int, chunk_size: int) -> Iterator[Tuple[List[bytes], int]]:
+    """
+    (lines, offset after them); offsets are in uncompressed bytes. A last
+    line without its newline may still be being written, so it is left for
+    the next run instead of being consumed.
+    """
+    f.seek(offset)  # gzip seeks by decompressing forward
+    lines: List[bytes] = []
+    for line in f:
+        if not line.endswith(b"\n"):
+            break
+        lines.append(line)
+        offset += len(line)
+        if len(lines) >= chunk_size:
+            yield lines, offset
+            lines = []
+    if lines:
+        yield lines, offset
+
+def _normalize(item):
+    if isinstance(item, dict):
+        ts = item.get("timestamp")
+        if isinstance(ts, float):
+            item["timestamp"] = int(ts)
+    return item
+
+def _validate(items: list, res: ImportResult) -> List[TelemetryEvent]:
+    try:
+        return _EVENTS.validate_python(items)
+    except ValidationError:
+        pass
+    # only a chunk with bad rows pays for row-by-row validation
+    good = []
+    for item in items:
+        try:
+            good.append(TelemetryEvent.model_validate(item))
+        except ValidationError as e:
+            _reject(res, f"{e.errors(include_url=False)[0]['msg']}: {str(item)[:120]}")
+    return good
+
+def _reject(res: ImportResult, why: str) -> None:
+    res.rejected += 1
+    if len(res.samples) < 5:
+        res.samples.append(why)
+
+def _secondary_indexes():
+    return sorted(TelemetryEventRow.__table__.indexes, key=lambda i: i.name)
+
+def drop_indexes(engine: Engine) -> None:
+    with engine.begin() as conn:
+        for idx in _secondary_indexes():
+            conn.execute(text(f"DROP INDEX IF EXISTS {idx.name}"))
+
+def rebuild_indexes(engine: Engine) -> None:
+    for idx in _secondary_indexes():
+        idx.create(bind=engine, checkfirst=True)
+
+def import_file(
+    engine: Engine,
+    path: str,
+    chunk_size: int = 50_000,
+    offset: Optional[int] = None,
+    derived: bool = True,
+    progress: Optional[IO[str]] = None,
+) -> ImportResult:
+    """
+    Append one JSONL(.gz) file to telemetry_events. `offset` overrides the
+    stored checkpoint (0 = from the top); `derived` folds each chunk into
+    rollups and sketches. Indexes are left as they are; see import_files for
+    the full load.
+    """
+    source = os.path.abspath(path)
+    with Session(bind=engine) as db:
+        conn = db.connection()
+        stored = conn.exec_driver_sql(
+            f'SELECT "offset", rows, rejected FROM {ImportCheckpointRow.__tablename__} WHERE source = ?', (source,)
+        ).fetchone()
+        total_rows, total_rejected = (stored[1], stored[2]) if stored else (0, 0)
+        if offset is None:
+            offset = stored[0] if stored else 0
+        res = ImportResult(source=source, start_offset=offset, offset=offset)
+
+        t0 = time.perf_counter()
+        with _open(path) as f:
+            for lines, end in _chunks(f, offset, chunk_size):
+                items = []
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    try:
+                        items.append(_normalize(_loads(line)))
+                    except _DecodeError:
+                        _reject(res, f"not JSON: {line[:120]!r}")
+                events = _validate(items, res)
+                rows = [_as_row(e) for e in events]
+                if rows:
+                    ts = [r[_TS] for r in rows]
+                    lo, hi = min(ts), max(ts)
+                    res.min_ts = lo if res.min_ts is None else min(res.min_ts, lo)
+                    res.max_ts = hi if res.max_ts is None else max(res.max_ts, hi)
+                    conn.exec_driver_sql(_INSERT, rows)
+                    if derived:
+                        rollups.apply_rollups(db, events)
+                        sketches.apply_sketches(db, events)
+
+                res.rows += len(rows)
+                res.offset = end
+                conn.exec_driver_sql(_CHECKPOINT, (
+                    source, end, total_rows + res.rows, total_rejected + res.rejected, int(time.time())
+                ))
+                db.commit()
+                conn = db.connection()
+
+                res.seconds = time.perf_counter() - t0
+                if progress is not None:
+                    print(
+                        f"{path}: {res.rows} rows ({res.rows_per_s:,.0f} rows/s), "
+                        f"{res.rejected} rejected, offset {end}",
+                        file=progress,
+                    )
+        res.seconds = time.perf_counter() - t0
+        return res
+
+def import_files(
+    db_path: str,
+    paths: List[str],
+    chunk_size: int = 50_000,
+    offset: Optional[int] = None,
+    defer_indexes: bool = True,
+    derived: bool = True,
+    progress: Optional[IO[str]] = None,
+) -> List[ImportResult]:
+    engine = create_engine(f"sqlite:///{db_path}")
+    try:
+        init_db(bind=engine)
+        if defer_indexes:
+            drop_indexes(engine)
+        try:
+            return [import_file(engine, p, chunk_size, offset, derived, progress) for p in paths]
+        finally:
+            # runs after a failed import too, so the backend never sees an unindexed table
+            if defer_indexes:
+                t0 = time.perf_counter()
+                rebuild_indexes(engine)
+                if progress is not None:
+                    print(f"rebuilt indexes in {time.perf_counter() - t0:.1f}s", file=progress)
+    finally:
+        engine.dispose()
+
+def main():
+    p = argparse.ArgumentParser(description="Bulk-load JSONL (or .jsonl.gz) telemetry captures into SQLite")
+    p.add_argument("paths", nargs="+", help="JSONL files, plain or gzip")
+    p.add_argument("--db", help="SQLite file (default: the backend's TELEMETRY_DB_URL)")
+    p.add_argument("--chunk-size", type=int, default=50_000, help="Lines per transaction")
+    p.add_argument("--offset", type=int, help="Start at this byte offset instead of the stored checkpoint")
+    p.add_argument("--restart", action="store_true", help="Ignore checkpoints and read from the top (may duplicate)")
+    p.add_argument("--keep-indexes", action="store_true", help="Maintain indexes during the load")
+    p.add_argument(
+        "--skip-derived", action="store_true",
+        help="Don't maintain rollups and sketches (run their backfill afterwards)",
+    )
+    args = p.parse_args()
+
+    db_path = args.db
+    if db_path is None:
+        if not DB_URL.startswith("sqlite:///"):
+            p.error("only SQLite databases can be imported into; pass --db")
+        db_path = DB_URL[len("sqlite:///"):]
+    missing = [x for x in args.paths if not os.path.exists(x)]
+    if missing:
+        p.error(f"no such file: {missing[0]}")
+
+    t0 = time.perf_counter()
+    results = import_files(
+        db_path,
+        args.paths,
+        chunk_size=args.chunk_size,
+        offset=0 if args.restart else args.offset,
+        defer_indexes=not args.keep_indexes,
+        derived=not args.skip_derived,
+        progress=sys.stderr,
+    )
+    for r in results:
+        for why in r.samples:
+            print(f"{r.source}: rejected {why}", file=sys.stderr)
+    rows = sum(r.rows for r in results)
+    elapsed = time.perf_counter() - t0
+    print(
+        f"imported {rows} rows from {len(results)} files in {elapsed:.1f}s "
+        f"({rows / elapsed if elapsed else 0:,.0f} rows/s overall), "
+        f"{sum(r.rejected for r in results)} rejected",
+        file=sys.stderr,
+    )
+
+if __name__ == "__main__":
+    main()
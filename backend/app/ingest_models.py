@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Any, List
+
+
+class IngestRejection(BaseModel):
+    index: int
+    errors: List[dict[str, Any]]
+
+
+class BatchIngestResult(BaseModel):
+    accepted: int
+    rejected: List[IngestRejection] = []
@@ -0,0 +1,207 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional
+
+from sqlalchemy.orm import Session
+
+from simulator.models import TelemetryEvent
+from . import crud
+
+log = logging.getLogger(__name__)
+
+class QueueFull(Exception):
+    """Raised when the queue cannot accept more events under the current backpressure policy."""
+
+class WriteBehindQueue:
+    """
+    Bounded in-process queue between /ingest and SQLite.
+
+    Request handlers only append validated events; a single writer thread
+    drains the queue and commits them in groups (group commit), flushing
+    when `batch_size` events are waiting or the oldest one has waited
+    `flush_interval_s`. `on_commit` runs after each group is durable
+    (used for alert evaluation).
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_size: int = 10_000,
+        batch_size: int = 500,
+        flush_interval_s: float = 0.05,
+        backpressure: str = "block",
+        block_timeout_s: float = 5.0,
+        on_commit: Optional[Callable[[Session, List[TelemetryEvent]], None]] = None,
+    ):
+        if backpressure not in ("block", "reject", "drop_oldest"):
+            raise ValueError(f"Unknown backpressure policy: {backpressure}")
+        self.session_factory = session_factory
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.backpressure = backpressure
+        self.block_timeout_s = block_timeout_s
+        self.on_commit = on_commit
+
+        self._buf: Deque[TelemetryEvent] = deque()
+        self._cond = threading.Condition()
+        self._oldest_enqueued_at: Optional[float] = None
+        self._stopping = False
+        self._blocked = 0  # producers waiting for room; the writer flushes early for them
+        self._thread: Optional[threading.Thread] = None
+
+        # counters exposed via stats()
+        self._enqueued = 0
+        self._dropped = 0
+        self._rejected = 0
+        self._committed = 0
+        self._failed = 0
+        self._commits = 0
+        self._max_depth = 0
+        self._last_commit_ms = 0.0
+        self._max_commit_ms = 0.0
+        self._total_commit_ms = 0.0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="ingest-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_s: Optional[float] = None) -> None:
+        """Stop accepting events, flush everything still queued, then join the writer."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout_s)
+            self._thread = None
+
+    def put(self, event: TelemetryEvent) -> None:
+        self.put_many([event])
+
+    def put_many(self, events: List[TelemetryEvent]) -> None:
+        with self._cond:
+            if self._stopping:
+                raise QueueFull("Ingest queue is shutting down")
+
+            free = self.max_size - len(self._buf)
+            if len(events) > free:
+                if self.backpressure == "reject" or (self.backpressure == "block" and len(events) > self.max_size):
+                    self._rejected += len(events)
+                    raise QueueFull(f"Ingest queue full ({self.max_size} events)")
+                if self.backpressure == "block":
+                    # wait for room for the whole batch, so it is either fully queued or fully
+                    # rejected; a partial enqueue would be committed and then duplicated by a retry
+                    deadline = time.monotonic() + self.block_timeout_s
+                    self._blocked += 1
+                    try:
+                        while self.max_size - len(self._buf) < len(events):
+                            remaining = deadline - time.monotonic()
+                            if remaining <= 0 or self._stopping:
+                                self._rejected += len(events)
+                                raise QueueFull(f"Ingest queue full ({self.max_size} events)")
+                            # the writer may be asleep on its age timer; wake it to drain
+                            self._cond.notify_all()
+                            self._cond.wait(remaining)
+                    finally:
+                        self._blocked -= 1
+                else:  # drop_oldest
+                    for _ in range(min(len(events) - free, len(self._buf))):
+                        self._buf.popleft()
+                        self._dropped += 1
+                    # a batch larger than the whole queue keeps only its newest tail
+                    if len(events) > self.max_size:
+                        self._dropped += len(events) - self.max_size
+                        events = events[-self.max_size:]
+
+            if events and not self._buf:
+                self._oldest_enqueued_at = time.monotonic()
+            self._buf.extend(events)
+            self._enqueued += len(events)
+
+            self._max_depth = max(self._max_depth, len(self._buf))
+            # wake the writer: it either flushes now (size) or arms its age timer
+            self._cond.notify_all()
+
+    def _take_batch(self) -> List[TelemetryEvent]:
+        """Block until a group is due (size, age or shutdown) and pop it."""
+        with self._cond:
+            while True:
+                if self._buf and (self._stopping or self._blocked or len(self._buf) >= self.batch_size):
+                    break
+                if self._buf and self._oldest_enqueued_at is not None:
+                    wait_s = self._oldest_enqueued_at + self.flush_interval_s - time.monotonic()
+                    if wait_s <= 0:
+                        break
+                elif self._stopping:
+                    return []
+                else:
+                    wait_s = None
+                self._cond.wait(wait_s)
+
+            n = min(self.batch_size, len(self._buf))
+            batch = [self._buf.popleft() for _ in range(n)]
+            self._oldest_enqueued_at = time.monotonic() if self._buf else None
+            # wake producers blocked on a full queue
+            self._cond.notify_all()
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            self._commit(batch)
+
+    def _commit(self, batch: List[TelemetryEvent]) -> None:
+        t0 = time.perf_counter()
+        db = self.session_factory()
+        try:
+            try:
+                crud.insert_events(db, batch)
+            except Exception:
+                db.rollback()
+                with self._cond:
+                    self._failed += len(batch)
+                log.exception("write-behind commit of %d events failed", len(batch))
+                return
+            elapsed_ms = (time.perf_counter() - t0) * 1000.0
+
+            with self._cond:
+                self._committed += len(batch)
+                self._commits += 1
+                self._last_commit_ms = elapsed_ms
+                self._max_commit_ms = max(self._max_commit_ms, elapsed_ms)
+                self._total_commit_ms += elapsed_ms
+
+            if self.on_commit is not None:
+                try:
+                    self.on_commit(db, batch)
+                except Exception:
+                    db.rollback()
+                    log.exception("post-commit hook failed for %d events", len(batch))
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "depth": len(self._buf),
+                "max_size": self.max_size,
+                "max_depth": self._max_depth,
+                "backpressure": self.backpressure,
+                "enqueued": self._enqueued,
+                "committed": self._committed,
+                "dropped": self._dropped,
+                "rejected": self._rejected,
+                "failed": self._failed,
+                "commits": self._commits,
+                "avg_batch_size": (self._committed / self._commits) if self._commits else 0.0,
+                "last_commit_ms": self._last_commit_ms,
+                "avg_commit_ms": (self._total_commit_ms / self._commits) if self._commits else 0.0,
+                "max_commit_ms": self._max_commit_ms,
+            }
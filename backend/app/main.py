@@ -1,21 +1,183 @@
-from fastapi import FastAPI, HTTPException, Query, Depends
-from typing import Optional, List
+from fastapi import FastAPI, HTTPException, Query, Depends, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter, ValidationError
+from typing import Any, Optional, List
 from sqlalchemy.orm import Session
+import asyncio
+import json
 import time
 
 from .models import TelemetryEvent
 from .db import SessionLocal, init_db
-from . import crud
+from . import anomaly, crud, export, fastjson, metrics, pubsub, retention, rollups, segments, shards, sketches
 from .stats_models import NodeStats
 from .db_models import AlertRow
 from .alert_models import AlertOut
+from .ingest_models import BatchIngestResult, IngestRejection
+from .ingest_queue import QueueFull, WriteBehindQueue
+from .rules import RuleEngine, load_rules
+from .pagination import decode_cursor
+from .response_cache import ALERTS, TELEMETRY, ResponseCache, etag_for
+from .settings import load_config
+from .store import InMemoryTelemetryStore
+from simulator import wire
 
 app = FastAPI(title="Telemetry Ingestion API", version="0.2.0")
 
+config = load_config()
+
+# Set at startup when config.ingest_queue.enabled (write-behind mode)
+ingest_queue: Optional[WriteBehindQueue] = None
+
+# Set at startup when config.retention.enabled (SQLite engine only)
+compactor: Optional[retention.RetentionCompactor] = None
+
+rule_engine = RuleEngine(load_rules(config.alerting.rules_path))
+
+# Set at startup when config.anomaly.enabled
+detector: Optional[anomaly.AnomalyDetector] = None
+checkpointer: Optional[anomaly.BaselineCheckpointer] = None
+
+# Hot cache for /latest and short /history reads; None when disabled
+store: Optional[InMemoryTelemetryStore] = (
+    InMemoryTelemetryStore(
+        max_events_per_node=config.cache.max_events_per_node,
+        max_nodes=config.cache.max_nodes,
+    )
+    if config.cache.enabled
+    else None
+)
+
+# Encoded /stats, /history and /alerts bodies; None when disabled
+response_cache: Optional[ResponseCache] = (
+    ResponseCache(
+        max_entries=config.response_cache.max_entries,
+        max_bytes=config.response_cache.max_bytes,
+        ttl_s=config.response_cache.ttl_s,
+    )
+    if config.response_cache.enabled
+    else None
+)
+
+def _alert_changed(kind: str, alert: dict) -> None:
+    # rules, anomaly detector and the resolve endpoint all announce through the broker
+    if response_cache is not None:
+        response_cache.bump(ALERTS, (alert["node"],))
+
+pubsub.broker.alert_listeners += (_alert_changed,)
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    t0 = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    # label by route template, never the raw path, to keep cardinality bounded
+    metrics.http_request_seconds.observe(
+        time.perf_counter() - t0,
+        (request.method, route.path if route is not None else "unmatched", str(response.status_code)),
+    )
+    return response
+
+def _queue_gauges():
+    if ingest_queue is None:
+        return {}
+    st = ingest_queue.stats()
+    return {(k,): st[k] for k in ("depth", "enqueued", "committed", "dropped", "rejected", "failed") if k in st}
+
+metrics.registry.gauge("ingest_queue", "Write-behind queue depth and totals", _queue_gauges, labels=("stat",))
+metrics.registry.gauge("alerts_open", "Open alerts tracked by the rule engine", lambda: {(): rule_engine.active_count()})
+metrics.registry.gauge(
+    "stream", "Live stream subscribers and totals",
+    lambda: {(k,): v for k, v in pubsub.broker.stats().items()}, labels=("stat",),
+)
+metrics.registry.gauge(
+    "response_cache", "Response cache size and totals",
+    lambda: {(k,): v for k, v in response_cache.stats().items()} if response_cache is not None else {},
+    labels=("stat",),
+)
+
 @app.on_event("startup")
 def on_startup():
+    global ingest_queue, compactor, detector, checkpointer
     init_db()
 
+    rollups.enabled = config.rollups.enabled
+    sketches.enabled = config.sketches.enabled
+    pubsub.broker.max_buffer = config.stream.max_buffer
+    pubsub.broker.max_subscribers = config.stream.max_subscribers
+    if config.storage.engine == "segments":
+        segments.active_store = segments.SegmentStore(
+            config.storage.segments_path, config.storage.partition_s, config.storage.max_open_segments
+        )
+    elif config.storage.engine == "sharded":
+        shards.active_store = shards.ShardedStore(config.storage.shard_path, config.storage.shards)
+
+    if config.anomaly.enabled:
+        detector = anomaly.AnomalyDetector(config.anomaly)
+
+    with SessionLocal() as db:
+        rule_engine.warm(db)
+        if detector is not None:
+            detector.warm(db)
+        if segments.active_store is None and shards.active_store is None:
+            # rollups/sketches are derived from the SQLite telemetry table
+            if rollups.enabled and config.rollups.backfill_on_startup:
+                rollups.ensure_backfilled(db)
+            if sketches.enabled and config.sketches.backfill_on_startup:
+                sketches.ensure_backfilled(db)
+    if store is not None:
+        store.clear()
+    if response_cache is not None:
+        response_cache.clear()
+
+    if detector is not None:
+        checkpointer = anomaly.BaselineCheckpointer(SessionLocal, detector, config.anomaly.checkpoint_interval_s)
+        checkpointer.start()
+
+    if config.retention.enabled and config.storage.engine == "sqlite" and rollups.enabled:
+        retention.policy = config.retention
+        compactor = retention.RetentionCompactor(SessionLocal, config.retention)
+        compactor.start()
+
+    qcfg = config.ingest_queue
+    if qcfg.enabled:
+        ingest_queue = WriteBehindQueue(
+            SessionLocal,
+            max_size=qcfg.max_size,
+            batch_size=qcfg.batch_size,
+            flush_interval_s=qcfg.flush_interval_ms / 1000.0,
+            backpressure=qcfg.backpressure,
+            block_timeout_s=qcfg.block_timeout_s,
+            on_commit=_after_queue_commit,
+        )
+        ingest_queue.start()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    global ingest_queue, compactor, detector, checkpointer
+    # ends open SSE/WebSocket streams so the server can exit
+    pubsub.broker.close_all()
+    if compactor is not None:
+        compactor.stop()
+        compactor = None
+        retention.policy = None
+    if ingest_queue is not None:
+        # drains and commits whatever is still queued
+        ingest_queue.stop()
+        ingest_queue = None
+    if checkpointer is not None:
+        # after the queue drained, so the last baselines include its events
+        checkpointer.stop()
+        checkpointer = None
+        detector = None
+    if segments.active_store is not None:
+        segments.active_store.seal_all()
+        segments.active_store = None
+    if shards.active_store is not None:
+        shards.active_store.close()
+        shards.active_store = None
+
 def get_db():
     db = SessionLocal()
     try:
@@ -27,46 +189,353 @@ def get_db():
 def health():
     return {"status": "ok"}
 
+@app.get("/metrics")
+def metrics_endpoint():
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+# Upper bound on events accepted by a single /ingest/batch request
+MAX_BATCH_EVENTS = 10_000
+
+def evaluate_alerts(db: Session, event: TelemetryEvent) -> None:
+    rule_engine.evaluate(db, event)
+    if detector is not None:
+        detector.observe(db, event)
+
+def _evaluate_alerts_for_batch(db: Session, events: List[TelemetryEvent]) -> None:
+    for event in events:
+        evaluate_alerts(db, event)
+
+def _after_commit(db: Session, events: List[TelemetryEvent]) -> None:
+    # only once rows are committed, so no read can cache pre-commit data as current
+    if response_cache is not None:
+        response_cache.bump(TELEMETRY, (e.node for e in events))
+    _evaluate_alerts_for_batch(db, events)
+
+def _after_queue_commit(db: Session, events: List[TelemetryEvent]) -> None:
+    # write-behind runs this on the writer thread, so events dropped from the queue
+    # or lost to a failed commit never reach the cache or the streams
+    if store is not None:
+        store.add_many(events)
+    pubsub.broker.publish_events(events)
+    _after_commit(db, events)
+
+def _enqueue(events: List[TelemetryEvent]) -> None:
+    assert ingest_queue is not None
+    try:
+        ingest_queue.put_many(events)
+    except QueueFull as e:
+        metrics.ingest_events.inc(("queue", "rejected"), len(events))
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+
 @app.post("/ingest")
 def ingest(event: TelemetryEvent, db: Session = Depends(get_db)):
+    if ingest_queue is not None:
+        # write-behind: the writer thread commits, publishes and evaluates alerts
+        _enqueue([event])
+        metrics.ingest_events.inc(("ingest", "queued"))
+        return {"accepted": True, "queued": True, "node": event.node, "timestamp": event.timestamp}
+
     crud.insert_event(db, event)
+    metrics.ingest_events.inc(("ingest", "accepted"))
+    if store is not None:
+        store.add(event)
+    pubsub.broker.publish_events((event,))
+    _after_commit(db, [event])
+    return {"accepted": True, "node": event.node, "timestamp": event.timestamp}
 
-    # --- Phase 2 rule-based alerting (simple thresholds) ---
-    # Cooldown so we don't spam duplicate alerts
-    cooldown_s = 30
+@app.get("/ingest/queue")
+def ingest_queue_stats():
+    if ingest_queue is None:
+        return {"enabled": False}
+    return {"enabled": True, **ingest_queue.stats()}
 
-    def maybe_alert(rule_id: str, severity: str, message: str):
-        existing = crud.get_active_alert(db, event.node, rule_id)
-        if existing and (event.timestamp - existing.created_ts) < cooldown_s:
-            return
-        crud.create_alert(db, event.node, rule_id, severity, message)
+def _parse_batch_body(body: bytes, content_type: str) -> List[Any]:
+    """
+    Accept either a JSON array of events or NDJSON (one event per line).
+    Lines that are not valid JSON (or not UTF-8) are kept as raw strings so
+    they can be reported as per-item rejections instead of failing the
+    whole batch.
+    """
+    if "ndjson" in content_type or "jsonl" in content_type:
+        items: List[Any] = []
+        for line in body.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line.decode("utf-8")))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                items.append(line.decode("utf-8", errors="replace"))
+        return items
 
-    if event.latency_ms >= 200:
-        maybe_alert("latency_high", "WARN", f"High latency: {event.latency_ms:.1f} ms")
+    try:
+        payload = json.loads(body or b"[]")
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e.msg}")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body: not UTF-8")
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=422, detail="Expected a JSON array of events")
+    return payload
 
-    if event.packet_loss >= 0.02:
-        maybe_alert("packet_loss_high", "WARN", f"High packet loss: {event.packet_loss:.3f}")
+def _ingest_batch(db: Session, items: List[Any]) -> BatchIngestResult:
+    accepted: List[TelemetryEvent] = []
+    rejected: List[IngestRejection] = []
 
-    if event.cpu_pct >= 90:
-        maybe_alert("cpu_high", "CRITICAL", f"High CPU: {event.cpu_pct:.1f}%")
+    # validate everything first, then write the good ones in one transaction
+    for i, item in enumerate(items):
+        try:
+            accepted.append(TelemetryEvent.model_validate(item))
+        except ValidationError as e:
+            rejected.append(
+                IngestRejection(index=i, errors=e.errors(include_url=False, include_context=False))
+            )
 
-    return {"accepted": True, "node": event.node, "timestamp": event.timestamp}
+    return _write_batch(db, accepted, rejected, "batch")
+
+_EVENTS = TypeAdapter(List[TelemetryEvent])
+
+def _ingest_wire(db: Session, batch: wire.WireBatch) -> BatchIngestResult:
+    # range checks run column-wise, so bad rows are reported without per-row pydantic errors
+    ok, errors = batch.validate()
+    by_index: dict = {}
+    for i, field, msg in errors:
+        by_index.setdefault(i, []).append({"type": "value_error", "loc": [field], "msg": msg})
+    rejected = [IngestRejection(index=i, errors=errs) for i, errs in by_index.items()]
+    # pydantic-core builds the models in one call, faster than model_construct per row
+    accepted = _EVENTS.validate_python(batch.to_dicts(ok if errors else None))
+    return _write_batch(db, accepted, rejected, "wire")
+
+def _write_batch(
+    db: Session, accepted: List[TelemetryEvent], rejected: List[IngestRejection], source: str
+) -> BatchIngestResult:
+    if rejected:
+        metrics.ingest_events.inc((source, "invalid"), len(rejected))
+    if ingest_queue is not None:
+        _enqueue(accepted)
+        metrics.ingest_events.inc((source, "queued"), len(accepted))
+    else:
+        crud.insert_events(db, accepted)
+        metrics.ingest_events.inc((source, "accepted"), len(accepted))
+        if store is not None:
+            store.add_many(accepted)
+        pubsub.broker.publish_events(accepted)
+        _after_commit(db, accepted)
 
+    return BatchIngestResult(accepted=len(accepted), rejected=rejected)
+
+@app.post("/ingest/batch", response_model=BatchIngestResult)
+async def ingest_batch(request: Request, db: Session = Depends(get_db)):
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith(wire.CONTENT_TYPE):
+        try:
+            if wire.peek_count(body) > MAX_BATCH_EVENTS:
+                raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_BATCH_EVENTS} events)")
+            batch = wire.decode(body)
+        except wire.WireError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid batch body: {e}")
+        return await run_in_threadpool(_ingest_wire, db, batch)
+
+    items = _parse_batch_body(body, content_type)
+    if len(items) > MAX_BATCH_EVENTS:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_BATCH_EVENTS} events)")
+    # DB work is blocking; keep it off the event loop like the sync endpoints
+    return await run_in_threadpool(_ingest_batch, db, items)
+
+def _subscribe(nodes: Optional[List[str]], topics: Optional[List[str]], coalesce_ms: Optional[int]) -> pubsub.Subscription:
+    """Raises HTTPException; the WebSocket endpoint maps it onto a close code."""
+    if not config.stream.enabled:
+        raise HTTPException(status_code=404, detail="Streaming is disabled")
+    topics = topics or list(pubsub.TOPICS)
+    unknown = set(topics) - set(pubsub.TOPICS)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown topic(s): {', '.join(sorted(unknown))}")
+    if coalesce_ms is not None and coalesce_ms < config.stream.min_coalesce_ms:
+        raise HTTPException(status_code=422, detail=f"coalesce_ms must be >= {config.stream.min_coalesce_ms}")
+    try:
+        return pubsub.broker.subscribe(
+            topics, nodes, coalesce_s=None if coalesce_ms is None else coalesce_ms / 1000.0
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+@app.get("/stream/stats")
+def stream_stats():
+    if not config.stream.enabled:
+        return {"enabled": False}
+    return {"enabled": True, **pubsub.broker.stats()}
+
+@app.get("/stream/sse")
+async def stream_sse(
+    node: Optional[List[str]] = Query(default=None, description="Repeat param: ?node=r1&node=r2; default all nodes"),
+    topic: Optional[List[str]] = Query(default=None, description="telemetry and/or alerts; default both"),
+    coalesce_ms: Optional[int] = Query(default=None, description="At most one telemetry update per node per interval"),
+):
+    """Server-sent events: `event: telemetry|alerts`, `data: <JSON>`."""
+    sub = _subscribe(node, topic, coalesce_ms)
+
+    async def body():
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    msgs = await sub.get(timeout_s=config.stream.heartbeat_s)
+                except pubsub.SlowConsumer:
+                    yield 'event: error\ndata: {"detail":"slow consumer"}\n\n'
+                    return
+                if msgs:
+                    yield "".join(f"event: {t}\ndata: {data}\n\n" for t, _, data in msgs)
+                elif sub.closed_reason is None:
+                    yield ": keepalive\n\n"
+                if sub.closed_reason is not None:
+                    return
+        finally:
+            pubsub.broker.unsubscribe(sub)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(body(), media_type="text/event-stream", headers=headers)
+
+@app.websocket("/stream/ws")
+async def stream_ws(
+    websocket: WebSocket,
+    node: Optional[List[str]] = Query(default=None),
+    topic: Optional[List[str]] = Query(default=None),
+    coalesce_ms: Optional[int] = Query(default=None),
+):
+    """Each frame is a JSON array of {"topic": ..., "data": {...}} in publish order."""
+    try:
+        sub = _subscribe(node, topic, coalesce_ms)
+    except HTTPException as e:
+        # 1013 = try again later, 1008 = policy violation
+        await websocket.close(code=1013 if e.status_code == 503 else 1008, reason=str(e.detail))
+        return
+    await websocket.accept()
+
+    async def watch_client():
+        # clients don't send anything; this only notices the disconnect
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            sub.close("client disconnected")
+
+    watcher = asyncio.create_task(watch_client())
+    try:
+        while True:
+            try:
+                msgs = await sub.get(timeout_s=config.stream.heartbeat_s)
+            except pubsub.SlowConsumer:
+                await websocket.close(code=1008, reason="slow consumer")
+                return
+            if sub.closed_reason is not None:
+                if sub.closed_reason != "client disconnected":
+                    await websocket.close(code=1001)
+                return
+            # keepalive is an empty frame so dead peers surface as send errors
+            await websocket.send_text(
+                "[" + ",".join(f'{{"topic":"{t}","data":{data}}}' for t, _, data in msgs) + "]"
+            )
+    except WebSocketDisconnect:
+        pass
+    finally:
+        watcher.cancel()
+        pubsub.broker.unsubscribe(sub)
+
+@app.get("/cache/stats")
+def cache_stats():
+    if store is None:
+        return {"enabled": False}
+    return {"enabled": True, **store.stats()}
+
+@app.get("/cache/responses")
+def response_cache_stats():
+    if response_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **response_cache.stats()}
+
+def _if_none_match(request: Request) -> List[str]:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return []
+    # weak comparison (RFC 9110 13.1.2): W/"x" matches "x"
+    return [t.strip().removeprefix("W/") for t in header.split(",")]
+
+def _cached(request: Request, key: tuple, kind: str, nodes: Optional[List[str]], build) -> Response:
+    """
+    Serve `build() -> (body, headers)` through the response cache, keyed on
+    `key` and invalidated by writes to `nodes` (None = any node). Answers 304
+    without a body when If-None-Match carries the current ETag.
+    """
+    if response_cache is None:
+        body, headers = build()
+        etag = etag_for(body)
+    else:
+        entry = response_cache.get(key)
+        if entry is None:
+            # versions first: a write landing during build() leaves the entry stale
+            versions = response_cache.versions(kind, nodes)
+            body, headers = build()
+            entry = response_cache.put(key, body, kind, nodes, versions, headers)
+        body, headers, etag = entry.body, entry.headers, entry.etag
+    headers = {**headers, "ETag": etag, "Cache-Control": "no-cache"}
+    tags = _if_none_match(request)
+    if etag in tags or "*" in tags:
+        return Response(status_code=304, headers=headers)
+    return fastjson.JSONBody(body, headers=headers)
 
 @app.get("/latest", response_model=TelemetryEvent)
 def latest(node: Optional[str] = None, db: Session = Depends(get_db)):
-    ev = crud.get_latest(db, node=node)
+    if store is None:
+        ev = crud.get_latest(db, node=node)
+    else:
+        hit, ev = store.latest(node)
+        if not hit:
+            if node:
+                # one read warms both /latest and /history for this node
+                rows = crud.get_history(db, node=node, limit=store.max_events_per_node)
+                store.warm_node(node, rows)
+                ev = rows[-1] if rows else None
+            else:
+                ev = crud.get_latest(db)
+                store.warm_fleet_latest(ev)
     if ev is None:
         raise HTTPException(status_code=404, detail="No telemetry available")
     return ev
 
 @app.get("/history", response_model=List[TelemetryEvent])
 def history(
+    request: Request,
     node: str,
     limit: int = Query(default=100, ge=1, le=2000),
     db: Session = Depends(get_db),
 ):
-    return crud.get_history(db, node=node, limit=limit)
+    # bodies are encoded here; response_model only documents the schema
+    return _cached(request, ("/history", node, limit), TELEMETRY, [node], lambda: (_history_body(db, node, limit), {}))
+
+def _history_body(db: Session, node: str, limit: int) -> bytes:
+    if store is None:
+        return fastjson.dumps_rows(crud.get_history_rows(db, node=node, limit=limit))
+
+    cached = store.history(node, limit=limit)
+    if cached is not None:
+        return fastjson.dumps_events(cached)
+    if limit > store.max_events_per_node:
+        # deeper than the ring can ever hold: serve straight from the DB
+        return fastjson.dumps_rows(crud.get_history_rows(db, node=node, limit=limit))
+    rows = crud.get_history(db, node=node, limit=store.max_events_per_node)
+    store.warm_node(node, rows)
+    return fastjson.dumps_events(rows[-limit:])
+
+def _page_after(cursor: Optional[str], offset: int):
+    if cursor is None:
+        return None
+    if offset:
+        raise HTTPException(status_code=400, detail="Use either cursor or offset, not both")
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 @app.get("/events", response_model=List[TelemetryEvent])
 def events(
@@ -75,19 +544,52 @@ def events(
     end_ts: Optional[int] = Query(default=None, description="Unix seconds, inclusive"),
     limit: int = Query(default=200, ge=1, le=2000),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="X-Next-Cursor from the previous page"),
     db: Session = Depends(get_db),
 ):
-    return crud.query_events(
+    rows, next_cursor = crud.query_event_rows_page(
         db,
         nodes=node,
         start_ts=start_ts,
         end_ts=end_ts,
         limit=limit,
         offset=offset,
+        after=_page_after(cursor, offset),
     )
+    response = fastjson.JSONBody(fastjson.dumps_rows(rows))
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+@app.get("/export")
+def export_events(
+    node: Optional[List[str]] = Query(default=None, description="Repeat param: ?node=r1&node=r2"),
+    start_ts: Optional[int] = Query(default=None, description="Unix seconds, inclusive"),
+    end_ts: Optional[int] = Query(default=None, description="Unix seconds, inclusive"),
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv|arrow)$"),
+    gzip: bool = Query(default=False, description="gzip-compress the stream on the fly"),
+    chunk_size: int = Query(default=5000, ge=100, le=100_000),
+):
+    """Stream a whole time range oldest->newest without paging."""
+    if format == "arrow" and not export.arrow_available():
+        raise HTTPException(status_code=400, detail="format=arrow requires the optional pyarrow package")
+
+    encoder = {"ndjson": export.encode_ndjson, "csv": export.encode_csv, "arrow": export.encode_arrow}[format]
+    body = encoder(export.iter_chunks(SessionLocal, nodes=node, start_ts=start_ts, end_ts=end_ts, chunk_size=chunk_size))
+
+    ext = {"ndjson": "ndjson", "csv": "csv", "arrow": "arrows"}[format]
+    headers = {"Content-Disposition": f'attachment; filename="telemetry.{ext}"'}
+    if gzip:
+        body = export.gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=export.FORMATS[format], headers=headers)
+
+_NODE_STATS = TypeAdapter(List[NodeStats])
+_ALERTS = TypeAdapter(List[AlertOut])
 
 @app.get("/stats", response_model=list[NodeStats])
 def stats(
+    request: Request,
     node: Optional[list[str]] = Query(default=None, description="Repeat param: ?node=r1&node=r2"),
     start_ts: Optional[int] = Query(default=None),
     end_ts: Optional[int] = Query(default=None),
@@ -104,24 +606,44 @@ def stats(
     elif start_ts is not None and end_ts is None:
         end_ts = start_ts + window_s
 
-    return crud.get_node_stats(db, nodes=node, start_ts=start_ts, end_ts=end_ts)
+    nodes = sorted(set(node)) if node else None
+    return _cached(
+        request, ("/stats", tuple(nodes or ()), start_ts, end_ts), TELEMETRY, nodes,
+        lambda: (_NODE_STATS.dump_json(crud.get_node_stats(db, nodes=nodes, start_ts=start_ts, end_ts=end_ts)), {}),
+    )
 
 
 @app.get("/alerts", response_model=list[AlertOut])
 def alerts(
+    request: Request,
     node: Optional[str] = None,
     is_active: Optional[bool] = None,
     limit: int = Query(default=200, ge=1, le=2000),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="X-Next-Cursor from the previous page"),
     db: Session = Depends(get_db),
 ):
-    return crud.list_alerts(db, node=node, is_active=is_active, limit=limit, offset=offset)
+    after = _page_after(cursor, offset)
+
+    def build():
+        rows, next_cursor = crud.list_alerts_page(
+            db, node=node, is_active=is_active, limit=limit, offset=offset, after=after
+        )
+        return _ALERTS.dump_json(rows), ({"X-Next-Cursor": next_cursor} if next_cursor is not None else {})
+
+    return _cached(
+        request, ("/alerts", node, is_active, limit, offset, cursor), ALERTS, [node] if node else None, build,
+    )
 
 @app.post("/alerts/{alert_id}/resolve", response_model=AlertOut)
 def resolve(alert_id: int, db: Session = Depends(get_db)):
     row = crud.resolve_alert(db, alert_id)
     if row is None:
         raise HTTPException(status_code=404, detail="Alert not found")
+    rule_engine.forget(row)
+    if detector is not None:
+        detector.forget(row)
+    pubsub.broker.publish_alert("resolved", pubsub.alert_payload(row))
     return AlertOut(
         id=row.id,
         node=row.node,
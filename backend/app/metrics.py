@@ -0,0 +1,88 @@
+"""
+Backend metrics, rendered in Prometheus text format at GET /metrics.
+
+The primitives (per-thread sharded counters and histograms) live in
+simulator.utils.metrics so the simulator can export the same way.
+"""
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from simulator.utils.metrics import CONTENT_TYPE, Registry  # noqa: F401
+
+registry = Registry()
+
+http_request_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    labels=("method", "route", "status"),
+)
+ingest_events = registry.counter(
+    "ingest_events_total", "Events received on the ingest endpoints",
+    labels=("endpoint", "result"),
+)
+db_statement_seconds = registry.histogram(
+    "db_statement_duration_seconds", "SQL statement execution time",
+    labels=("kind",),
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0),
+)
+db_commit_seconds = registry.histogram(
+    "db_commit_duration_seconds", "Session commit time, including the final flush",
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0),
+)
+alerts = registry.counter(
+    "alerts_total", "Alerts opened and resolved, and rule matches suppressed by an open alert",
+    labels=("rule_id", "outcome"),
+)
+
+def _statement_kind(statement: str) -> str:
+    head = statement.lstrip()[:6].upper()
+    return head if head in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement executed on `engine` (cursor execute, executemany included)."""
+
+    # the start time lives on the per-statement execution context, so a statement that
+    # raises (and never reaches after_cursor_execute) leaves nothing behind on the connection
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._stmt_t0 = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        t0: Optional[float] = getattr(context, "_stmt_t0", None)
+        if t0 is not None:
+            db_statement_seconds.observe(time.perf_counter() - t0, (_statement_kind(statement),))
+
+def instrument_sessions(session_cls) -> None:
+    """Time Session.commit() for sessions made by `session_cls` (a sessionmaker)."""
+
+    @event.listens_for(session_cls, "before_commit")
+    def _before(session: Session):
+        session.info["_commit_t0"] = time.perf_counter()
+
+    @event.listens_for(session_cls, "after_commit")
+    def _after(session: Session):
+        t0: Optional[float] = session.info.pop("_commit_t0", None)
+        if t0 is not None:
+            db_commit_seconds.observe(time.perf_counter() - t0)
+
+    @event.listens_for(session_cls, "after_rollback")
+    def _rollback(session: Session):
+        session.info.pop("_commit_t0", None)
+
+def pool_gauges(engine: Engine) -> None:
+    pool = engine.pool
+
+    def usage():
+        out = {}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            fn = getattr(pool, name, None)
+            if fn is not None:
+                out[(name,)] = fn()
+        return out
+
+    registry.gauge("db_pool_connections", "SQLAlchemy connection pool usage", usage, labels=("state",))
@@ -0,0 +1,19 @@
+import base64
+import binascii
+from typing import Tuple
+
+# Opaque keyset cursors: the (sort_ts, id) of the last row on the previous page.
+# Pages continue strictly after that row in (sort_ts DESC, id DESC) order, so
+# every page is an index seek + LIMIT no matter how deep it is.
+
+def encode_cursor(ts: int, row_id: int) -> str:
+    raw = f"{int(ts)}:{int(row_id)}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, row_id = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii").split(":")
+        return int(ts), int(row_id)
+    except (ValueError, UnicodeError, binascii.Error):
+        raise ValueError("Invalid cursor")
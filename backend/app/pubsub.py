@@ -0,0 +1,222 @@
+"""
+In-process pub/sub for live telemetry and alert push (/stream/sse, /stream/ws).
+
+Ingest publishes straight into subscriber buffers - no DB reads - from any
+thread; each subscriber is drained by its own connection task on the event
+loop. Every message is JSON-encoded once per publish and shared by all
+subscribers. A subscriber whose buffer exceeds `max_buffer` is closed as a
+slow consumer instead of slowing down ingest or growing without bound.
+
+With coalescing, a subscriber keeps only the newest telemetry per node and
+is flushed at most once per interval; alerts are never coalesced.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+TOPICS = ("telemetry", "alerts")
+
+# (topic, node, encoded JSON)
+Message = Tuple[str, str, str]
+
+class SlowConsumer(Exception):
+    pass
+
+class Subscription:
+    def __init__(
+        self,
+        broker: "Broker",
+        loop: asyncio.AbstractEventLoop,
+        topics: Set[str],
+        nodes: Optional[Set[str]],
+        coalesce_s: Optional[float],
+        max_buffer: int,
+    ):
+        self.broker = broker
+        self.loop = loop
+        self.topics = topics
+        self.nodes = nodes
+        self.coalesce_s = coalesce_s
+        self.max_buffer = max_buffer
+        self.closed_reason: Optional[str] = None
+        self.delivered = 0
+
+        self._lock = threading.Lock()
+        self._queue: deque = deque()
+        self._latest: Dict[str, Message] = {}  # coalescing: newest telemetry per node
+        self._wake = asyncio.Event()
+        self._notified = False
+        self._last_flush = 0.0
+
+    def _pending(self) -> int:
+        return len(self._queue) + len(self._latest)
+
+    def push(self, messages: List[Message]) -> None:
+        """Called by publishers, from any thread."""
+        with self._lock:
+            if self.closed_reason is not None:
+                return
+            for msg in messages:
+                if self.coalesce_s is not None and msg[0] == "telemetry":
+                    self._latest[msg[1]] = msg
+                else:
+                    self._queue.append(msg)
+            if self._pending() > self.max_buffer:
+                self.closed_reason = "slow consumer"
+                self._queue.clear()
+                self._latest.clear()
+            if self._notified:
+                return
+            self._notified = True
+        # one wake-up per drain, however many publishes happen before it
+        self.loop.call_soon_threadsafe(self._wake.set)
+
+    def close(self, reason: str = "closed") -> None:
+        with self._lock:
+            if self.closed_reason is None:
+                self.closed_reason = reason
+        self.loop.call_soon_threadsafe(self._wake.set)
+
+    async def get(self, timeout_s: Optional[float] = None) -> List[Message]:
+        """
+        Wait for messages and take everything buffered. Returns [] on timeout
+        (use it for heartbeats); raises SlowConsumer once the buffer overflowed.
+        """
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout_s)
+        except asyncio.TimeoutError:
+            return []
+        if self.coalesce_s is not None and self.closed_reason is None:
+            wait = self._last_flush + self.coalesce_s - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        with self._lock:
+            self._wake.clear()
+            self._notified = False
+            if self.closed_reason == "slow consumer":
+                raise SlowConsumer(self.closed_reason)
+            out = list(self._queue)
+            out.extend(self._latest.values())
+            self._queue.clear()
+            self._latest.clear()
+        self._last_flush = time.monotonic()
+        self.delivered += len(out)
+        return out
+
+class Broker:
+    def __init__(self, max_buffer: int = 1000, max_subscribers: int = 10_000):
+        self.max_buffer = max_buffer
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        # snapshot tuples, replaced on (un)subscribe, so publishers iterate without locking
+        self._all: Tuple[Subscription, ...] = ()
+        self._by_node: Dict[str, Tuple[Subscription, ...]] = {}
+        # in-process callables(kind, alert) run on every alert change, subscribers or not
+        self.alert_listeners: Tuple[Callable[[str, dict], None], ...] = ()
+        self.published = 0
+        self.disconnected_slow = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._all)
+
+    def subscribe(
+        self,
+        topics: Iterable[str] = TOPICS,
+        nodes: Optional[Iterable[str]] = None,
+        coalesce_s: Optional[float] = None,
+        max_buffer: Optional[int] = None,
+    ) -> Subscription:
+        """Register a subscriber for the running event loop. Raises ValueError when full."""
+        sub = Subscription(
+            self,
+            asyncio.get_running_loop(),
+            set(topics),
+            set(nodes) if nodes else None,
+            coalesce_s,
+            max_buffer or self.max_buffer,
+        )
+        with self._lock:
+            if len(self._all) >= self.max_subscribers:
+                raise ValueError("Too many subscribers")
+            self._all = self._all + (sub,)
+            self._reindex()
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            if sub.closed_reason == "slow consumer":
+                self.disconnected_slow += 1
+            self._all = tuple(s for s in self._all if s is not sub)
+            self._reindex()
+
+    def _reindex(self) -> None:
+        by_node: Dict[str, list] = {}
+        for s in self._all:
+            for node in s.nodes or ("*",):
+                by_node.setdefault(node, []).append(s)
+        self._by_node = {k: tuple(v) for k, v in by_node.items()}
+
+    def publish_events(self, events: Iterable) -> None:
+        """Fan telemetry out to subscribers; a no-op without subscribers."""
+        if not self._all:
+            return
+        by_node = self._by_node
+        wildcard = by_node.get("*", ())
+        encoded: List[Message] = [("telemetry", e.node, e.model_dump_json()) for e in events]
+        self.published += len(encoded)
+
+        targets: Dict[Subscription, List[Message]] = {}
+        for s in wildcard:
+            if "telemetry" in s.topics:
+                targets[s] = encoded
+        if len(by_node) > 1 or not wildcard:
+            for msg in encoded:
+                for s in by_node.get(msg[1], ()):
+                    if "telemetry" in s.topics:
+                        targets.setdefault(s, []).append(msg)
+        for s, msgs in targets.items():
+            s.push(msgs)
+
+    def publish_alert(self, kind: str, alert: dict) -> None:
+        """kind is "opened" or "resolved"; `alert` is the AlertOut-shaped dict (or node/rule_id)."""
+        for listener in self.alert_listeners:
+            listener(kind, alert)
+        if not self._all:
+            return
+        node = alert.get("node", "")
+        msg: Message = ("alerts", node, json.dumps({"event": kind, **alert}, separators=(",", ":")))
+        self.published += 1
+        for s in self._by_node.get("*", ()) + self._by_node.get(node, ()):
+            if "alerts" in s.topics:
+                s.push([msg])
+
+    def close_all(self, reason: str = "shutdown") -> None:
+        for s in self._all:
+            s.close(reason)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._all),
+            "published": self.published,
+            "disconnected_slow": self.disconnected_slow,
+        }
+
+def alert_payload(row) -> dict:
+    """AlertOut-shaped dict for an AlertRow."""
+    return {
+        "id": row.id,
+        "node": row.node,
+        "rule_id": row.rule_id,
+        "severity": row.severity,
+        "message": row.message,
+        "created_ts": row.created_ts,
+        "resolved_ts": row.resolved_ts,
+        "is_active": row.is_active,
+    }
+
+# Limits are set at startup from config.stream
+broker = Broker()
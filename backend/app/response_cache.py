@@ -0,0 +1,162 @@
+"""
+Response cache for the read endpoints (/stats, /history, /alerts).
+
+Entries are encoded response bodies keyed on the endpoint and its
+normalized query parameters. Instead of scanning entries on every write,
+invalidation is by version: ingest bumps a telemetry counter per written
+node, alert opens/resolves bump an alerts counter per node, and both also
+bump a fleet-wide counter. An entry remembers the counters it was computed
+under - its nodes', or the fleet counter when it covers every node - and
+is dropped on lookup once any of them moved. Counters are read *before* the
+DB query, so a write that lands mid-query makes the entry stale, never
+wrong.
+
+Telemetry counters move after the rows are committed (see main.py), so a
+request can't cache a pre-commit read under post-commit versions. Writes
+this process never sees (another worker, manual DB edits, retention
+compaction) are bounded by `ttl_s`. Size is bounded by `max_entries` and
+`max_bytes` (LRU).
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+TELEMETRY = "telemetry"
+ALERTS = "alerts"
+
+@dataclass
+class Entry:
+    body: bytes
+    etag: str
+    headers: Dict[str, str]
+    kind: str
+    nodes: Optional[Tuple[str, ...]]  # None = depends on every node
+    versions: Tuple[int, ...]
+    expires_at: float
+
+    @property
+    def size(self) -> int:
+        # body plus a rough allowance for key, headers and bookkeeping
+        return len(self.body) + 256
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 32 * 1024 * 1024, ttl_s: float = 5.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[tuple, Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # kind -> node -> version, and kind -> fleet-wide version
+        self._node_versions: Dict[str, Dict[str, int]] = {TELEMETRY: {}, ALERTS: {}}
+        self._fleet_versions: Dict[str, int] = {TELEMETRY: 0, ALERTS: 0}
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self.expired = 0
+        self.evictions = 0
+
+    # ---- versions -----------------------------------------------------------
+
+    def versions(self, kind: str, nodes: Optional[Iterable[str]]) -> Tuple[int, ...]:
+        """Current versions an entry for `nodes` (None = all nodes) depends on."""
+        if nodes is None:
+            return (self._fleet_versions[kind],)
+        per_node = self._node_versions[kind]
+        return tuple(per_node.get(n, 0) for n in nodes)
+
+    def bump(self, kind: str, nodes: Iterable[str]) -> None:
+        """Record a committed write to `nodes`; entries depending on them go stale."""
+        nodes = set(nodes)
+        if not nodes:
+            return
+        with self._lock:
+            per_node = self._node_versions[kind]
+            for n in nodes:
+                per_node[n] = per_node.get(n, 0) + 1
+            self._fleet_versions[kind] += 1
+
+    # ---- entries ------------------------------------------------------------
+
+    def get(self, key: tuple) -> Optional[Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._drop(key)
+                self.expired += 1
+                self.misses += 1
+                return None
+            if entry.versions != self.versions(entry.kind, entry.nodes):
+                self._drop(key)
+                self.invalidated += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(
+        self,
+        key: tuple,
+        body: bytes,
+        kind: str,
+        nodes: Optional[Iterable[str]],
+        versions: Tuple[int, ...],
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Entry:
+        """Store a body computed under `versions` (read with versions() before the query)."""
+        entry = Entry(
+            body=body,
+            etag=etag_for(body),
+            headers=headers or {},
+            kind=kind,
+            nodes=None if nodes is None else tuple(nodes),
+            versions=versions,
+            expires_at=time.monotonic() + self.ttl_s,
+        )
+        if entry.size > self.max_bytes:
+            return entry
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return entry
+
+    def _drop(self, key: tuple) -> None:
+        self._bytes -= self._entries.pop(key).size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "memory_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "invalidated": self.invalidated,
+                "expired": self.expired,
+                "evictions": self.evictions,
+            }
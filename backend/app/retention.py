@@ -0,0 +1,253 @@
+"""
+Retention tiers and the background compactor.
+
+Raw telemetry is kept for `raw_keep_s`; older data survives only in the
+rollup tables (see rollups.py), each resolution for its own `keep_s`. The
+compactor deletes expired rows in small committed batches so it never
+holds the write lock for long, then returns freed pages to the OS with
+PRAGMA incremental_vacuum.
+
+Tier boundaries (horizons) are aligned to whole hours, so every tier
+starts and ends on a bucket boundary of every rollup resolution. Reads in
+crud.py use them to pick the right tier for each part of a range: raw
+rows after the raw horizon, then the finest rollup still retained.
+
+One-off maintenance:
+    python -m backend.app.retention compact   # run one compaction pass now
+    python -m backend.app.retention vacuum    # switch an old DB to incremental auto_vacuum
+"""
+import argparse
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, literal_column, select, text, tuple_
+from sqlalchemy.orm import Session
+
+from simulator.models import TelemetryEvent
+from . import rollups
+from .db_models import TelemetryEventRow, TelemetryRollupRow, TelemetrySketchRow
+from .settings import RetentionConfig
+
+log = logging.getLogger(__name__)
+
+_ALIGN_S = max(rollups.RESOLUTIONS)
+
+# Set from settings at startup when retention is enabled
+policy: Optional[RetentionConfig] = None
+
+@dataclass(frozen=True)
+class Horizons:
+    raw: int  # oldest timestamp still kept as raw rows
+    tiers: Dict[int, int]  # rollup resolution -> oldest bucket_ts still kept
+
+def horizons(cfg: RetentionConfig, now: Optional[float] = None) -> Horizons:
+    now = int(time.time() if now is None else now)
+
+    def align(ts: int) -> int:
+        return ts - ts % _ALIGN_S
+
+    return Horizons(
+        raw=align(now - cfg.raw_keep_s),
+        tiers={t.resolution_s: align(now - t.keep_s) for t in cfg.tiers},
+    )
+
+def current_horizons() -> Optional[Horizons]:
+    return horizons(policy) if policy is not None else None
+
+def zones(h: Horizons, start_ts: Optional[int], end_ts: Optional[int]) -> List[Tuple[Optional[int], int, int]]:
+    """
+    Split [start_ts, end_ts] (inclusive, None = open) into (resolution, lo, hi)
+    zones newest first; resolution None means raw rows. Each older zone is read
+    from the finest rollup still retained there.
+    """
+    lo_bound = -(2 ** 62) if start_ts is None else start_ts
+    hi_bound = 2 ** 62 if end_ts is None else end_ts
+
+    out: List[Tuple[Optional[int], int, int]] = []
+    boundary = h.raw
+    if hi_bound >= h.raw:
+        out.append((None, max(lo_bound, h.raw), hi_bound))
+    for res in sorted(h.tiers):
+        oldest = h.tiers[res]
+        if oldest >= boundary:
+            continue  # a coarser tier retained for less time than a finer one adds nothing
+        lo, hi = max(lo_bound, oldest), min(hi_bound, boundary - 1)
+        if lo <= hi:
+            out.append((res, lo, hi))
+        boundary = oldest
+    return out
+
+# ---- reading old ranges from the tiers ---------------------------------------
+
+_ROWID = literal_column("telemetry_rollups.rowid")
+
+def tier_events(
+    db: Session,
+    h: Horizons,
+    nodes: Optional[List[str]],
+    start_ts: Optional[int],
+    end_ts: Optional[int],
+    limit: int,
+    after: Optional[Tuple[int, int]] = None,
+) -> List[Tuple[TelemetryEvent, int]]:
+    """
+    Downsampled events (one per rollup bucket, metrics averaged, status the
+    worst seen in the bucket) older than the raw horizon, newest first,
+    paired with the rollup rowid that stands in for the event id in cursors.
+    """
+    R = TelemetryRollupRow
+    out: List[Tuple[TelemetryEvent, int]] = []
+    for res, lo, hi in zones(h, start_ts, end_ts):
+        if res is None:
+            continue
+        if len(out) >= limit:
+            break
+        stmt = select(
+            _ROWID, R.node, R.bucket_ts, R.count,
+            R.latency_sum + R.latency_comp, R.packet_loss_sum + R.packet_loss_comp,
+            R.throughput_sum + R.throughput_comp, R.cpu_sum + R.cpu_comp, R.mem_sum + R.mem_comp,
+            R.worst_status,
+        ).where(R.resolution_s == res, R.bucket_ts >= lo, R.bucket_ts <= hi)
+        if nodes:
+            stmt = stmt.where(R.node.in_(nodes))
+        if after is not None:
+            stmt = stmt.where(tuple_(R.bucket_ts, _ROWID) < tuple_(*after))
+        stmt = stmt.order_by(R.bucket_ts.desc(), _ROWID.desc()).limit(limit - len(out))
+
+        for rowid, node, bucket_ts, n, lat, loss, thr, cpu, mem, worst in db.execute(stmt):
+            lat, loss, thr, cpu, mem = lat / n, loss / n, thr / n, cpu / n, mem / n
+            out.append((
+                TelemetryEvent.model_construct(
+                    node=node,
+                    latency_ms=lat,
+                    packet_loss=loss,
+                    throughput_mbps=thr,
+                    cpu_pct=cpu,
+                    mem_pct=mem,
+                    timestamp=bucket_ts,
+                    # NULL on buckets rolled up before worst_status existed
+                    status=rollups.STATUSES[worst or 0],
+                ),
+                rowid,
+            ))
+    return out
+
+# ---- compaction ---------------------------------------------------------------
+
+def _delete_in_batches(db: Session, stmt_for_batch: Callable[[int], object], cfg: RetentionConfig, budget: List[int]) -> int:
+    deleted = 0
+    while budget[0] > 0:
+        n = db.execute(stmt_for_batch(cfg.delete_batch_size)).rowcount
+        db.commit()
+        budget[0] -= 1
+        deleted += n
+        if n < cfg.delete_batch_size:
+            break
+        # let ingest grab the write lock between batches
+        time.sleep(cfg.pause_between_batches_s)
+    return deleted
+
+def compact_once(db: Session, cfg: RetentionConfig, now: Optional[float] = None) -> Dict[str, int]:
+    """
+    One bounded compaction pass. Raw rows are only deleted while rollups are
+    maintained on ingest, otherwise they would be the only copy of the data.
+    """
+    h = horizons(cfg, now)
+    budget = [cfg.max_batches_per_run]
+    report: Dict[str, int] = {}
+
+    T = TelemetryEventRow
+    if rollups.enabled:
+        report["raw"] = _delete_in_batches(db, lambda n: delete(T).where(
+            T.id.in_(select(T.id).where(T.timestamp < h.raw).limit(n))
+        ), cfg, budget)
+    else:
+        log.warning("rollups are disabled; keeping raw telemetry past its retention")
+
+    R = TelemetryRollupRow
+    for res, oldest in sorted(h.tiers.items()):
+        report[f"rollup_{res}s"] = _delete_in_batches(db, lambda n, res=res, oldest=oldest: delete(R).where(
+            _ROWID.in_(select(_ROWID).where(R.resolution_s == res, R.bucket_ts < oldest).limit(n))
+        ), cfg, budget)
+
+    # per-minute sketches live as long as the finest rollup tier
+    finest = min(h.tiers) if h.tiers else None
+    if finest is not None:
+        S = TelemetrySketchRow
+        sketch_rowid = literal_column("telemetry_sketches.rowid")
+        report["sketches"] = _delete_in_batches(db, lambda n: delete(S).where(
+            sketch_rowid.in_(select(sketch_rowid).where(S.bucket_ts < h.tiers[finest]).limit(n))
+        ), cfg, budget)
+
+    if cfg.vacuum_pages_per_run and db.get_bind().dialect.name == "sqlite":
+        db.execute(text(f"PRAGMA incremental_vacuum({int(cfg.vacuum_pages_per_run)})"))
+        db.commit()
+    return report
+
+class RetentionCompactor:
+    """Runs compact_once every `interval_s` on a daemon thread."""
+
+    def __init__(self, session_factory: Callable[[], Session], cfg: RetentionConfig):
+        self.session_factory = session_factory
+        self.cfg = cfg
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_report: Dict[str, int] = {}
+        self.last_run_ts: Optional[int] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="retention-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_s: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout_s)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.cfg.interval_s):
+            try:
+                with self.session_factory() as db:
+                    self.last_report = compact_once(db, self.cfg)
+                self.last_run_ts = int(time.time())
+            except Exception:
+                log.exception("retention compaction failed")
+
+def main():
+    from .db import SessionLocal, engine, init_db
+    from .settings import load_config
+
+    p = argparse.ArgumentParser(description="Telemetry retention maintenance")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("compact", help="Run one compaction pass with the configured tiers")
+    sub.add_parser("vacuum", help="Enable incremental auto_vacuum on an existing DB (rewrites the file)")
+    args = p.parse_args()
+
+    if args.cmd == "compact":
+        config = load_config()
+        if not config.retention.enabled:
+            p.error("retention is disabled in the config")
+        if config.storage.engine != "sqlite":
+            p.error(f"compaction only runs on the sqlite engine, not {config.storage.engine!r}")
+        # raw rows are only deleted when the rollups hold a copy of them
+        rollups.enabled = config.rollups.enabled
+        init_db()
+        with SessionLocal() as db:
+            print(compact_once(db, config.retention))
+    elif args.cmd == "vacuum":
+        init_db()
+        with engine.connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.exec_driver_sql("VACUUM")
+        print("auto_vacuum set to INCREMENTAL")
+
+if __name__ == "__main__":
+    main()
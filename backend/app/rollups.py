@@ -0,0 +1,318 @@
+"""
+Incrementally maintained 1m / 5m / 1h rollups of telemetry_events.
+
+Ingest folds every batch into the rollup table inside the same transaction
+as the raw insert, so /stats can answer long windows from a handful of
+pre-aggregated buckets and only scan raw rows at the unaligned edges.
+
+Backfill existing data with:
+    python -m backend.app.rollups backfill [--start-ts N] [--end-ts N]
+"""
+import argparse
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .db_models import TelemetryEventRow, TelemetryRollupRow
+from .stats_models import NodeStats
+
+# coarsest first, the query planner relies on this order
+RESOLUTIONS: Tuple[int, ...] = (3600, 300, 60)
+
+# event field -> rollup column prefix; each keeps <prefix>_sum/_comp/_min/_max
+_SUM_METRICS = {
+    "latency_ms": "latency",
+    "packet_loss": "packet_loss",
+    "throughput_mbps": "throughput",
+    "cpu_pct": "cpu",
+    "mem_pct": "mem",
+}
+_MINMAX = [(field, f"{prefix}_min", f"{prefix}_max") for field, prefix in _SUM_METRICS.items()]
+
+# index = severity; worst_status keeps the max over a bucket's events
+STATUSES = ("OK", "WARN", "CRITICAL")
+_SEVERITY = {s: i for i, s in enumerate(STATUSES)}
+
+# Toggled from settings at startup; when off, ingest skips rollups and /stats reads raw rows
+enabled = True
+
+def _neumaier_add(s_col, c_col, x):
+    """SQL for (s + x, c + compensation) - every SET expression sees the old row."""
+    t = s_col + x
+    comp = c_col + case(
+        (func.abs(s_col) >= func.abs(x), (s_col - t) + x),
+        else_=(x - t) + s_col,
+    )
+    return t, comp
+
+def apply_rollups(db: Session, events: Iterable) -> None:
+    """Fold a batch of events into every rollup resolution (caller commits)."""
+    acc: Dict[Tuple[int, str, int], dict] = {}
+    values: Dict[Tuple[int, str, int], Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+
+    for e in events:
+        ts = e.timestamp
+        for res in RESOLUTIONS:
+            key = (res, e.node, ts - ts % res)
+            a = acc.get(key)
+            if a is None:
+                acc[key] = a = {
+                    "resolution_s": res, "node": e.node, "bucket_ts": key[2], "count": 0,
+                    "first_ts": ts, "last_ts": ts, "worst_status": 0,
+                }
+                for field, lo, hi in _MINMAX:
+                    a[lo] = a[hi] = getattr(e, field)
+            a["count"] += 1
+            a["first_ts"] = min(a["first_ts"], ts)
+            a["last_ts"] = max(a["last_ts"], ts)
+            severity = _SEVERITY[e.status]
+            if severity > a["worst_status"]:
+                a["worst_status"] = severity
+            vals = values[key]
+            for field, lo, hi in _MINMAX:
+                v = getattr(e, field)
+                vals[field].append(v)
+                if v < a[lo]:
+                    a[lo] = v
+                if v > a[hi]:
+                    a[hi] = v
+
+    if not acc:
+        return
+
+    rows = []
+    for key, a in acc.items():
+        for field, prefix in _SUM_METRICS.items():
+            a[f"{prefix}_sum"] = math.fsum(values[key][field])
+            a[f"{prefix}_comp"] = 0.0
+        rows.append(a)
+
+    t = TelemetryRollupRow.__table__
+    stmt = sqlite_insert(t)
+    ex = stmt.excluded
+    set_ = {
+        "count": t.c.count + ex.count,
+        "first_ts": func.min(t.c.first_ts, ex.first_ts),
+        "last_ts": func.max(t.c.last_ts, ex.last_ts),
+        "worst_status": func.max(t.c.worst_status, ex.worst_status),
+    }
+    for _, lo, hi in _MINMAX:
+        # scalar min/max of NULL stay NULL: a bucket from before the column existed stays unknown
+        set_[lo] = func.min(t.c[lo], ex[lo])
+        set_[hi] = func.max(t.c[hi], ex[hi])
+    for prefix in _SUM_METRICS.values():
+        s, c = _neumaier_add(t.c[f"{prefix}_sum"], t.c[f"{prefix}_comp"], ex[f"{prefix}_sum"])
+        set_[f"{prefix}_sum"] = s
+        set_[f"{prefix}_comp"] = c
+    stmt = stmt.on_conflict_do_update(index_elements=["resolution_s", "node", "bucket_ts"], set_=set_)
+    db.execute(stmt, rows)
+
+def plan(start_ts: int, end_ts: int, resolutions: Tuple[int, ...] = RESOLUTIONS):
+    """
+    Split the inclusive range [start_ts, end_ts] into rollup segments
+    (resolution, first_bucket, end_bucket_exclusive) using the coarsest
+    resolution that fits, recursing into finer ones for the edges. Whatever
+    no bucket can cover exactly is returned as inclusive raw ranges.
+    """
+    if start_ts > end_ts:
+        return [], []
+    if not resolutions:
+        return [], [(start_ts, end_ts)]
+
+    res, finer = resolutions[0], resolutions[1:]
+    a = -(-start_ts // res) * res
+    b = ((end_ts + 1) // res) * res
+    if a >= b:
+        return plan(start_ts, end_ts, finer)
+
+    left_segs, left_raw = plan(start_ts, a - 1, finer)
+    right_segs, right_raw = plan(b, end_ts, finer)
+    return left_segs + [(res, a, b)] + right_segs, left_raw + right_raw
+
+class _Partial:
+    __slots__ = ("count", "sums", "lat_min", "lat_max", "first_ts", "last_ts")
+
+    def __init__(self):
+        self.count = 0
+        self.sums: Dict[str, List[float]] = defaultdict(list)
+        self.lat_min: Optional[float] = None
+        self.lat_max: Optional[float] = None
+        self.first_ts: Optional[int] = None
+        self.last_ts: Optional[int] = None
+
+    def merge(self, count, sums, lat_min, lat_max, first_ts, last_ts):
+        self.count += count
+        for prefix, parts in sums.items():
+            self.sums[prefix].extend(parts)
+        self.lat_min = lat_min if self.lat_min is None else min(self.lat_min, lat_min)
+        self.lat_max = lat_max if self.lat_max is None else max(self.lat_max, lat_max)
+        self.first_ts = first_ts if self.first_ts is None else min(self.first_ts, first_ts)
+        self.last_ts = last_ts if self.last_ts is None else max(self.last_ts, last_ts)
+
+    def avg(self, prefix: str) -> float:
+        return math.fsum(self.sums[prefix]) / self.count
+
+def _filter_nodes(stmt, col, nodes):
+    return stmt.where(col.in_(nodes)) if nodes else stmt
+
+def plan_zones(zones: List[Tuple[Optional[int], int, int]]):
+    """
+    plan() over retention zones (see retention.zones). A zone whose raw rows
+    have been compacted away is read only from rollups of its own resolution
+    or coarser, its unaligned ends widened to whole buckets.
+    """
+    segments, raw_ranges = [], []
+    for res, lo, hi in zones:
+        if res is None:
+            s, r = plan(lo, hi)
+        else:
+            lo, hi = lo - lo % res, hi - hi % res + res - 1
+            s, r = plan(lo, hi, tuple(x for x in RESOLUTIONS if x >= res))
+        segments += s
+        raw_ranges += r
+    return segments, raw_ranges
+
+def node_stats(
+    db: Session,
+    nodes: Optional[List[str]],
+    start_ts: int,
+    end_ts: int,
+    zones: Optional[List[Tuple[Optional[int], int, int]]] = None,
+) -> List[NodeStats]:
+    """
+    Same result as the raw GROUP BY in crud.get_node_stats, read mostly from
+    rollups. With retention `zones` the range beyond the raw horizon is
+    answered at the coarser granularity that is still retained.
+    """
+    if zones is None:
+        segments, raw_ranges = plan(start_ts, end_ts)
+    else:
+        segments, raw_ranges = plan_zones(zones)
+    partials: Dict[str, _Partial] = defaultdict(_Partial)
+
+    R = TelemetryRollupRow
+    for res, a, b in segments:
+        cols = [R.node, func.sum(R.count), func.min(R.latency_min), func.max(R.latency_max),
+                func.min(R.first_ts), func.max(R.last_ts)]
+        for prefix in _SUM_METRICS.values():
+            cols += [func.sum(R.__table__.c[f"{prefix}_sum"]), func.sum(R.__table__.c[f"{prefix}_comp"])]
+        stmt = select(*cols).where(R.resolution_s == res, R.bucket_ts >= a, R.bucket_ts < b)
+        stmt = _filter_nodes(stmt, R.node, nodes).group_by(R.node)
+        for row in db.execute(stmt):
+            node, count, lmin, lmax, first, last = row[:6]
+            sums = {p: [row[6 + 2 * i], row[7 + 2 * i]] for i, p in enumerate(_SUM_METRICS.values())}
+            partials[node].merge(count, sums, lmin, lmax, first, last)
+
+    T = TelemetryEventRow
+    for lo, hi in raw_ranges:
+        cols = [T.node, func.count(T.id), func.min(T.latency_ms), func.max(T.latency_ms),
+                func.min(T.timestamp), func.max(T.timestamp)]
+        cols += [func.sum(getattr(T, field)) for field in _SUM_METRICS]
+        stmt = select(*cols).where(T.timestamp >= lo, T.timestamp <= hi)
+        stmt = _filter_nodes(stmt, T.node, nodes).group_by(T.node)
+        for row in db.execute(stmt):
+            node, count, lmin, lmax, first, last = row[:6]
+            sums = {p: [row[6 + i]] for i, p in enumerate(_SUM_METRICS.values())}
+            partials[node].merge(count, sums, lmin, lmax, first, last)
+
+    out: List[NodeStats] = []
+    for node in sorted(partials):
+        p = partials[node]
+        if not p.count:
+            continue
+        out.append(NodeStats(
+            node=node,
+            count=p.count,
+            latency_avg=p.avg("latency"),
+            latency_min=p.lat_min,
+            latency_max=p.lat_max,
+            packet_loss_avg=p.avg("packet_loss"),
+            throughput_avg=p.avg("throughput"),
+            cpu_avg=p.avg("cpu"),
+            mem_avg=p.avg("mem"),
+            first_ts=p.first_ts,
+            last_ts=p.last_ts,
+        ))
+    return out
+
+def backfill(db: Session, start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> int:
+    """
+    Rebuild rollups from raw rows. The range is widened to whole hours so
+    every bucket it touches is recomputed from complete data.
+    Returns the number of rollup rows written.
+    """
+    coarsest = RESOLUTIONS[0]
+    lo = None if start_ts is None else start_ts - start_ts % coarsest
+    hi = None if end_ts is None else end_ts - end_ts % coarsest + coarsest - 1
+
+    R = TelemetryRollupRow
+    d = delete(R)
+    if lo is not None:
+        d = d.where(R.bucket_ts >= lo)
+    if hi is not None:
+        d = d.where(R.bucket_ts <= hi)
+    db.execute(d)
+
+    where = []
+    params = {}
+    if lo is not None:
+        where.append("timestamp >= :lo")
+        params["lo"] = lo
+    if hi is not None:
+        where.append("timestamp <= :hi")
+        params["hi"] = hi
+    where_sql = ("WHERE " + " AND ".join(where)) if where else ""
+
+    metric_cols = ", ".join(f"{p}_sum, {p}_comp, {p}_min, {p}_max" for p in _SUM_METRICS.values())
+    metric_aggs = ", ".join(f"SUM({f}), 0.0, MIN({f}), MAX({f})" for f in _SUM_METRICS)
+    severity = "CASE status " + " ".join(f"WHEN '{s}' THEN {i}" for i, s in enumerate(STATUSES)) + " END"
+    written = 0
+    for res in RESOLUTIONS:
+        result = db.execute(text(f"""
+            INSERT INTO telemetry_rollups (
+                resolution_s, node, bucket_ts, count, {metric_cols}, first_ts, last_ts, worst_status
+            )
+            SELECT
+                {res}, node, (timestamp / {res}) * {res}, COUNT(*), {metric_aggs},
+                MIN(timestamp), MAX(timestamp), MAX({severity})
+            FROM telemetry_events
+            {where_sql}
+            GROUP BY node, (timestamp / {res})
+        """), params)
+        written += result.rowcount
+    db.commit()
+    return written
+
+def ensure_backfilled(db: Session) -> bool:
+    """Backfill once if raw telemetry exists but no rollups do (e.g. upgraded database)."""
+    has_rollups = db.execute(select(TelemetryRollupRow.node).limit(1)).first() is not None
+    if has_rollups:
+        return False
+    has_raw = db.execute(select(TelemetryEventRow.id).limit(1)).first() is not None
+    if not has_raw:
+        return False
+    backfill(db)
+    return True
+
+def main():
+    from .db import SessionLocal, init_db
+
+    p = argparse.ArgumentParser(description="Maintain telemetry rollup tables")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    bf = sub.add_parser("backfill", help="Recompute rollups from raw telemetry_events")
+    bf.add_argument("--start-ts", type=int)
+    bf.add_argument("--end-ts", type=int)
+    args = p.parse_args()
+
+    init_db()
+    with SessionLocal() as db:
+        if args.cmd == "backfill":
+            n = backfill(db, args.start_ts, args.end_ts)
+            print(f"wrote {n} rollup rows")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import json
+import operator
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Literal, Optional, Tuple
+
+import yaml
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from simulator.models import TelemetryEvent
+from . import crud, metrics, pubsub
+from .db_models import AlertRow
+
+Metric = Literal["latency_ms", "packet_loss", "throughput_mbps", "cpu_pct", "mem_pct"]
+
+_OPS: Dict[str, Callable[[float, float], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+class RuleConfig(BaseModel):
+    id: str
+    metric: Metric
+    op: Literal[">", ">=", "<", "<="] = ">="
+    threshold: float
+    severity: Literal["INFO", "WARN", "CRITICAL"] = "WARN"
+    message: str = "{metric} {op} {threshold}: {value}"  # str.format fields: value, node, metric, op, threshold
+    cooldown_s: int = Field(default=30, ge=0)
+    auto_resolve: bool = False  # resolve the open alert on the first event that no longer matches
+
+class RulesFile(BaseModel):
+    rules: List[RuleConfig] = Field(default_factory=list)
+
+# Same thresholds the /ingest handler used to hardcode
+DEFAULT_RULES: List[RuleConfig] = [
+    RuleConfig(id="latency_high", metric="latency_ms", threshold=200, severity="WARN",
+               message="High latency: {value:.1f} ms"),
+    RuleConfig(id="packet_loss_high", metric="packet_loss", threshold=0.02, severity="WARN",
+               message="High packet loss: {value:.3f}"),
+    RuleConfig(id="cpu_high", metric="cpu_pct", threshold=90, severity="CRITICAL",
+               message="High CPU: {value:.1f}%"),
+]
+
+def load_rules(path: Optional[str] = None) -> List[RuleConfig]:
+    """Load rules from a YAML or JSON file; no path means DEFAULT_RULES."""
+    if not path:
+        return list(DEFAULT_RULES)
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f) if path.endswith(".json") else (yaml.safe_load(f) or {})
+    return RulesFile.model_validate(data).rules
+
+@dataclass
+class CompiledRule:
+    cfg: RuleConfig
+    get_value: Callable[[TelemetryEvent], float]
+    matches: Callable[[float], bool]
+
+def compile_rule(cfg: RuleConfig) -> CompiledRule:
+    cmp = _OPS[cfg.op]
+    threshold = cfg.threshold
+    return CompiledRule(
+        cfg=cfg,
+        get_value=operator.attrgetter(cfg.metric),
+        matches=lambda v: cmp(v, threshold),
+    )
+
+@dataclass
+class AlertState:
+    alert_id: int
+    created_ts: int
+
+class RuleEngine:
+    """
+    Evaluates compiled threshold rules against ingested events.
+
+    Open-alert state per (node, rule_id) lives in memory (warmed from the
+    alerts table), so the common path - no rule firing, or firing inside
+    the cooldown - runs no queries. The DB is only written when an alert
+    opens or is resolved.
+    """
+
+    def __init__(self, rules: List[RuleConfig]):
+        ids = [r.id for r in rules]
+        if len(ids) != len(set(ids)):
+            raise ValueError("Duplicate rule ids in rule set")
+        self.rules = [compile_rule(r) for r in rules]
+        self._state: Dict[Tuple[str, str], AlertState] = {}
+        self._lock = threading.Lock()
+
+    def warm(self, db: Session) -> None:
+        """Rebuild open-alert state from the alerts table (newest alert per key wins)."""
+        state = {(r.node, r.rule_id): AlertState(r.id, r.created_ts) for r in crud.active_alerts(db)}
+        with self._lock:
+            self._state = state
+
+    def evaluate(self, db: Session, event: TelemetryEvent) -> List[AlertRow]:
+        """Run every rule against one event; returns alerts opened by it."""
+        opened: List[AlertRow] = []
+        node = event.node
+        for rule in self.rules:
+            value = rule.get_value(event)
+            cfg = rule.cfg
+            key = (node, cfg.id)
+            if rule.matches(value):
+                state = self._state.get(key)
+                if state is not None and (event.timestamp - state.created_ts) < cfg.cooldown_s:
+                    metrics.alerts.inc((cfg.id, "suppressed"))
+                    continue
+                with self._lock:
+                    # re-check under the lock so concurrent ingests open one alert
+                    state = self._state.get(key)
+                    if state is not None and (event.timestamp - state.created_ts) < cfg.cooldown_s:
+                        metrics.alerts.inc((cfg.id, "suppressed"))
+                        continue
+                    message = cfg.message.format(
+                        value=value, node=node, metric=cfg.metric, op=cfg.op, threshold=cfg.threshold
+                    )
+                    row = crud.create_alert(db, node, cfg.id, cfg.severity, message)
+                    self._state[key] = AlertState(row.id, row.created_ts)
+                metrics.alerts.inc((cfg.id, "opened"))
+                pubsub.broker.publish_alert("opened", pubsub.alert_payload(row))
+                opened.append(row)
+            elif cfg.auto_resolve and key in self._state:
+                with self._lock:
+                    if self._state.pop(key, None) is not None:
+                        metrics.alerts.inc((cfg.id, "resolved"))
+                        for row in crud.resolve_active_alerts(db, node, cfg.id):
+                            pubsub.broker.publish_alert("resolved", pubsub.alert_payload(row))
+        return opened
+
+    def forget(self, alert: AlertRow) -> None:
+        """Drop cached state for an alert resolved outside the engine (e.g. via the API)."""
+        key = (alert.node, alert.rule_id)
+        with self._lock:
+            state = self._state.get(key)
+            if state is not None and state.alert_id == alert.id:
+                del self._state[key]
+
+    def active_count(self) -> int:
+        return len(self._state)
@@ -0,0 +1,425 @@
+"""
+Time-partitioned columnar segment store for telemetry.
+
+An alternative to the row-oriented telemetry_events table, selected with
+`storage.engine: segments`. Events are appended into one segment per
+partition (an hour by default). A segment is a directory holding one packed
+little-endian array per column plus meta.json, which stores the row count,
+the node dictionary (node column = u32 codes into it) and a min/max index
+on timestamp and id used to prune segments before scanning them.
+
+Once ingest moves on to a newer partition, older segments are sealed.
+Their columns are memory-mapped read-only; the maps of the most recently
+scanned segments stay open (each map holds a file descriptor), older ones
+are released.
+Queries are vectorized NumPy scans over the surviving segments. Results
+follow the same ordering and tie-breaking ((timestamp, id) DESC) as the
+SQLite path.
+"""
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from simulator.models import TelemetryEvent
+from .pagination import encode_cursor
+from .stats_models import NodeStats
+
+STATUSES = ("OK", "WARN", "CRITICAL")
+_STATUS_CODE = {s: i for i, s in enumerate(STATUSES)}
+
+METRICS = ("latency_ms", "packet_loss", "throughput_mbps", "cpu_pct", "mem_pct")
+
+# metric -> NodeStats percentile field prefix (same set the sketches cover)
+_PCT_METRICS = {"latency_ms": "latency", "packet_loss": "packet_loss", "throughput_mbps": "throughput"}
+
+COLUMNS: Dict[str, np.dtype] = {
+    "id": np.dtype("<i8"),
+    "timestamp": np.dtype("<i8"),
+    "node": np.dtype("<u4"),
+    **{m: np.dtype("<f8") for m in METRICS},
+    "status": np.dtype("u1"),
+}
+
+# Set from settings at startup; when not None, crud routes telemetry reads/writes here
+active_store: Optional["SegmentStore"] = None
+
+class _Segment:
+    def __init__(self, path: str, start: int):
+        self.path = path
+        self.start = start
+        self.rows = 0
+        self.min_ts: Optional[int] = None
+        self.max_ts: Optional[int] = None
+        self.min_id: Optional[int] = None
+        self.max_id: Optional[int] = None
+        self.nodes: List[str] = []
+        self.node_codes: Dict[str, int] = {}
+        self.sealed = False
+        self._maps: Optional[Dict[str, np.ndarray]] = None
+
+    @classmethod
+    def load(cls, path: str) -> "_Segment":
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        seg = cls(path, meta["start"])
+        seg.rows = meta["rows"]
+        seg.min_ts, seg.max_ts = meta["min_ts"], meta["max_ts"]
+        seg.min_id, seg.max_id = meta["min_id"], meta["max_id"]
+        seg.nodes = meta["nodes"]
+        seg.node_codes = {n: i for i, n in enumerate(seg.nodes)}
+        seg.sealed = meta["sealed"]
+        # drop bytes from an append that crashed before meta.json was updated
+        for name, dtype in COLUMNS.items():
+            col = os.path.join(path, f"{name}.bin")
+            expected = seg.rows * dtype.itemsize
+            if os.path.exists(col) and os.path.getsize(col) > expected:
+                os.truncate(col, expected)
+        return seg
+
+    def save_meta(self) -> None:
+        meta = {
+            "start": self.start,
+            "rows": self.rows,
+            "min_ts": self.min_ts,
+            "max_ts": self.max_ts,
+            "min_id": self.min_id,
+            "max_id": self.max_id,
+            "nodes": self.nodes,
+            "sealed": self.sealed,
+        }
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+    def append(self, events: Sequence[TelemetryEvent], ids: np.ndarray) -> None:
+        n = len(events)
+        codes = np.empty(n, dtype=COLUMNS["node"])
+        for i, e in enumerate(events):
+            code = self.node_codes.get(e.node)
+            if code is None:
+                code = self.node_codes[e.node] = len(self.nodes)
+                self.nodes.append(e.node)
+            codes[i] = code
+
+        cols = {
+            "id": ids.astype(COLUMNS["id"]),
+            "timestamp": np.fromiter((e.timestamp for e in events), COLUMNS["timestamp"], n),
+            "node": codes,
+            "status": np.fromiter((_STATUS_CODE[e.status] for e in events), COLUMNS["status"], n),
+        }
+        for m in METRICS:
+            cols[m] = np.fromiter((getattr(e, m) for e in events), COLUMNS[m], n)
+
+        for name, arr in cols.items():
+            with open(os.path.join(self.path, f"{name}.bin"), "ab") as f:
+                arr.tofile(f)
+
+        ts = cols["timestamp"]
+        self.min_ts = int(ts.min()) if self.min_ts is None else min(self.min_ts, int(ts.min()))
+        self.max_ts = int(ts.max()) if self.max_ts is None else max(self.max_ts, int(ts.max()))
+        self.min_id = int(ids.min()) if self.min_id is None else min(self.min_id, int(ids.min()))
+        self.max_id = int(ids.max()) if self.max_id is None else max(self.max_id, int(ids.max()))
+        self.rows += n
+        # late data reopens a sealed segment
+        self.sealed = False
+        self._maps = None
+        self.save_meta()
+
+    def seal(self) -> None:
+        if not self.sealed:
+            self.sealed = True
+            self.save_meta()
+
+    def columns(self, rows: int) -> Dict[str, np.ndarray]:
+        """Read-only column views of the first `rows` rows (cached once sealed)."""
+        if self._maps is not None and self.sealed:
+            return self._maps
+        maps = {}
+        for name, dtype in COLUMNS.items():
+            if rows == 0:
+                maps[name] = np.empty(0, dtype=dtype)
+            else:
+                maps[name] = np.memmap(os.path.join(self.path, f"{name}.bin"), dtype=dtype, mode="r", shape=(rows,))
+        if self.sealed:
+            self._maps = maps
+        return maps
+
+    def release(self) -> None:
+        """Drop cached maps; their fds close once no scan still references them."""
+        self._maps = None
+
+    def may_match(self, node_set: Optional[set], start_ts: Optional[int], end_ts: Optional[int]) -> bool:
+        if not self.rows:
+            return False
+        if start_ts is not None and self.max_ts < start_ts:
+            return False
+        if end_ts is not None and self.min_ts > end_ts:
+            return False
+        if node_set is not None and node_set.isdisjoint(self.node_codes):
+            return False
+        return True
+
+class SegmentStore:
+    def __init__(self, root: str, partition_s: int = 3600, max_open_segments: int = 64):
+        self.root = root
+        self.partition_s = partition_s
+        self.max_open_segments = max_open_segments
+        self._lock = threading.Lock()
+        self._segments: Dict[int, _Segment] = {}
+        # LRU of sealed segments holding cached maps (one fd per column each)
+        self._open: "OrderedDict[int, _Segment]" = OrderedDict()
+        os.makedirs(root, exist_ok=True)
+        for name in sorted(os.listdir(root)):
+            path = os.path.join(root, name)
+            if name.startswith("seg-") and os.path.exists(os.path.join(path, "meta.json")):
+                seg = _Segment.load(path)
+                self._segments[seg.start] = seg
+        self._next_id = 1 + max((s.max_id for s in self._segments.values() if s.max_id is not None), default=0)
+        self._newest_partition = max(self._segments, default=None)
+
+    # ---- writes -------------------------------------------------------------
+
+    def insert_events(self, events: Sequence[TelemetryEvent]) -> int:
+        if not events:
+            return 0
+        with self._lock:
+            # ids follow arrival order across partitions, like SQLite rowids
+            by_partition: Dict[int, Tuple[List[TelemetryEvent], List[int]]] = {}
+            for i, e in enumerate(events, start=self._next_id):
+                batch, ids = by_partition.setdefault(e.timestamp - e.timestamp % self.partition_s, ([], []))
+                batch.append(e)
+                ids.append(i)
+            self._next_id += len(events)
+
+            for start in sorted(by_partition):
+                seg = self._segments.get(start)
+                if seg is None:
+                    path = os.path.join(self.root, f"seg-{start:012d}")
+                    os.makedirs(path, exist_ok=True)
+                    seg = self._segments[start] = _Segment(path, start)
+                batch, ids = by_partition[start]
+                seg.append(batch, np.asarray(ids, dtype=np.int64))
+
+            newest = max(by_partition)
+            if self._newest_partition is None or newest > self._newest_partition:
+                self._newest_partition = newest
+                for start, seg in self._segments.items():
+                    if start < newest:
+                        seg.seal()
+        return len(events)
+
+    def seal_all(self) -> None:
+        with self._lock:
+            for seg in self._segments.values():
+                seg.seal()
+
+    # ---- scans --------------------------------------------------------------
+
+    def _snapshot(self, nodes, start_ts, end_ts) -> List[Tuple[_Segment, int]]:
+        """Segments that can hold matching rows, newest first, with their row count."""
+        node_set = set(nodes) if nodes else None
+        with self._lock:
+            segs = [(s, s.rows) for s in self._segments.values() if s.may_match(node_set, start_ts, end_ts)]
+        segs.sort(key=lambda x: x[0].max_ts, reverse=True)
+        return segs
+
+    def _columns(self, seg: _Segment, rows: int) -> Dict[str, np.ndarray]:
+        cols = seg.columns(rows)
+        if seg._maps is not None:
+            with self._lock:
+                self._open[seg.start] = seg
+                self._open.move_to_end(seg.start)
+                while len(self._open) > self.max_open_segments:
+                    self._open.popitem(last=False)[1].release()
+        return cols
+
+    @staticmethod
+    def _match(seg: _Segment, cols, nodes, start_ts, end_ts, after=None) -> np.ndarray:
+        ts = cols["timestamp"]
+        mask = np.ones(len(ts), dtype=bool)
+        if start_ts is not None and seg.min_ts < start_ts:
+            mask &= ts >= start_ts
+        if end_ts is not None and seg.max_ts > end_ts:
+            mask &= ts <= end_ts
+        if nodes:
+            codes = [seg.node_codes[n] for n in nodes if n in seg.node_codes]
+            if len(codes) < len(seg.nodes):
+                mask &= np.isin(cols["node"], codes)
+        if after is not None:
+            a_ts, a_id = after
+            mask &= (ts < a_ts) | ((ts == a_ts) & (cols["id"] < a_id))
+        return np.flatnonzero(mask)
+
+    @staticmethod
+    def _event(seg: _Segment, cols, i: int) -> TelemetryEvent:
+        return TelemetryEvent.model_construct(
+            node=seg.nodes[int(cols["node"][i])],
+            latency_ms=float(cols["latency_ms"][i]),
+            packet_loss=float(cols["packet_loss"][i]),
+            throughput_mbps=float(cols["throughput_mbps"][i]),
+            cpu_pct=float(cols["cpu_pct"][i]),
+            mem_pct=float(cols["mem_pct"][i]),
+            timestamp=int(cols["timestamp"][i]),
+            status=STATUSES[int(cols["status"][i])],
+        )
+
+    def _top(self, nodes, start_ts, end_ts, k: int, after=None):
+        """The k newest matching rows as [(segment, columns, row_index)], (ts, id) DESC."""
+        best_ts = np.empty(0, dtype=np.int64)
+        best_id = np.empty(0, dtype=np.int64)
+        refs: List[Tuple[_Segment, dict, int]] = []
+        for seg, rows in self._snapshot(nodes, start_ts, end_ts):
+            # segments come newest-max_ts first; stop once none can beat the k-th row
+            if len(refs) >= k and seg.max_ts < best_ts[k - 1]:
+                break
+            cols = self._columns(seg, rows)
+            idx = self._match(seg, cols, nodes, start_ts, end_ts, after)
+            if not len(idx):
+                continue
+            ts = np.asarray(cols["timestamp"][idx])
+            ids = np.asarray(cols["id"][idx])
+            order = np.lexsort((ids, ts))[::-1][:k]
+
+            all_ts = np.concatenate([best_ts, ts[order]])
+            all_id = np.concatenate([best_id, ids[order]])
+            all_refs = refs + [(seg, cols, int(idx[j])) for j in order]
+            keep = np.lexsort((all_id, all_ts))[::-1][:k]
+            best_ts, best_id = all_ts[keep], all_id[keep]
+            refs = [all_refs[j] for j in keep]
+        return refs
+
+    # ---- crud-equivalent reads ---------------------------------------------
+
+    def get_latest(self, node: Optional[str] = None) -> Optional[TelemetryEvent]:
+        refs = self._top([node] if node else None, None, None, 1)
+        return self._event(*refs[0]) if refs else None
+
+    def get_history(self, node: str, limit: int = 100) -> List[TelemetryEvent]:
+        refs = self._top([node], None, None, limit)
+        return [self._event(*r) for r in reversed(refs)]
+
+    def query_events_page(
+        self,
+        nodes: Optional[List[str]] = None,
+        start_ts: Optional[int] = None,
+        end_ts: Optional[int] = None,
+        limit: int = 200,
+        offset: int = 0,
+        after: Optional[Tuple[int, int]] = None,
+    ) -> Tuple[List[TelemetryEvent], Optional[str]]:
+        refs = self._top(nodes, start_ts, end_ts, offset + limit, after)[offset:]
+        next_cursor = None
+        if len(refs) == limit:
+            seg, cols, i = refs[-1]
+            next_cursor = encode_cursor(int(cols["timestamp"][i]), int(cols["id"][i]))
+        return [self._event(*r) for r in refs], next_cursor
+
+    def get_node_stats(
+        self,
+        nodes: Optional[List[str]] = None,
+        start_ts: Optional[int] = None,
+        end_ts: Optional[int] = None,
+        percentiles: bool = True,
+    ) -> List[NodeStats]:
+        acc: Dict[str, dict] = {}
+        values: Dict[str, Dict[str, List[np.ndarray]]] = {}
+
+        for seg, rows in self._snapshot(nodes, start_ts, end_ts):
+            cols = self._columns(seg, rows)
+            idx = self._match(seg, cols, nodes, start_ts, end_ts)
+            if not len(idx):
+                continue
+            codes = np.asarray(cols["node"][idx])
+            order = np.argsort(codes, kind="stable")
+            sorted_codes = codes[order]
+            starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+            group_codes = sorted_codes[starts]
+            counts = np.diff(np.r_[starts, len(sorted_codes)])
+
+            ts = np.asarray(cols["timestamp"][idx])[order]
+            lat = np.asarray(cols["latency_ms"][idx])[order]
+            first = np.minimum.reduceat(ts, starts)
+            last = np.maximum.reduceat(ts, starts)
+            lat_min = np.minimum.reduceat(lat, starts)
+            lat_max = np.maximum.reduceat(lat, starts)
+            sums = {m: np.add.reduceat(np.asarray(cols[m][idx])[order], starts) for m in METRICS}
+
+            for g, code in enumerate(group_codes):
+                node = seg.nodes[int(code)]
+                a = acc.get(node)
+                if a is None:
+                    a = acc[node] = {"count": 0, "sums": {m: [] for m in METRICS},
+                                     "lat_min": math.inf, "lat_max": -math.inf,
+                                     "first_ts": None, "last_ts": None}
+                a["count"] += int(counts[g])
+                for m in METRICS:
+                    a["sums"][m].append(float(sums[m][g]))
+                a["lat_min"] = min(a["lat_min"], float(lat_min[g]))
+                a["lat_max"] = max(a["lat_max"], float(lat_max[g]))
+                a["first_ts"] = int(first[g]) if a["first_ts"] is None else min(a["first_ts"], int(first[g]))
+                a["last_ts"] = int(last[g]) if a["last_ts"] is None else max(a["last_ts"], int(last[g]))
+
+            if percentiles:
+                bounds = np.r_[starts, len(sorted_codes)]
+                for g, code in enumerate(group_codes):
+                    per_node = values.setdefault(seg.nodes[int(code)], {m: [] for m in _PCT_METRICS})
+                    sl = order[bounds[g]:bounds[g + 1]]
+                    for m in _PCT_METRICS:
+                        per_node[m].append(np.asarray(cols[m][idx])[sl])
+
+        out: List[NodeStats] = []
+        for node in sorted(acc):
+            a = acc[node]
+            n = a["count"]
+            st = NodeStats(
+                node=node,
+                count=n,
+                latency_avg=math.fsum(a["sums"]["latency_ms"]) / n,
+                latency_min=a["lat_min"],
+                latency_max=a["lat_max"],
+                packet_loss_avg=math.fsum(a["sums"]["packet_loss"]) / n,
+                throughput_avg=math.fsum(a["sums"]["throughput_mbps"]) / n,
+                cpu_avg=math.fsum(a["sums"]["cpu_pct"]) / n,
+                mem_avg=math.fsum(a["sums"]["mem_pct"]) / n,
+                first_ts=a["first_ts"],
+                last_ts=a["last_ts"],
+            )
+            if percentiles and node in values:
+                for m, prefix in _PCT_METRICS.items():
+                    arr = np.concatenate(values[node][m])
+                    for q in (0.5, 0.95, 0.99):
+                        # exact value at rank floor(q*(n-1)), the rank the sketches approximate
+                        k = int(q * (len(arr) - 1))
+                        setattr(st, f"{prefix}_p{round(q * 100)}", float(np.partition(arr, k)[k]))
+            out.append(st)
+        return out
+
+    def iter_chunks(
+        self,
+        nodes: Optional[List[str]] = None,
+        start_ts: Optional[int] = None,
+        end_ts: Optional[int] = None,
+        chunk_size: int = 5000,
+    ) -> Iterator[List[tuple]]:
+        """Export rows oldest->newest as column tuples (see export.COLUMNS)."""
+        segs = sorted(self._snapshot(nodes, start_ts, end_ts), key=lambda x: x[0].start)
+        for seg, rows in segs:
+            cols = self._columns(seg, rows)
+            idx = self._match(seg, cols, nodes, start_ts, end_ts)
+            idx = idx[np.lexsort((cols["id"][idx], cols["timestamp"][idx]))]
+            for lo in range(0, len(idx), chunk_size):
+                part = idx[lo:lo + chunk_size]
+                node_names = [seg.nodes[c] for c in cols["node"][part].tolist()]
+                statuses = [STATUSES[c] for c in cols["status"][part].tolist()]
+                yield list(zip(
+                    node_names,
+                    *[cols[m][part].tolist() for m in METRICS],
+                    cols["timestamp"][part].tolist(),
+                    statuses,
+                ))
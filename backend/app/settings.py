@@ -0,0 +1,121 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, List, Literal, Optional
+import os
+import yaml
+
+class IngestQueueConfig(BaseModel):
+    enabled: bool = False  # False = commit synchronously inside the request
+    max_size: int = Field(default=10_000, gt=0)
+    batch_size: int = Field(default=500, gt=0)  # flush when this many events are waiting
+    flush_interval_ms: int = Field(default=50, gt=0)  # ...or when the oldest has waited this long
+    backpressure: Literal["block", "reject", "drop_oldest"] = "block"
+    block_timeout_s: float = Field(default=5.0, gt=0)  # "block" gives up with 429 after this
+
+class AlertingConfig(BaseModel):
+    rules_path: Optional[str] = None  # YAML/JSON rule file; None = built-in default rules
+
+class CacheConfig(BaseModel):
+    enabled: bool = True
+    max_nodes: int = Field(default=10_000, gt=0)  # LRU bound on cached nodes
+    max_events_per_node: int = Field(default=256, gt=0)  # deeper /history reads go to the DB
+
+class ResponseCacheConfig(BaseModel):
+    enabled: bool = True  # cache encoded /stats, /history and /alerts bodies (with ETags)
+    max_entries: int = Field(default=2048, gt=0)
+    max_bytes: int = Field(default=32 * 1024 * 1024, gt=0)
+    ttl_s: float = Field(default=5.0, gt=0)  # upper bound on staleness from writes this process can't see
+
+class RollupConfig(BaseModel):
+    enabled: bool = True  # maintain 1m/5m/1h rollups on ingest and use them for /stats
+    backfill_on_startup: bool = True  # build rollups once if the DB has raw rows but none
+
+class SketchConfig(BaseModel):
+    enabled: bool = True  # per-minute DDSketches for p50/p95/p99 in /stats
+    backfill_on_startup: bool = True
+
+class StorageConfig(BaseModel):
+    engine: Literal["sqlite", "segments", "sharded"] = "sqlite"  # where telemetry events live
+    segments_path: str = "./segments"
+    partition_s: int = Field(default=3600, gt=0)  # one segment per partition
+    max_open_segments: int = Field(default=64, gt=0)  # sealed segments kept memory-mapped
+    # sharded: telemetry and alerts spread over this many SQLite files by node
+    shards: int = Field(default=4, gt=0)
+    shard_path: str = "./shards/telemetry-{shard}.db"
+
+    @model_validator(mode="after")
+    def _shard_path_has_placeholder(self):
+        if self.engine == "sharded" and "{shard}" not in self.shard_path:
+            raise ValueError("storage.shard_path must contain {shard}")
+        return self
+
+class RetentionTier(BaseModel):
+    resolution_s: Literal[60, 300, 3600]  # one of the rollup resolutions
+    keep_s: int = Field(gt=0)
+
+class RetentionConfig(BaseModel):
+    enabled: bool = False  # needs rollups: raw rows are only deleted while rollups keep their aggregates
+    raw_keep_s: int = Field(default=48 * 3600, gt=0)
+    tiers: List[RetentionTier] = Field(default_factory=lambda: [
+        RetentionTier(resolution_s=60, keep_s=30 * 86400),
+        RetentionTier(resolution_s=300, keep_s=90 * 86400),
+        RetentionTier(resolution_s=3600, keep_s=365 * 86400),
+    ])
+    interval_s: float = Field(default=60.0, gt=0)  # time between compaction passes
+    delete_batch_size: int = Field(default=5000, gt=0)  # rows per DELETE transaction
+    max_batches_per_run: int = Field(default=100, gt=0)  # caps the work done in one pass
+    pause_between_batches_s: float = Field(default=0.01, ge=0)
+    vacuum_pages_per_run: int = Field(default=1000, ge=0)  # PRAGMA incremental_vacuum(N); 0 = never
+
+    @model_validator(mode="after")
+    def _tiers_outlive_raw(self):
+        for t in self.tiers:
+            if t.keep_s < self.raw_keep_s:
+                raise ValueError(f"retention tier {t.resolution_s}s must be kept at least as long as raw rows")
+        return self
+
+class AnomalyConfig(BaseModel):
+    enabled: bool = False  # EWMA baselines per node/metric next to the threshold rules
+    season_s: Optional[int] = Field(default=None, gt=0)  # e.g. 86400: separate baselines per time-of-day bucket
+    season_buckets: int = Field(default=24, ge=1)
+    half_life_events: float = Field(default=30.0, gt=0)  # baseline memory, in events per node and bucket
+    warmup_events: int = Field(default=20, ge=1)  # no alerts from a bucket until it has seen this many events
+    z_open: float = Field(default=4.0, gt=0)
+    z_resolve: float = 2.0
+    z_critical: float = Field(default=10.0, gt=0)
+    consecutive: int = Field(default=3, ge=1)  # events in a row to open / resolve
+    clamp_z: float = Field(default=3.0, gt=0)  # deviations folded into the baseline are capped here
+    min_std: Dict[str, float] = Field(default_factory=lambda: {
+        "latency_ms": 2.0, "packet_loss": 0.002, "throughput_mbps": 20.0, "cpu_pct": 2.0, "mem_pct": 2.0,
+    })
+    checkpoint_interval_s: float = Field(default=60.0, gt=0)
+
+class StreamConfig(BaseModel):
+    enabled: bool = True  # /stream/sse and /stream/ws live push
+    max_subscribers: int = Field(default=10_000, gt=0)
+    max_buffer: int = Field(default=1000, gt=0)  # pending messages per subscriber before it is dropped as slow
+    heartbeat_s: float = Field(default=15.0, gt=0)  # keepalive when nothing was published
+    min_coalesce_ms: int = Field(default=100, gt=0)  # lower bound on a client's coalesce_ms
+
+class BackendConfig(BaseModel):
+    storage: StorageConfig = Field(default_factory=StorageConfig)
+    ingest_queue: IngestQueueConfig = Field(default_factory=IngestQueueConfig)
+    alerting: AlertingConfig = Field(default_factory=AlertingConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    response_cache: ResponseCacheConfig = Field(default_factory=ResponseCacheConfig)
+    rollups: RollupConfig = Field(default_factory=RollupConfig)
+    sketches: SketchConfig = Field(default_factory=SketchConfig)
+    retention: RetentionConfig = Field(default_factory=RetentionConfig)
+    stream: StreamConfig = Field(default_factory=StreamConfig)
+    anomaly: AnomalyConfig = Field(default_factory=AnomalyConfig)
+
+def load_config(path: Optional[str] = None) -> BackendConfig:
+    """
+    Load backend settings from YAML. The path defaults to $BACKEND_CONFIG;
+    with neither set, every setting keeps its default.
+    """
+    path = path or os.environ.get("BACKEND_CONFIG")
+    if not path:
+        return BackendConfig()
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    return BackendConfig.model_validate(data)
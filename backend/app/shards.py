@@ -0,0 +1,356 @@
+"""
+Node-sharded SQLite storage.
+
+`storage.engine: sharded` spreads telemetry (with its rollups and sketches)
+and alerts over `storage.shards` SQLite files. A node always lives in the
+shard picked by crc32(node) % N, so per-node reads touch one file and
+writes to different shards commit in parallel instead of queueing on a
+single SQLite write lock. Each shard has its own engine and connection pool.
+
+Fleet-wide reads fan out over a thread pool: every shard runs the query
+with the limit pushed down (offset + limit rows, newest first) and the
+partial results are merged with a heap on (timestamp, id). Stats need no
+merge because a node never spans shards.
+
+Row ids handed out (event cursors, alert ids) are global ids:
+local_id * N + shard. An alert id alone routes /alerts/{id}/resolve to its
+shard. Ids change when the data is resharded:
+
+    python -m backend.app.shards reshard --from ./telemetry.db --to "./shards/telemetry-{shard}.db" --shards 8
+    python -m backend.app.shards reshard --from "./shards/telemetry-{shard}.db" --from-shards 8 \\
+        --to "./shards16/telemetry-{shard}.db" --shards 16
+
+Sessions on a shard carry info["shard"], which tells crud.py to run its
+plain SQLite path on them rather than routing back here.
+"""
+import argparse
+import heapq
+import os
+import sys
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from operator import itemgetter
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import create_engine, desc, insert, inspect, select, tuple_
+from sqlalchemy.orm import Session, sessionmaker
+
+from simulator.models import TelemetryEvent
+from . import crud, metrics, rollups, sketches
+from .alert_models import AlertOut
+from .db import init_db
+from .db_models import AlertRow, TelemetryEventRow, TelemetryRollupRow, TelemetrySketchRow
+from .export import COLUMNS
+from .pagination import encode_cursor
+from .stats_models import NodeStats
+
+# Set from settings at startup; when not None, crud routes telemetry and alerts here
+active_store: Optional["ShardedStore"] = None
+
+_T = TelemetryEventRow
+_EVENT_COLS = tuple(getattr(_T, c) for c in COLUMNS) + (_T.id,)
+# event rows here are COLUMNS + (global id,)
+_TS = COLUMNS.index("timestamp")
+_EVENT_KEY = itemgetter(_TS, len(COLUMNS))
+_ALERT_KEY = lambda a: (a.created_ts, a.id)  # noqa: E731
+
+def shard_of(node: str, n: int) -> int:
+    # crc32, not hash(): str hashes are salted per process
+    return zlib.crc32(node.encode("utf-8")) % n
+
+def _shard_paths(template: str, n: int) -> List[str]:
+    if "{shard}" not in template:
+        raise ValueError("shard path must contain {shard}")
+    return [template.format(shard=k) for k in range(n)]
+
+class ShardedStore:
+    def __init__(self, path_template: str, n: int):
+        if n < 1:
+            raise ValueError("need at least one shard")
+        self.n = n
+        self.paths = _shard_paths(path_template, n)
+        self.engines = []
+        self.sessions: List[sessionmaker] = []
+        for k, path in enumerate(self.paths):
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False}, future=True)
+            metrics.instrument_engine(engine)
+            init_db(engine)
+            self.engines.append(engine)
+            self.sessions.append(
+                sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True, info={"shard": k})
+            )
+        self._pool = ThreadPoolExecutor(max_workers=n, thread_name_prefix="shard")
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        for engine in self.engines:
+            engine.dispose()
+
+    # ---- routing ------------------------------------------------------------
+
+    def shard_of(self, node: str) -> int:
+        return shard_of(node, self.n)
+
+    def _targets(self, nodes: Optional[Sequence[str]]) -> Dict[int, Optional[List[str]]]:
+        """shard -> the requested nodes living there (None = all nodes)."""
+        if not nodes:
+            return {k: None for k in range(self.n)}
+        out: Dict[int, List[str]] = {}
+        for node in nodes:
+            out.setdefault(self.shard_of(node), []).append(node)
+        return out
+
+    def _run(self, k: int, fn: Callable[[Session, int], object]):
+        with self.sessions[k]() as db:
+            return fn(db, k)
+
+    def _fanout(self, fn: Callable[[Session, int], object], shards) -> list:
+        shards = list(shards)
+        if len(shards) == 1:
+            # no point paying for a thread hop
+            return [self._run(shards[0], fn)]
+        return list(self._pool.map(lambda k: self._run(k, fn), shards))
+
+    def _local_bound(self, gid: int, k: int) -> int:
+        """Smallest local id on shard k whose global id is >= gid: local < bound <=> global < gid."""
+        return (gid - k - 1) // self.n + 1
+
+    # ---- telemetry ----------------------------------------------------------
+
+    def insert_events(self, events: Sequence[TelemetryEvent]) -> int:
+        if not events:
+            return 0
+        groups: Dict[int, List[TelemetryEvent]] = {}
+        for e in events:
+            groups.setdefault(self.shard_of(e.node), []).append(e)
+        # rollups and sketches are maintained per shard by the plain crud path
+        return sum(self._fanout(lambda db, k: crud.insert_events(db, groups[k]), groups))
+
+    def _event_rows(self, db: Session, k: int, nodes, start_ts, end_ts, n: int, after) -> List[tuple]:
+        stmt = select(*_EVENT_COLS)
+        if nodes:
+            stmt = stmt.where(_T.node.in_(nodes))
+        if start_ts is not None:
+            stmt = stmt.where(_T.timestamp >= start_ts)
+        if end_ts is not None:
+            stmt = stmt.where(_T.timestamp <= end_ts)
+        if after is not None:
+            stmt = stmt.where(tuple_(_T.timestamp, _T.id) < tuple_(after[0], self._local_bound(after[1], k)))
+        stmt = stmt.order_by(desc(_T.timestamp), desc(_T.id)).limit(n)
+        return [tuple(r[:-1]) + (r[-1] * self.n + k,) for r in db.execute(stmt)]
+
+    def get_latest(self, node: Optional[str] = None) -> Optional[TelemetryEvent]:
+        if node:
+            return self._run(self.shard_of(node), lambda db, k: crud.get_latest(db, node))
+        parts = self._fanout(lambda db, k: self._event_rows(db, k, None, None, None, 1, None), range(self.n))
+        rows = [p[0] for p in parts if p]
+        if not rows:
+            return None
+        return TelemetryEvent.model_validate(dict(zip(COLUMNS, max(rows, key=_EVENT_KEY))))
+
+    def get_history_rows(self, node: str, limit: int = 100) -> List[tuple]:
+        return self._run(self.shard_of(node), lambda db, k: crud.get_history_rows(db, node, limit))
+
+    def query_event_rows_page(
+        self,
+        nodes: Optional[List[str]],
+        start_ts: Optional[int],
+        end_ts: Optional[int],
+        limit: int,
+        offset: int,
+        after: Optional[Tuple[int, int]],
+    ) -> Tuple[List[tuple], Optional[str]]:
+        targets = self._targets(nodes)
+        want = offset + limit
+        parts = self._fanout(
+            lambda db, k: self._event_rows(db, k, targets[k], start_ts, end_ts, want, after), targets
+        )
+        page = list(islice(heapq.merge(*parts, key=_EVENT_KEY, reverse=True), offset, want))
+        next_cursor = encode_cursor(*_EVENT_KEY(page[-1])) if len(page) == limit else None
+        return [r[:-1] for r in page], next_cursor
+
+    def get_node_stats(
+        self, nodes: Optional[List[str]], start_ts: Optional[int], end_ts: Optional[int]
+    ) -> List[NodeStats]:
+        targets = self._targets(nodes)
+        parts = self._fanout(lambda db, k: crud.get_node_stats(db, targets[k], start_ts, end_ts), targets)
+        return sorted((s for p in parts for s in p), key=lambda s: s.node)
+
+    def iter_chunks(
+        self, nodes: Optional[List[str]], start_ts: Optional[int], end_ts: Optional[int], chunk_size: int
+    ) -> Iterator[Sequence[tuple]]:
+        """export.iter_chunks across shards: oldest->newest, merged on (timestamp, global id)."""
+        targets = self._targets(nodes)
+
+        def stream(k: int) -> Iterator[tuple]:
+            stmt = select(*_EVENT_COLS)
+            if targets[k]:
+                stmt = stmt.where(_T.node.in_(targets[k]))
+            if start_ts is not None:
+                stmt = stmt.where(_T.timestamp >= start_ts)
+            if end_ts is not None:
+                stmt = stmt.where(_T.timestamp <= end_ts)
+            stmt = stmt.order_by(_T.timestamp, _T.id)
+            with self.sessions[k]() as db:
+                result = db.execute(stmt, execution_options={"stream_results": True, "yield_per": chunk_size})
+                for r in result:
+                    yield tuple(r[:-1]) + (r[-1] * self.n + k,)
+
+        merged = heapq.merge(*(stream(k) for k in targets), key=_EVENT_KEY)
+        while True:
+            chunk = [r[:-1] for r in islice(merged, chunk_size)]
+            if not chunk:
+                return
+            yield chunk
+
+    # ---- alerts -------------------------------------------------------------
+
+    def _alert(self, row: Optional[AlertRow], k: int) -> Optional[AlertRow]:
+        """Detached copy of a shard's row carrying the global id."""
+        if row is None:
+            return None
+        return AlertRow(
+            id=row.id * self.n + k,
+            node=row.node,
+            rule_id=row.rule_id,
+            severity=row.severity,
+            message=row.message,
+            created_ts=row.created_ts,
+            resolved_ts=row.resolved_ts,
+            is_active=row.is_active,
+        )
+
+    def create_alert(self, node: str, rule_id: str, severity: str, message: str) -> AlertRow:
+        return self._run(
+            self.shard_of(node),
+            lambda db, k: self._alert(crud.create_alert(db, node, rule_id, severity, message), k),
+        )
+
+    def get_active_alert(self, node: str, rule_id: str) -> Optional[AlertRow]:
+        return self._run(self.shard_of(node), lambda db, k: self._alert(crud.get_active_alert(db, node, rule_id), k))
+
+    def resolve_alert(self, alert_id: int) -> Optional[AlertRow]:
+        k, local = alert_id % self.n, alert_id // self.n
+        return self._run(k, lambda db, _: self._alert(crud.resolve_alert(db, local), k))
+
+    def resolve_active_alerts(self, node: str, rule_id: str) -> List[AlertRow]:
+        return self._run(
+            self.shard_of(node),
+            lambda db, k: [self._alert(r, k) for r in crud.resolve_active_alerts(db, node, rule_id)],
+        )
+
+    def active_alerts(self) -> List["crud.ActiveAlert"]:
+        parts = self._fanout(
+            lambda db, k: [a._replace(id=a.id * self.n + k) for a in crud.active_alerts(db)], range(self.n)
+        )
+        return sorted((a for p in parts for a in p), key=_ALERT_KEY)
+
+    def list_alerts_page(
+        self,
+        node: Optional[str],
+        is_active: Optional[bool],
+        limit: int,
+        offset: int,
+        after: Optional[Tuple[int, int]],
+    ) -> Tuple[List[AlertOut], Optional[str]]:
+        want = offset + limit
+
+        def shard_page(db: Session, k: int) -> List[AlertOut]:
+            local_after = None if after is None else (after[0], self._local_bound(after[1], k))
+            rows, _ = crud.list_alerts_page(db, node=node, is_active=is_active, limit=want, after=local_after)
+            return [a.model_copy(update={"id": a.id * self.n + k}) for a in rows]
+
+        shards = [self.shard_of(node)] if node else range(self.n)
+        parts = self._fanout(shard_page, shards)
+        page = list(islice(heapq.merge(*parts, key=_ALERT_KEY, reverse=True), offset, want))
+        next_cursor = encode_cursor(page[-1].created_ts, page[-1].id) if len(page) == limit else None
+        return page, next_cursor
+
+# ---- resharding ---------------------------------------------------------------
+
+def reshard(src_paths: List[str], dst_template: str, n: int, chunk_size: int = 50_000) -> Dict[str, int]:
+    """
+    Copy telemetry, rollups, sketches and alerts from `src_paths` (one DB or
+    a set of shards) into n fresh shards. Rollups and sketches are copied
+    rather than rebuilt: past the retention horizon they are the only copy
+    of the data. A source that never had them is backfilled from raw rows.
+    Sources are only read; destination files must not exist yet.
+    """
+    existing = [p for p in _shard_paths(dst_template, n) if os.path.exists(p)]
+    if existing:
+        raise FileExistsError(f"destination already exists: {existing[0]}")
+    dst = ShardedStore(dst_template, n)
+    counts = {"events": 0, "rollups": 0, "sketches": 0, "alerts": 0}
+    R, S = TelemetryRollupRow, TelemetrySketchRow
+    tables = (
+        (TelemetryEventRow, (_T.timestamp, _T.id), "events"),
+        (R, (R.resolution_s, R.node, R.bucket_ts), "rollups"),
+        (S, (S.node, S.bucket_ts, S.metric), "sketches"),
+        (AlertRow, (AlertRow.created_ts, AlertRow.id), "alerts"),
+    )
+    try:
+        for src in src_paths:
+            engine = create_engine(f"sqlite:///{src}")
+            inspector = inspect(engine)
+            with sessionmaker(bind=engine)() as s:
+                for model, order, key in tables:
+                    # ids are reassigned per shard; columns added since the source was created stay NULL
+                    have = {c["name"] for c in inspector.get_columns(model.__tablename__)}
+                    cols = [c for c in model.__table__.columns if c.name in have and c.name != "id"]
+                    result = s.execute(
+                        select(*cols).order_by(*order),
+                        execution_options={"stream_results": True, "yield_per": chunk_size},
+                    )
+                    for part in result.partitions(chunk_size):
+                        groups: Dict[int, List[dict]] = {}
+                        for r in part:
+                            row = dict(r._mapping)
+                            groups.setdefault(dst.shard_of(row["node"]), []).append(row)
+
+                        def write(db: Session, k: int) -> None:
+                            db.execute(insert(model), groups[k])
+                            db.commit()
+
+                        dst._fanout(write, groups)
+                        counts[key] += len(part)
+            engine.dispose()
+
+        def rebuild(db: Session, k: int) -> None:
+            rollups.ensure_backfilled(db)
+            sketches.ensure_backfilled(db)
+
+        dst._fanout(rebuild, range(n))
+    finally:
+        dst.close()
+    return counts
+
+def main():
+    p = argparse.ArgumentParser(description="Node-sharded telemetry storage maintenance")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("reshard", help="Redistribute a DB or a set of shards over a new shard count")
+    r.add_argument("--from", dest="src", required=True, help="SQLite file, or a shard template containing {shard}")
+    r.add_argument("--from-shards", type=int, help="Shard count of a --from template")
+    r.add_argument("--to", dest="dst", required=True, help="Destination template containing {shard}")
+    r.add_argument("--shards", type=int, required=True, help="Destination shard count")
+    args = p.parse_args()
+
+    if "{shard}" in args.src:
+        if not args.from_shards:
+            p.error("--from-shards is required with a {shard} template")
+        src_paths = _shard_paths(args.src, args.from_shards)
+    else:
+        src_paths = [args.src]
+    missing = [s for s in src_paths if not os.path.exists(s)]
+    if missing:
+        p.error(f"no such file: {missing[0]}")
+    counts = reshard(src_paths, args.dst, args.shards)
+    print(
+        f"copied {counts['events']} events, {counts['rollups']} rollup rows, {counts['sketches']} sketches "
+        f"and {counts['alerts']} alerts into {args.shards} shards",
+        file=sys.stderr,
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+Mergeable quantile sketches (DDSketch) for /stats percentiles.
+
+Each (node, 1-minute bucket, metric) keeps a DDSketch updated on ingest.
+/stats merges the sketches of the buckets inside the requested range and
+adds the raw values of the unaligned edges, then reads p50/p95/p99.
+
+Error bound: with relative accuracy a (default 1%), a returned quantile
+x~ for rank q satisfies |x~ - x_q| <= a * x_q, where x_q is the exact value
+at sorted index floor(q * (n - 1)). Values below 1e-9 are counted in a
+zero bucket and reported as 0.0. The bound holds for any merge order.
+
+Backfill existing data with:
+    python -m backend.app.sketches backfill
+"""
+import argparse
+import math
+import struct
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .db_models import TelemetryEventRow, TelemetrySketchRow
+from .stats_models import NodeStats
+
+BUCKET_S = 60
+RELATIVE_ACCURACY = 0.01
+QUANTILES = (0.5, 0.95, 0.99)
+
+# event field -> NodeStats field prefix
+METRICS = {
+    "latency_ms": "latency",
+    "packet_loss": "packet_loss",
+    "throughput_mbps": "throughput",
+}
+
+# Toggled from settings at startup
+enabled = True
+
+_MIN_INDEXABLE = 1e-9
+_HEADER = struct.Struct("<BdQdd")  # version, relative accuracy, zero count, min, max
+_VERSION = 1
+
+def _put_varint(out: bytearray, n: int) -> None:
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return
+
+def _get_varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    shift = 0
+    n = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return n, pos
+        shift += 7
+
+class DDSketch:
+    """Log-bucketed quantile sketch for non-negative values."""
+
+    __slots__ = ("relative_accuracy", "_log_gamma", "_gamma", "bins", "zero_count", "count", "min", "max")
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, n: int = 1) -> None:
+        if value < _MIN_INDEXABLE:
+            self.zero_count += n
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + n
+        self.count += n
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "DDSketch") -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, n in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                value = 2 * self._gamma ** key / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_bytes(self) -> bytes:
+        out = bytearray(_HEADER.pack(_VERSION, self.relative_accuracy, self.zero_count, self.min, self.max))
+        _put_varint(out, len(self.bins))
+        prev = 0
+        for key in sorted(self.bins):
+            delta = key - prev
+            _put_varint(out, (delta << 1) ^ (delta >> 63))  # zigzag
+            _put_varint(out, self.bins[key])
+            prev = key
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, buf: bytes) -> "DDSketch":
+        version, alpha, zero_count, vmin, vmax = _HEADER.unpack_from(buf)
+        if version != _VERSION:
+            raise ValueError(f"Unsupported sketch version {version}")
+        sk = cls(alpha)
+        sk.zero_count = zero_count
+        sk.min = vmin
+        sk.max = vmax
+        pos = _HEADER.size
+        nbins, pos = _get_varint(buf, pos)
+        key = 0
+        total = zero_count
+        for _ in range(nbins):
+            z, pos = _get_varint(buf, pos)
+            key += (z >> 1) ^ -(z & 1)
+            n, pos = _get_varint(buf, pos)
+            sk.bins[key] = n
+            total += n
+        sk.count = total
+        return sk
+
+def apply_sketches(db: Session, events: Iterable) -> None:
+    """Fold a batch of events into the per-minute sketches (caller commits)."""
+    fresh: Dict[Tuple[str, int, str], DDSketch] = {}
+    for e in events:
+        bucket = e.timestamp - e.timestamp % BUCKET_S
+        for field in METRICS:
+            key = (e.node, bucket, field)
+            sk = fresh.get(key)
+            if sk is None:
+                fresh[key] = sk = DDSketch()
+            sk.add(getattr(e, field))
+    if not fresh:
+        return
+
+    S = TelemetrySketchRow
+    keys = list({(node, bucket) for node, bucket, _ in fresh})
+    existing = db.execute(
+        select(S.node, S.bucket_ts, S.metric, S.sketch).where(tuple_(S.node, S.bucket_ts).in_(keys))
+    )
+    for node, bucket, metric, blob in existing:
+        sk = fresh.get((node, bucket, metric))
+        if sk is not None:
+            sk.merge(DDSketch.from_bytes(blob))
+
+    stmt = sqlite_insert(S.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["node", "bucket_ts", "metric"],
+        set_={"sketch": stmt.excluded.sketch},
+    )
+    db.execute(stmt, [
+        {"node": node, "bucket_ts": bucket, "metric": metric, "sketch": sk.to_bytes()}
+        for (node, bucket, metric), sk in fresh.items()
+    ])
+
+def _merged_sketches(
+    db: Session,
+    nodes: Optional[List[str]],
+    start_ts: Optional[int],
+    end_ts: Optional[int],
+) -> Dict[str, Dict[str, DDSketch]]:
+    out: Dict[str, Dict[str, DDSketch]] = defaultdict(lambda: {f: DDSketch() for f in METRICS})
+
+    # whole buckets inside the range come from stored sketches
+    lo = None if start_ts is None else -(-start_ts // BUCKET_S) * BUCKET_S
+    hi = None if end_ts is None else ((end_ts + 1) // BUCKET_S) * BUCKET_S  # exclusive
+    S = TelemetrySketchRow
+    stmt = select(S.node, S.metric, S.sketch)
+    if lo is not None:
+        stmt = stmt.where(S.bucket_ts >= lo)
+    if hi is not None:
+        stmt = stmt.where(S.bucket_ts < hi)
+    if nodes:
+        stmt = stmt.where(S.node.in_(nodes))
+    if lo is None or hi is None or lo < hi:
+        for node, metric, blob in db.execute(stmt):
+            if metric in METRICS:
+                out[node][metric].merge(DDSketch.from_bytes(blob))
+
+    # unaligned edges are added from raw rows
+    edges = []
+    if lo is not None and hi is not None and lo >= hi:
+        edges.append((start_ts, end_ts))
+    else:
+        if lo is not None and start_ts < lo:
+            edges.append((start_ts, lo - 1))
+        if hi is not None and hi <= end_ts:
+            edges.append((hi, end_ts))
+    T = TelemetryEventRow
+    for a, b in edges:
+        stmt = select(T.node, *[getattr(T, f) for f in METRICS]).where(T.timestamp >= a, T.timestamp <= b)
+        if nodes:
+            stmt = stmt.where(T.node.in_(nodes))
+        for row in db.execute(stmt):
+            sketches = out[row[0]]
+            for i, field in enumerate(METRICS, start=1):
+                sketches[field].add(row[i])
+    return out
+
+def attach_percentiles(
+    db: Session,
+    stats: List[NodeStats],
+    nodes: Optional[List[str]],
+    start_ts: Optional[int],
+    end_ts: Optional[int],
+) -> List[NodeStats]:
+    """Fill the p50/p95/p99 fields of already-computed NodeStats in place."""
+    if not stats:
+        return stats
+    merged = _merged_sketches(db, nodes, start_ts, end_ts)
+    for s in stats:
+        sketches = merged.get(s.node)
+        if sketches is None:
+            continue
+        for field, prefix in METRICS.items():
+            sk = sketches[field]
+            for q in QUANTILES:
+                setattr(s, f"{prefix}_p{round(q * 100)}", sk.quantile(q))
+    return stats
+
+def backfill(
+    db: Session, chunk_size: int = 50_000, start_ts: Optional[int] = None, end_ts: Optional[int] = None
+) -> int:
+    """
+    Rebuild sketches from raw rows, all of them or those of the minutes
+    touching [start_ts, end_ts]. Returns the number of sketch rows written.
+    """
+    lo = None if start_ts is None else start_ts - start_ts % BUCKET_S
+    hi = None if end_ts is None else end_ts - end_ts % BUCKET_S + BUCKET_S - 1
+    T, S = TelemetryEventRow, TelemetrySketchRow
+    stale = db.query(S)
+    stmt = select(T.node, T.timestamp, *[getattr(T, f) for f in METRICS]).execution_options(yield_per=chunk_size)
+    if lo is not None:
+        stale = stale.filter(S.bucket_ts >= lo)
+        stmt = stmt.where(T.timestamp >= lo)
+    if hi is not None:
+        stale = stale.filter(S.bucket_ts <= hi)
+        stmt = stmt.where(T.timestamp <= hi)
+    stale.delete()
+
+    sketches: Dict[Tuple[str, int, str], DDSketch] = {}
+    for row in db.execute(stmt):
+        bucket = row[1] - row[1] % BUCKET_S
+        for i, field in enumerate(METRICS, start=2):
+            key = (row[0], bucket, field)
+            sk = sketches.get(key)
+            if sk is None:
+                sketches[key] = sk = DDSketch()
+            sk.add(row[i])
+
+    rows = [
+        {"node": node, "bucket_ts": bucket, "metric": metric, "sketch": sk.to_bytes()}
+        for (node, bucket, metric), sk in sketches.items()
+    ]
+    for i in range(0, len(rows), chunk_size):
+        db.execute(sqlite_insert(TelemetrySketchRow.__table__), rows[i:i + chunk_size])
+    db.commit()
+    return len(rows)
+
+def ensure_backfilled(db: Session) -> bool:
+    """Backfill once if raw telemetry exists but no sketches do."""
+    if db.execute(select(TelemetrySketchRow.node).limit(1)).first() is not None:
+        return False
+    if db.execute(select(TelemetryEventRow.id).limit(1)).first() is None:
+        return False
+    backfill(db)
+    return True
+
+def main():
+    from .db import SessionLocal, init_db
+
+    p = argparse.ArgumentParser(description="Maintain per-minute quantile sketches")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("backfill", help="Rebuild sketches from raw telemetry_events")
+    args = p.parse_args()
+
+    init_db()
+    with SessionLocal() as db:
+        if args.cmd == "backfill":
+            print(f"wrote {backfill(db)} sketch rows")
+
+if __name__ == "__main__":
+    main()
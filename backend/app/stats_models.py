@@ -10,8 +10,21 @@ class NodeStats(BaseModel):
     latency_max: Optional[float] = None
     latency_min: Optional[float] = None
 
+    # percentiles come from DDSketches: within 1% of the exact value (see sketches.py)
+    latency_p50: Optional[float] = None
+    latency_p95: Optional[float] = None
+    latency_p99: Optional[float] = None
+
     packet_loss_avg: Optional[float] = None
+    packet_loss_p50: Optional[float] = None
+    packet_loss_p95: Optional[float] = None
+    packet_loss_p99: Optional[float] = None
+
     throughput_avg: Optional[float] = None
+    throughput_p50: Optional[float] = None
+    throughput_p95: Optional[float] = None
+    throughput_p99: Optional[float] = None
+
     cpu_avg: Optional[float] = None
     mem_avg: Optional[float] = None
 
@@ -1,30 +1,248 @@
-from collections import defaultdict, deque
-from typing import Deque, Dict, List, Optional
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
 from .models import TelemetryEvent
 
-class InMemoryTelemetryStore:
+_STATUSES = ("OK", "WARN", "CRITICAL")
+_STATUS_CODE = {s: i for i, s in enumerate(_STATUSES)}
+
+# (timestamp, latency_ms, packet_loss, throughput_mbps, cpu_pct, mem_pct, status_code)
+_Packed = Tuple[int, float, float, float, float, float, int]
+
+# bytes per slot: int64 timestamp + 5 float64 metrics + int8 status
+_SLOT_BYTES = 8 + 5 * 8 + 1
+
+def _pack(event: TelemetryEvent) -> _Packed:
+    return (
+        event.timestamp,
+        event.latency_ms,
+        event.packet_loss,
+        event.throughput_mbps,
+        event.cpu_pct,
+        event.mem_pct,
+        _STATUS_CODE[event.status],
+    )
+
+def _unpack(node: str, p: _Packed) -> TelemetryEvent:
+    # values were validated on ingest (or came from the DB), skip re-validation
+    return TelemetryEvent.model_construct(
+        node=node,
+        timestamp=p[0],
+        latency_ms=p[1],
+        packet_loss=p[2],
+        throughput_mbps=p[3],
+        cpu_pct=p[4],
+        mem_pct=p[5],
+        status=_STATUSES[p[6]],
+    )
+
+class _NodeRing:
     """
-    Stores recent events per node (fixed-size) + latest per node.
-    Good for now; later replace with a proper time-series DB.
+    Fixed-capacity ring buffer for one node, one packed array per column.
+
+    `complete` means the ring holds the node's entire history (it was warmed
+    from the DB and the DB had fewer rows than the capacity), so any history
+    request can be answered from memory.
+
+    `unseen` holds the DB rows at the newest warmed timestamp that ingest
+    had not written through yet; their write-through is skipped instead of
+    appended a second time.
     """
 
-    def __init__(self, max_events_per_node: int = 2000):
-        self._events: Dict[str, Deque[TelemetryEvent]] = defaultdict(lambda: deque(maxlen=max_events_per_node))
-        self._latest_events: Dict[str, TelemetryEvent] = {}
+    __slots__ = ("cap", "size", "head", "ts", "lat", "loss", "thr", "cpu", "mem", "status", "complete", "unseen")
 
-    def add(self, event: TelemetryEvent):
-        self._events[event.node].append(event)
-        self._latest_events[event.node] = event
+    def __init__(self, cap: int):
+        self.cap = cap
+        self.size = 0
+        self.head = 0  # next write position
+        self.ts = array("q", bytes(8 * cap))
+        self.lat = array("d", bytes(8 * cap))
+        self.loss = array("d", bytes(8 * cap))
+        self.thr = array("d", bytes(8 * cap))
+        self.cpu = array("d", bytes(8 * cap))
+        self.mem = array("d", bytes(8 * cap))
+        self.status = array("b", bytes(cap))
+        self.complete = False
+        self.unseen: List[_Packed] = []
 
-    def latest(self, node: Optional[str] = None) -> Optional[TelemetryEvent]:
-        if node:
-            return self._latest_events.get(node)
-        
-        #if no node specified, return latest across all nodes by timestamp
-        if not self._latest:
+    def append(self, p: _Packed) -> None:
+        i = self.head
+        self.ts[i], self.lat[i], self.loss[i], self.thr[i], self.cpu[i], self.mem[i], self.status[i] = p
+        self.head = (i + 1) % self.cap
+        if self.unseen and p[0] > self.unseen[0][0]:
+            self.unseen = []
+        if self.size < self.cap:
+            self.size += 1
+        else:
+            # the oldest slot was overwritten, older rows now only live in the DB
+            self.complete = False
+
+    def last_ts(self) -> Optional[int]:
+        if not self.size:
             return None
-        return max(self._latest.values(), key=lambda e: e.timestamp)
-    
-    def history(self, node:str, limit: int = 100) -> List[TelemetryEvent]:
-        events = list(self._events.get(node, []))
-        return events[-limit:]
\ No newline at end of file
+        return self.ts[(self.head - 1) % self.cap]
+
+    def tail(self, n: int) -> List[_Packed]:
+        """Newest n slots, oldest -> newest."""
+        n = min(n, self.size)
+        out: List[_Packed] = []
+        for k in range(n, 0, -1):
+            i = (self.head - k) % self.cap
+            out.append((self.ts[i], self.lat[i], self.loss[i], self.thr[i], self.cpu[i], self.mem[i], self.status[i]))
+        return out
+
+class InMemoryTelemetryStore:
+    """
+    Read-through / write-through cache of recent events per node + latest per node.
+
+    Ingest writes every event through; reads fall back to the DB (via warm_node /
+    warm_fleet_latest) only on a miss or for history deeper than what is cached.
+    Memory is bounded by `max_nodes` (LRU) x `max_events_per_node` packed slots.
+    """
+
+    def __init__(self, max_events_per_node: int = 256, max_nodes: int = 10_000):
+        self.max_events_per_node = max_events_per_node
+        self.max_nodes = max_nodes
+        self._rings: "OrderedDict[str, _NodeRing]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # fleet-wide latest is tracked separately so node eviction can't lose it
+        self._fleet_latest: Optional[Tuple[str, _Packed]] = None
+        self._fleet_warm = False
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _ring_for_write(self, node: str) -> _NodeRing:
+        ring = self._rings.get(node)
+        if ring is None:
+            ring = _NodeRing(self.max_events_per_node)
+            self._rings[node] = ring
+            while len(self._rings) > self.max_nodes:
+                self._rings.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._rings.move_to_end(node)
+        return ring
+
+    def add(self, event: TelemetryEvent) -> None:
+        self.add_many([event])
+
+    def add_many(self, events: Iterable[TelemetryEvent]) -> None:
+        with self._lock:
+            for event in events:
+                p = _pack(event)
+                ring = self._rings.get(event.node)
+                last = ring.last_ts() if ring is not None else None
+                if last is not None and p[0] < last:
+                    # out-of-order arrival: the ring would no longer match the
+                    # DB's (timestamp, id) order, so drop it and re-warm on demand
+                    del self._rings[event.node]
+                elif ring is not None and p in ring.unseen:
+                    # committed, then read by a warm before this write-through
+                    ring.unseen.remove(p)
+                else:
+                    self._ring_for_write(event.node).append(p)
+
+                if self._fleet_latest is None or p[0] >= self._fleet_latest[1][0]:
+                    self._fleet_latest = (event.node, p)
+
+    def latest(self, node: Optional[str] = None) -> Tuple[bool, Optional[TelemetryEvent]]:
+        """Returns (hit, event). On a miss the caller should read the DB and warm."""
+        with self._lock:
+            if node:
+                ring = self._rings.get(node)
+                if ring is None or not (ring.size or ring.complete):
+                    self.misses += 1
+                    return False, None
+                self._rings.move_to_end(node)
+                self.hits += 1
+                if not ring.size:
+                    return True, None
+                return True, _unpack(node, ring.tail(1)[0])
+
+            if not self._fleet_warm:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            if self._fleet_latest is None:
+                return True, None
+            return True, _unpack(*self._fleet_latest)
+
+    def history(self, node: str, limit: int = 100) -> Optional[List[TelemetryEvent]]:
+        """Newest `limit` events oldest->newest, or None if the cache can't answer exactly."""
+        with self._lock:
+            ring = self._rings.get(node)
+            if ring is None or (limit > ring.size and not ring.complete):
+                self.misses += 1
+                return None
+            self._rings.move_to_end(node)
+            self.hits += 1
+            return [_unpack(node, p) for p in ring.tail(limit)]
+
+    def warm_node(self, node: str, events: List[TelemetryEvent]) -> None:
+        """
+        Install a node's newest events (oldest->newest) read from the DB.
+        Reading `max_events_per_node` rows and getting fewer means the node's
+        whole history is cached. Events already in the ring that the read
+        did not see (newer, or written through before their commit) are kept
+        after the DB rows; ties on the newest timestamp are matched on content.
+        """
+        with self._lock:
+            rows = [_pack(e) for e in events]
+            newest = rows[-1][0] if rows else None
+            unseen = [p for p in rows if p[0] == newest]
+            extra: List[_Packed] = []
+            old = self._rings.get(node)
+            if old is not None:
+                for p in old.tail(old.size):
+                    if newest is not None and p[0] < newest:
+                        continue  # the read covers everything older than its newest row
+                    if p in unseen:
+                        unseen.remove(p)
+                    else:
+                        extra.append(p)
+
+            if old is None:
+                ring = self._ring_for_write(node)
+            else:
+                ring = self._rings[node] = _NodeRing(old.cap)
+                self._rings.move_to_end(node)
+            merged = rows + extra
+            for p in merged[-ring.cap:]:
+                ring.append(p)
+            ring.unseen = unseen
+            ring.complete = len(rows) < ring.cap and len(merged) <= ring.cap
+
+    def warm_fleet_latest(self, event: Optional[TelemetryEvent]) -> None:
+        """Seed the fleet-wide latest from the DB. The DB row wins ties: it has the highest id."""
+        with self._lock:
+            if self._fleet_warm:
+                return
+            if event is not None:
+                if self._fleet_latest is None or event.timestamp >= self._fleet_latest[1][0]:
+                    self._fleet_latest = (event.node, _pack(event))
+            self._fleet_warm = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rings.clear()
+            self._fleet_latest = None
+            self._fleet_warm = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "nodes": len(self._rings),
+                "max_nodes": self.max_nodes,
+                "max_events_per_node": self.max_events_per_node,
+                "cached_events": sum(r.size for r in self._rings.values()),
+                "memory_bytes": len(self._rings) * self.max_events_per_node * _SLOT_BYTES,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
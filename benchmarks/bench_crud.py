@@ -0,0 +1,220 @@
+"""
+Timing suite for the backend/app/crud.py query paths at realistic data sizes.
+
+    python -m benchmarks.bench_crud                                # 100k events, 10 and 1000 nodes
+    python -m benchmarks.bench_crud --sizes 1M,10M --nodes 10,5000 --db-dir /var/tmp/crud-bench
+    python -m benchmarks.bench_crud --out result.json --baseline benchmarks/baselines/crud.json
+
+Each (size, nodes) database is seeded once from FleetModel at 1 Hz (plus one
+alert per 100 events) and reused from --db-dir on later runs; cases run on a
+scratch copy because insert_event writes. Every case runs --warmup rounds,
+then --rounds timed rounds; min/median/mean/stddev are reported per case like
+pytest-benchmark does. --baseline compares medians and
+exits 1 when any case is slower than the baseline by more than --threshold.
+Baselines are machine specific: regenerate with --out on the machine that
+runs the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.app import crud, fastjson, rollups, sketches
+from backend.app.db import Base
+from backend.app.db_models import AlertRow, TelemetryEventRow
+from simulator.fleet_model import FleetModel
+from simulator.models import TelemetryEvent
+
+BASE_TS = 1_700_000_000
+SEED = 7
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip("km")) * mult)
+
+def seed_db(path: str, size: int, nodes: int, chunk: int = 50_000) -> None:
+    """Raw events for `nodes` nodes at 1 Hz ending at BASE_TS + size/nodes, then rollups/sketches/alerts."""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    fleet = FleetModel([f"router-{i}" for i in range(1, nodes + 1)], seed=SEED)
+    ticks = -(-size // nodes)
+    with sessionmaker(bind=engine)() as db:
+        pending: List[dict] = []
+        written = 0
+        for k in range(ticks):
+            rows = fleet.generate(BASE_TS + k).to_dicts()
+            pending += rows[: size - written - len(pending)]
+            if len(pending) >= chunk or k == ticks - 1:
+                db.execute(insert(TelemetryEventRow), pending)
+                written += len(pending)
+                pending = []
+        db.commit()
+        rollups.backfill(db)
+        sketches.backfill(db)
+
+        alerts = [
+            {
+                "node": f"router-{1 + i % nodes}",
+                "rule_id": "high_latency",
+                "severity": "WARN",
+                "message": "bench",
+                "created_ts": BASE_TS + i * 100 // nodes,
+                "resolved_ts": None,
+                "is_active": i % 10 == 0,
+            }
+            for i in range(size // 100)
+        ]
+        for i in range(0, len(alerts), chunk):
+            db.execute(insert(AlertRow), alerts[i:i + chunk])
+        db.commit()
+    engine.dispose()
+
+def cases(size: int, nodes: int) -> Dict[str, Callable[[Session], object]]:
+    last_ts = BASE_TS + -(-size // nodes) - 1
+    node = "router-1"
+    counter = [0]
+
+    def insert_one(db):
+        counter[0] += 1
+        return crud.insert_event(db, TelemetryEvent(
+            node=node, latency_ms=20.0, packet_loss=0.001, throughput_mbps=500.0,
+            cpu_pct=30.0, mem_pct=40.0, timestamp=last_ts + counter[0],
+        ))
+
+    out: Dict[str, Callable[[Session], object]] = {
+        "insert_event": insert_one,
+        "get_latest[fleet]": lambda db: crud.get_latest(db),
+        "get_latest[node]": lambda db: crud.get_latest(db, node),
+        "get_history[100]": lambda db: crud.get_history(db, node, limit=100),
+    }
+    for offset in (0, 10_000, 100_000, 1_000_000):
+        if offset < size:
+            out[f"query_events[offset={offset}]"] = (
+                lambda db, o=offset: crud.query_events(db, limit=200, offset=o)
+            )
+    for label, window in (("1h", 3600), ("24h", 86400), ("all", None)):
+        start = None if window is None else last_ts - window + 1
+        out[f"get_node_stats[{label}]"] = (
+            lambda db, s=start: crud.get_node_stats(db, start_ts=s, end_ts=last_ts if s is not None else None)
+        )
+    # what /events and /history spend per request: Core tuples -> JSON body
+    out["events_body[2000]"] = lambda db: fastjson.dumps_rows(crud.query_event_rows_page(db, limit=2000)[0])
+    out["history_body[2000]"] = lambda db: fastjson.dumps_rows(crud.get_history_rows(db, node, limit=2000))
+    out["list_alerts[active]"] = lambda db: crud.list_alerts(db, is_active=True, limit=200)
+    out["list_alerts[offset=5000]"] = lambda db: crud.list_alerts(db, limit=200, offset=5000)
+    return out
+
+def time_case(fn: Callable[[Session], object], db: Session, rounds: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        fn(db)
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn(db)
+        samples.append(time.perf_counter() - t0)
+    ms = [1000 * s for s in samples]
+    return {
+        "min_ms": round(min(ms), 4),
+        "median_ms": round(statistics.median(ms), 4),
+        "mean_ms": round(statistics.fmean(ms), 4),
+        "stddev_ms": round(statistics.pstdev(ms), 4),
+        "rounds": rounds,
+    }
+
+def compare(result: dict, baseline: dict, threshold: float, min_delta_ms: float) -> Tuple[List[str], List[str]]:
+    """
+    (regressions, report lines) comparing medians of matching cases. A case
+    regresses when it is slower by more than `threshold` and `min_delta_ms`,
+    so timer noise on sub-millisecond cases doesn't fail the run.
+    """
+    lines, regressions = [], []
+    for key, cur in result["cases"].items():
+        base = baseline["cases"].get(key)
+        if base is None:
+            lines.append(f"  {key:55s} {cur['median_ms']:10.3f} ms   (new)")
+            continue
+        ratio = cur["median_ms"] / base["median_ms"] if base["median_ms"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold and cur["median_ms"] - base["median_ms"] > min_delta_ms:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        lines.append(f"  {key:55s} {cur['median_ms']:10.3f} ms   {ratio:6.2f}x baseline{flag}")
+    return regressions, lines
+
+def main():
+    p = argparse.ArgumentParser(description="Time crud.py query paths on seeded SQLite databases")
+    p.add_argument("--sizes", default="100k", help="Comma-separated event counts, e.g. 100k,1M,10M")
+    p.add_argument("--nodes", default="10,1000", help="Comma-separated node counts")
+    p.add_argument("--db-dir", help="Keep seeded databases here and reuse them (default: temporary)")
+    p.add_argument("--rounds", type=int, default=20)
+    p.add_argument("--warmup", type=int, default=2)
+    p.add_argument("--out", help="Write results JSON here")
+    p.add_argument("--baseline", help="Results JSON to compare medians against")
+    p.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown per case")
+    p.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore slowdowns smaller than this")
+    args = p.parse_args()
+
+    tmp = None
+    db_dir = args.db_dir
+    if db_dir is None:
+        tmp = tempfile.TemporaryDirectory()
+        db_dir = tmp.name
+    os.makedirs(db_dir, exist_ok=True)
+
+    result = {
+        "benchmark": "crud",
+        "timestamp": int(time.time()),
+        "python": platform.python_version(),
+        "cases": {},
+    }
+    try:
+        for size in (parse_size(s) for s in args.sizes.split(",")):
+            for nodes in (int(n) for n in args.nodes.split(",")):
+                path = os.path.join(db_dir, f"crud-{size}-{nodes}.db")
+                if not os.path.exists(path):
+                    t0 = time.perf_counter()
+                    seed_db(path + ".tmp", size, nodes)
+                    os.replace(path + ".tmp", path)
+                    print(f"seeded {size:,} events / {nodes} nodes in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+                # insert_event writes: time a scratch copy so the seeded file stays pristine
+                work = os.path.join(db_dir, f"crud-{size}-{nodes}.work.db")
+                shutil.copyfile(path, work)
+                engine = create_engine(f"sqlite:///{work}")
+                with sessionmaker(bind=engine)() as db:
+                    n = db.execute(select(func.count(TelemetryEventRow.id))).scalar()
+                    for name, fn in cases(size, nodes).items():
+                        key = f"{size}x{nodes}/{name}"
+                        result["cases"][key] = stats = time_case(fn, db, args.rounds, args.warmup)
+                        print(f"{key:60s} median {stats['median_ms']:10.3f} ms  (rows={n:,})", file=sys.stderr)
+                engine.dispose()
+                os.remove(work)
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions, lines = compare(result, baseline, args.threshold, args.min_delta_ms)
+        print(f"vs {args.baseline} (threshold +{args.threshold:.0%}):")
+        print("\n".join(lines))
+        if regressions:
+            print(f"{len(regressions)} case(s) regressed", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+File sink throughput: the old open/append/close-per-event sink vs the buffered FileSink.
+
+    python -m benchmarks.bench_file_sink --events 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from simulator.fleet_model import FleetModel
+from simulator.sinks.file_sink import FileSink, zstd_available
+
+class PerEventFileSink:
+    """The FileSink this repo shipped before buffering, kept as the baseline."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def emit(self, event) -> None:
+        with open(self.path, 'a', encoding="utf-8") as f:
+            f.write(event.model_dump_json() + "\n")
+
+    def close(self) -> None:
+        pass
+
+def run(sink, events, per_event: bool) -> float:
+    t0 = time.perf_counter()
+    if per_event:
+        for e in events:
+            sink.emit(e)
+    else:
+        for i in range(0, len(events), 1000):  # one simulator tick of 1000 nodes
+            sink.emit_many(events[i:i + 1000])
+    sink.close()
+    return time.perf_counter() - t0
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--events", type=int, default=200_000)
+    args = p.parse_args()
+
+    fleet = FleetModel([f"router-{i}" for i in range(1, 1001)], seed=7)
+    events = []
+    t = 1_000_000.0
+    while len(events) < args.events:
+        events += fleet.generate(t).to_events()
+        t += 1
+    events = events[:args.events]
+
+    cases = [("per-event open/close", lambda p: PerEventFileSink(p), True),
+             ("buffered", lambda p: FileSink(p), False),
+             ("buffered + gzip", lambda p: FileSink(p, compression="gzip"), False)]
+    if zstd_available():
+        cases.append(("buffered + zstd", lambda p: FileSink(p, compression="zstd"), False))
+
+    print(f"{len(events)} events")
+    with tempfile.TemporaryDirectory() as d:
+        for name, make, per_event in cases:
+            path = os.path.join(d, name.replace(" ", "_").replace("/", "_") + ".jsonl")
+            sink = make(path)
+            elapsed = run(sink, events, per_event)
+            out = getattr(sink, "path", path)
+            print(f"  {name:22s} {len(events) / elapsed:12,.0f} events/s  {os.path.getsize(out) / 1e6:8.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Per-tick incident effect lookup: full scan (effect_for_node) vs IncidentTimeline.
+
+    python -m benchmarks.bench_incident_index --nodes 1000 --incidents 5000 --ticks 200
+"""
+import argparse
+import random
+import time
+
+from simulator.incident_model import IncidentTimeline, build_incidents
+from simulator.main import effect_for_node
+
+TYPES = ["latency_spike", "packet_loss_burst", "throughput_drop", "cpu_spike"]
+
+def make_schedule(nodes, n_incidents, span_s, seed):
+    rng = random.Random(seed)
+    return [
+        {
+            "type": rng.choice(TYPES),
+            "node": None if rng.random() < 0.05 else rng.choice(nodes),
+            "start_after_s": rng.randint(0, span_s),
+            "duration_s": rng.randint(1, 120),
+            "severity": round(rng.uniform(1, 5), 1),
+        }
+        for _ in range(n_incidents)
+    ]
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--nodes", type=int, default=1000)
+    p.add_argument("--incidents", type=int, default=5000)
+    p.add_argument("--ticks", type=int, default=200)
+    p.add_argument("--seed", type=int, default=7)
+    args = p.parse_args()
+
+    nodes = [f"router-{i}" for i in range(1, args.nodes + 1)]
+    base = 1_000_000.0
+    incidents = build_incidents(make_schedule(nodes, args.incidents, args.ticks, args.seed), base_time=base)
+    ticks = [base + i for i in range(args.ticks)]
+
+    t0 = time.perf_counter()
+    scan = [[effect_for_node(n, incidents, now) for n in nodes] for now in ticks]
+    scan_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    timeline = IncidentTimeline(incidents)
+    indexed = []
+    for now in ticks:
+        timeline.advance(now)
+        indexed.append([timeline.effects_for(n) for n in nodes])
+    index_s = time.perf_counter() - t0
+
+    assert scan == indexed, "timeline disagrees with the full scan"
+    per_tick = lambda s: 1000 * s / args.ticks  # noqa: E731
+    print(f"{args.nodes} nodes x {args.incidents} incidents, {args.ticks} ticks")
+    print(f"  full scan : {per_tick(scan_s):9.2f} ms/tick")
+    print(f"  timeline  : {per_tick(index_s):9.2f} ms/tick  ({scan_s / index_s:.0f}x)")
+
+if __name__ == "__main__":
+    main()
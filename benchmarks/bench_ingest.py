@@ -0,0 +1,272 @@
+"""
+Load-generate or replay telemetry against the ingest API and measure it.
+
+    # replay a capture (looped up to --events) against a fresh in-process backend
+    python -m benchmarks.bench_ingest --replay telemetry_events.jsonl --events 50000 --batch-size 500
+
+    # synthesize from a simulator config, 2000 events/s, 32 connections, separate server process
+    python -m benchmarks.bench_ingest --simulate configs/simulator.dev.yaml --node-count 1000 \\
+        --rate 2000 --concurrency 32 --launch
+
+    # an already running backend
+    python -m benchmarks.bench_ingest --replay telemerty.jsonl --url http://127.0.0.1:8000
+
+Without --url the backend runs against a throwaway SQLite file. Results are
+printed and, with --out, written as JSON; --baseline compares against an
+earlier result file and exits 1 on a regression beyond --tolerance.
+
+With --rate, latency is measured from each request's scheduled send time,
+so a backend that falls behind shows up in the percentiles instead of just
+slowing the sender down (no coordinated omission).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import List, Optional
+
+import httpx
+
+def load_capture(path: str) -> List[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def synthesize(config_path: str, node_count: Optional[int], events: int) -> List[dict]:
+    from simulator.fleet_model import FleetModel
+    from simulator.settings import load_config
+
+    cfg = load_config(config_path)
+    nodes = [f"router-{i}" for i in range(1, node_count + 1)] if node_count else cfg.nodes
+    fleet = FleetModel(nodes, seed=cfg.seed)
+    out: List[dict] = []
+    t = float(int(time.time()) - events // len(nodes) - 1)
+    while len(out) < events:
+        out += fleet.generate(t).to_dicts()
+        t += 1.0 / cfg.emit_hz
+    return out[:events]
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+# ---- target backend -----------------------------------------------------------
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _wait_ready(url: str, timeout_s: float = 30.0) -> None:
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        try:
+            httpx.get(url + "/cache/stats", timeout=1.0)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError(f"backend at {url} did not come up")
+
+class InProcessBackend:
+    """backend.app.main:app on a uvicorn server thread in this process."""
+
+    def __init__(self, db_path: str):
+        os.environ["TELEMETRY_DB_URL"] = f"sqlite:///{db_path}"
+        import uvicorn
+        from backend.app.main import app
+
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        _wait_ready(self.url)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+class LaunchedBackend:
+    """backend.app.main:app under uvicorn in a child process."""
+
+    def __init__(self, db_path: str):
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.env = dict(os.environ, TELEMETRY_DB_URL=f"sqlite:///{db_path}")
+
+    def __enter__(self):
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--host", "127.0.0.1",
+             "--port", str(self.port), "--log-level", "warning"],
+            env=self.env,
+        )
+        try:
+            _wait_ready(self.url)
+        except Exception:
+            self.proc.kill()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        self.proc.terminate()
+        self.proc.wait(timeout=10)
+
+# ---- load generator -----------------------------------------------------------
+
+async def drive(
+    url: str,
+    events: List[dict],
+    batch_size: int,
+    concurrency: int,
+    rate: Optional[float],
+) -> dict:
+    if batch_size > 1:
+        endpoint = url + "/ingest/batch"
+        payloads = [events[i:i + batch_size] for i in range(0, len(events), batch_size)]
+    else:
+        endpoint = url + "/ingest"
+        payloads = events
+
+    latencies: List[float] = []
+    errors = 0
+    status_counts: dict = {}
+    next_index = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+        t0 = time.perf_counter()
+
+        async def worker():
+            nonlocal next_index, errors
+            while next_index < len(payloads):
+                i = next_index
+                next_index += 1
+                body = payloads[i]
+                start = time.perf_counter()
+                if rate:
+                    scheduled = t0 + i * batch_size / rate
+                    if scheduled > start:
+                        await asyncio.sleep(scheduled - start)
+                    start = scheduled
+                try:
+                    r = await client.post(endpoint, json=body)
+                    status_counts[r.status_code] = status_counts.get(r.status_code, 0) + 1
+                    if r.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    status_counts["transport_error"] = status_counts.get("transport_error", 0) + 1
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    ms = lambda v: None if v is None else round(1000 * v, 3)  # noqa: E731
+    return {
+        "events": len(events),
+        "requests": len(payloads),
+        "elapsed_s": round(elapsed, 4),
+        "events_per_s": round(len(events) / elapsed, 1),
+        "requests_per_s": round(len(payloads) / elapsed, 1),
+        "error_rate": round(errors / len(payloads), 6) if payloads else 0.0,
+        "status_counts": {str(k): v for k, v in sorted(status_counts.items(), key=lambda kv: str(kv[0]))},
+        "latency_ms": {
+            "p50": ms(percentile(latencies, 0.50)),
+            "p95": ms(percentile(latencies, 0.95)),
+            "p99": ms(percentile(latencies, 0.99)),
+            "max": ms(latencies[-1] if latencies else None),
+        },
+    }
+
+def compare(result: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regressions of `result` against `baseline`, as readable lines."""
+    problems = []
+    if result["events_per_s"] < baseline["events_per_s"] * (1 - tolerance):
+        problems.append(f"events/s {result['events_per_s']} < baseline {baseline['events_per_s']}")
+    for q in ("p50", "p99"):
+        now, then = result["latency_ms"][q], baseline["latency_ms"][q]
+        if now is not None and then is not None and now > then * (1 + tolerance):
+            problems.append(f"latency {q} {now} ms > baseline {then} ms")
+    if result["error_rate"] > baseline["error_rate"] + 0.001:
+        problems.append(f"error rate {result['error_rate']} > baseline {baseline['error_rate']}")
+    return problems
+
+def main():
+    p = argparse.ArgumentParser(description="Replay or synthesize telemetry against the ingest API")
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument("--replay", help="JSONL capture to send")
+    src.add_argument("--simulate", help="Simulator config to synthesize events from")
+    p.add_argument("--node-count", type=int, help="With --simulate: router-1..router-N instead of the configured nodes")
+    p.add_argument("--events", type=int, help="Events to send; captures are looped (default: the capture once, or 10000 synthesized)")
+    p.add_argument("--batch-size", type=int, default=1, help="1 = POST /ingest per event, >1 = POST /ingest/batch")
+    p.add_argument("--concurrency", type=int, default=16, help="Concurrent connections")
+    p.add_argument("--rate", type=float, help="Target events/s (default: as fast as possible)")
+    tgt = p.add_mutually_exclusive_group()
+    tgt.add_argument("--url", help="Existing backend base URL")
+    tgt.add_argument("--launch", action="store_true", help="Start the backend in a child uvicorn process")
+    p.add_argument("--out", help="Write the result JSON here")
+    p.add_argument("--baseline", help="Earlier result JSON to compare against")
+    p.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression vs --baseline")
+    args = p.parse_args()
+
+    if args.replay:
+        events = load_capture(args.replay)
+        n = args.events or len(events)
+        events = (events * (n // len(events) + 1))[:n]
+    else:
+        events = synthesize(args.simulate, args.node_count, args.events or 10_000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        if args.url:
+            target, mode = None, "external"
+            url = args.url.rstrip("/")
+        else:
+            target = LaunchedBackend(db_path) if args.launch else InProcessBackend(db_path)
+            mode = "launched" if args.launch else "in_process"
+            url = target.url
+            target.__enter__()
+        try:
+            result = asyncio.run(drive(url, events, args.batch_size, args.concurrency, args.rate))
+        finally:
+            if target is not None:
+                target.__exit__(None, None, None)
+
+    report = {
+        "benchmark": "ingest",
+        "timestamp": int(time.time()),
+        "source": args.replay or args.simulate,
+        "target": mode,
+        "batch_size": args.batch_size,
+        "concurrency": args.concurrency,
+        "target_rate": args.rate,
+        "python": platform.python_version(),
+        "result": result,
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["result"]
+        problems = compare(result, baseline, args.tolerance)
+        for line in problems:
+            print(f"REGRESSION: {line}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Ingest body formats: JSON array vs the binary wire batch (simulator.wire).
+
+Bytes per event on the wire, sink-side encode CPU, and backend-side
+decode + validate CPU (up to the list of TelemetryEvents handed to
+crud.insert_events), per event.
+
+    python -m benchmarks.bench_wire --nodes 1000 --ticks 20
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+
+from backend.app.models import TelemetryEvent
+from simulator import wire
+from simulator.fleet_model import FleetModel
+
+def _json_decode(body: bytes):
+    # what /ingest/batch does for application/json
+    return [TelemetryEvent.model_validate(item) for item in json.loads(body)]
+
+_EVENTS = TypeAdapter(List[TelemetryEvent])
+
+def _wire_decode(body: bytes):
+    # what /ingest/batch does for wire.CONTENT_TYPE
+    batch = wire.decode(body)
+    ok, errors = batch.validate()
+    return _EVENTS.validate_python(batch.to_dicts(ok if errors else None))
+
+def _per_event_us(fn, bodies, n_events: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for b in bodies:
+            fn(b)
+        best = min(best, time.perf_counter() - t0)
+    return best / n_events * 1e6
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--nodes", type=int, default=1000, help="events per batch (one fleet tick)")
+    p.add_argument("--ticks", type=int, default=20)
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args()
+
+    fleet = FleetModel([f"router-{i}" for i in range(1, args.nodes + 1)], seed=7)
+    # the http_async sink buffers model_dump() dicts and encodes them per request
+    batches = [fleet.generate(1_000_000.0 + t).to_dicts() for t in range(args.ticks)]
+    n = sum(len(b) for b in batches)
+
+    cases = [
+        ("json", lambda rows: json.dumps(rows).encode(), _json_decode),
+        ("wire", wire.encode, _wire_decode),
+    ]
+    print(f"{n} events in {len(batches)} batches of {args.nodes}")
+    print(f"{'format':<8}{'bytes/event':>14}{'encode us/event':>18}{'decode us/event':>18}")
+    for name, enc, dec in cases:
+        bodies = [enc(b) for b in batches]
+        assert len(dec(bodies[0])) == len(batches[0])
+        size = sum(len(b) for b in bodies) / n
+        enc_us = _per_event_us(enc, batches, n, args.repeat)
+        dec_us = _per_event_us(dec, bodies, n, args.repeat)
+        print(f"{name:<8}{size:>14.1f}{enc_us:>18.2f}{dec_us:>18.2f}")
+
+if __name__ == "__main__":
+    main()
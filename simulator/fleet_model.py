@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from simulator.incident_model import Incident
+from simulator.models import TelemetryEvent
+
+INCIDENT_TYPES = ("cpu_spike", "latency_spike", "packet_loss_burst", "throughput_drop")
+STATUSES = np.array(["OK", "WARN", "CRITICAL"])
+
+@dataclass
+class FleetTick:
+    """One tick of telemetry for the whole fleet, kept as columns until a sink needs rows."""
+    nodes: np.ndarray
+    latency_ms: np.ndarray
+    packet_loss: np.ndarray
+    throughput_mbps: np.ndarray
+    cpu_pct: np.ndarray
+    mem_pct: np.ndarray
+    timestamp: int
+    status: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def to_dicts(self) -> List[dict]:
+        cols = zip(
+            self.nodes.tolist(),
+            self.latency_ms.tolist(),
+            self.packet_loss.tolist(),
+            self.throughput_mbps.tolist(),
+            self.cpu_pct.tolist(),
+            self.mem_pct.tolist(),
+            self.status.tolist(),
+        )
+        ts = self.timestamp
+        return [
+            {
+                "node": node,
+                "latency_ms": lat,
+                "packet_loss": loss,
+                "throughput_mbps": thr,
+                "cpu_pct": cpu,
+                "mem_pct": mem,
+                "timestamp": ts,
+                "status": status,
+            }
+            for node, lat, loss, thr, cpu, mem, status in cols
+        ]
+
+    def to_events(self) -> List[TelemetryEvent]:
+        # values are already clamped/rounded like NodeModel's, so skip re-validation
+        return [TelemetryEvent.model_construct(**d) for d in self.to_dicts()]
+
+class FleetModel:
+    """
+    NodeModel for a whole fleet at once: per-node baselines live in NumPy
+    arrays and every tick is generated with a handful of vector operations,
+    incident effects applied through node masks. Same formulas as NodeModel;
+    the random streams differ, so a fleet is reproducible against itself for
+    a given seed, not against a list of NodeModels.
+    """
+
+    def __init__(self, names: Iterable[str], seed: Optional[int] = None):
+        self.names = np.array(list(names))
+        self.rng = np.random.default_rng(seed)
+        self._index = {name: i for i, name in enumerate(self.names.tolist())}
+        n = len(self.names)
+
+        # per-node baselines, same ranges as NodeModel
+        self.base_latency = self.rng.uniform(10, 50, n)  # ms
+        self.base_throughput = self.rng.uniform(200, 1200, n)  # mbps
+        self.base_cpu = self.rng.uniform(10, 40, n)  # %
+        self.base_mem = self.rng.uniform(30, 70, n)  # %
+        self.loss_floor = self.rng.uniform(0.0, 0.005, n)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def effects(self, incidents: Iterable[Incident], now: float) -> dict:
+        """Per incident type, the strongest active severity for every node (0 = not affected)."""
+        out = {}
+        for inc in incidents:
+            if not inc.active(now):
+                continue
+            sev = out.get(inc.type)
+            if sev is None:
+                sev = out[inc.type] = np.zeros(len(self.names))
+            if inc.node is None:
+                np.maximum(sev, float(inc.severity), out=sev)
+            else:
+                i = self._index.get(inc.node)
+                if i is not None:
+                    sev[i] = max(sev[i], float(inc.severity))
+        return out
+
+    def generate(self, t: float, incidents: Iterable[Incident] = ()) -> FleetTick:
+        n = len(self.names)
+        rng = self.rng
+        cyc = 0.5 + 0.5 * np.sin(2 * np.pi * (t % 60) / 60)
+
+        # one draw per metric for the whole fleet, in a fixed order
+        noise = rng.normal(0.0, (0.05, 3, 2, 25, 3, 0.001), (n, 6)).T
+
+        load = np.clip(0.3 + 0.7 * cyc + noise[0], 0.0, 1.2)
+        cpu = np.clip(self.base_cpu + 50 * load + noise[1], 0.0, 100.0)
+        mem = np.clip(self.base_mem + 10 * load + noise[2], 0.0, 100.0)
+        throughput = np.maximum(0.0, self.base_throughput * (1.1 - 0.7 * load) + noise[3])
+        latency = np.maximum(0.0, self.base_latency * (1.0 + 2.2 * load) + noise[4])
+        packet_loss = self.loss_floor + np.maximum(0.0, load - 0.8) * 0.03 + np.abs(noise[5])
+        packet_loss = np.clip(packet_loss, 0.0, 1.0)
+
+        effects = self.effects(incidents, t)
+        sev = effects.get("cpu_spike")
+        if sev is not None:
+            m = sev > 0
+            cpu[m] = np.minimum(100.0, cpu[m] * sev[m])
+            throughput[m] = np.maximum(0.0, throughput[m] / sev[m])
+        sev = effects.get("latency_spike")
+        if sev is not None:
+            m = sev > 0
+            latency[m] *= sev[m]
+            packet_loss[m] = np.minimum(1.0, packet_loss[m] * (0.8 + 0.6 * sev[m]))
+        sev = effects.get("packet_loss_burst")
+        if sev is not None:
+            m = sev > 0
+            packet_loss[m] = np.minimum(1.0, packet_loss[m] + 0.05 * sev[m])
+            latency[m] *= 1.0 + 0.3 * sev[m]
+        sev = effects.get("throughput_drop")
+        if sev is not None:
+            m = sev > 0
+            throughput[m] /= sev[m]
+            latency[m] *= 1.0 + 0.2 * sev[m]
+
+        warn = (packet_loss > 0.03) | (latency > 200) | (cpu > 90)
+        critical = (packet_loss > 0.10) | (latency > 400) | (cpu > 97)
+        status = STATUSES[np.where(critical, 2, warn.astype(np.int8))]
+
+        return FleetTick(
+            nodes=self.names,
+            latency_ms=np.round(latency, 2),
+            packet_loss=np.round(packet_loss, 4),
+            throughput_mbps=np.round(throughput, 2),
+            cpu_pct=np.round(cpu, 2),
+            mem_pct=np.round(mem, 2),
+            timestamp=int(t),
+            status=status,
+        )
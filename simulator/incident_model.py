@@ -1,5 +1,6 @@
+from collections import Counter, defaultdict
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterable, Optional
 import time
 
 @dataclass
@@ -44,3 +45,83 @@ def build_incidents(incident_dicts: list[dict], base_time:float | None = None) -
             )
         )
     return incidents
+
+class IncidentTimeline:
+    """
+    Sweep index over a fixed incident schedule.
+
+    Start/end boundaries are sorted once; advance(now) only processes the
+    boundaries crossed since the previous call, and effects are kept per node
+    (plus one fleet-wide set) so a tick costs O(changes), not
+    O(nodes x incidents). Time is expected to move forward; going back
+    replays the sweep from the beginning.
+    """
+
+    def __init__(self, incidents: Iterable[Incident]):
+        self.incidents = list(incidents)
+        # active on [start_ts, end_ts]: starts apply at start_ts, ends once now > end_ts
+        self._starts = sorted(range(len(self.incidents)), key=lambda i: self.incidents[i].start_ts)
+        self._ends = sorted(range(len(self.incidents)), key=lambda i: self.incidents[i].end_ts)
+        self.reset()
+
+    def reset(self) -> None:
+        self._now: Optional[float] = None
+        self._si = 0
+        self._ei = 0
+        self._active: set[int] = set()
+        # scope (node name, None = fleet-wide) -> type -> severities of active incidents
+        self._sev: dict = defaultdict(lambda: defaultdict(Counter))
+        self._scope_effects: dict = {}
+        self._fleet_version = 0
+        self._merged: dict = {}
+
+    def _touch(self, i: int, delta: int) -> Optional[str]:
+        inc = self.incidents[i]
+        sevs = self._sev[inc.node][inc.type]
+        sevs[float(inc.severity)] += delta
+        if sevs[float(inc.severity)] <= 0:
+            del sevs[float(inc.severity)]
+        if delta > 0:
+            self._active.add(i)
+        else:
+            self._active.discard(i)
+        types = self._sev[inc.node]
+        self._scope_effects[inc.node] = {t: max(c) for t, c in types.items() if c}
+        return inc.node
+
+    def advance(self, now: float) -> set:
+        """Move the sweep to `now`; returns the scopes whose effects changed (None = fleet-wide)."""
+        if self._now is not None and now < self._now:
+            self.reset()
+        self._now = now
+        changed = set()
+        n = len(self.incidents)
+        while self._si < n and self.incidents[self._starts[self._si]].start_ts <= now:
+            i = self._starts[self._si]
+            self._si += 1
+            if self.incidents[i].end_ts >= now:
+                changed.add(self._touch(i, +1))
+        while self._ei < n and self.incidents[self._ends[self._ei]].end_ts < now:
+            i = self._ends[self._ei]
+            self._ei += 1
+            if i in self._active:
+                changed.add(self._touch(i, -1))
+        if None in changed:
+            self._fleet_version += 1
+        for node in changed:
+            self._merged.pop(node, None)
+        return changed
+
+    def effects_for(self, node: str) -> dict:
+        """Strongest active severity per incident type for `node`, as effect_for_node returns it."""
+        cached = self._merged.get(node)
+        if cached is not None and cached[0] == self._fleet_version:
+            return cached[1]
+        merged = dict(self._scope_effects.get(None, {}))
+        for t, sev in self._scope_effects.get(node, {}).items():
+            merged[t] = max(merged.get(t, sev), sev)
+        self._merged[node] = (self._fleet_version, merged)
+        return merged
+
+    def active(self) -> list[Incident]:
+        return [self.incidents[i] for i in self._active]
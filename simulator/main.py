@@ -1,17 +1,28 @@
 import asyncio
+import inspect
+import math
+import multiprocessing
+import os
 import random
+import sys
 import time
 import argparse
 from collections import defaultdict
-from typing import Any
+from typing import Any, Optional
+
+import numpy as np
 
 from simulator.node_model import NodeModel
-from simulator.incident_model import build_incidents
+from simulator.fleet_model import FleetModel
+from simulator.incident_model import IncidentTimeline, build_incidents
+from simulator.scheduler import TickScheduler
+from simulator import metrics
 from simulator.settings import load_config, SimulatorConfig, SinkConfig, IncidentConfig
 
 from simulator.sinks.stdout_sink import StdoutSink
 from simulator.sinks.file_sink import FileSink
 from simulator.sinks.http_sink import HttpSink
+from simulator.sinks.async_http_sink import AsyncHttpSink
 
 
 from simulator.node_model import NodeModel
@@ -22,11 +33,33 @@ def make_sink(sink_cfg: SinkConfig):
         return StdoutSink()
 
     if sink_cfg.type == "file":
-        return FileSink(sink_cfg.path)
+        return FileSink(
+            sink_cfg.path,
+            buffer_bytes=sink_cfg.buffer_bytes,
+            flush_interval_s=sink_cfg.flush_interval_ms / 1000.0,
+            rotate_bytes=sink_cfg.rotate_bytes,
+            rotate_interval_s=sink_cfg.rotate_interval_s,
+            compression=sink_cfg.compression,
+        )
 
     if sink_cfg.type == "http":
         return HttpSink(sink_cfg.url)
-        raise NotImplementedError("HTTP sink not implemented yet")
+
+    if sink_cfg.type == "http_async":
+        return AsyncHttpSink(
+            sink_cfg.url,
+            batch_url=sink_cfg.batch_url,
+            batch_size=sink_cfg.batch_size,
+            flush_interval_s=sink_cfg.flush_interval_ms / 1000.0,
+            max_in_flight=sink_cfg.max_in_flight,
+            max_buffer=sink_cfg.max_buffer,
+            overflow=sink_cfg.overflow,
+            max_retries=sink_cfg.max_retries,
+            backoff_base_s=sink_cfg.backoff_base_ms / 1000.0,
+            backoff_max_s=sink_cfg.backoff_max_ms / 1000.0,
+            timeout_s=sink_cfg.timeout_s,
+            format=sink_cfg.format,
+        )
 
     raise ValueError(f"Unknown sink type: {sink_cfg.type}")
 
@@ -50,10 +83,16 @@ def parse_args():
     p.add_argument("--config", default="configs/simulator.dev.yaml")
     p.add_argument("--emit-hz", type=float)
     p.add_argument("--seed", type=int)
-    p.add_argument("--sink", choices=["stdout", "file", "http"])
+    p.add_argument("--sink", choices=["stdout", "file", "http", "http_async"])
+    p.add_argument("--sink-format", choices=["json", "wire"], help="http_async body format; wire = binary batches")
     p.add_argument("--file-path")
     p.add_argument("--http-url")
     p.add_argument("--nodes", help="Comma-separated node names, e.g. router-1,router-2")
+    p.add_argument("--node-count", type=int, help="Simulate router-1..router-N instead of the configured nodes")
+    p.add_argument("--model", choices=["node", "fleet"], help="fleet = vectorized generation for large fleets")
+    p.add_argument("--tick-policy", choices=["skip", "catch_up"], help="What to do with ticks that are already overdue")
+    p.add_argument("--workers", type=int, help="Shard the nodes across N processes")
+    p.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port (shard i uses port + i)")
     return p.parse_args()
 
 def apply_overrides(cfg: SimulatorConfig, args)-> SimulatorConfig:
@@ -66,35 +105,142 @@ def apply_overrides(cfg: SimulatorConfig, args)-> SimulatorConfig:
         data["seed"] = args.seed
     if args.nodes is not None:
         data["nodes"] =  [n.strip() for n in args.nodes.split(",") if n.strip()]
+    if args.node_count is not None:
+        data["nodes"] = [f"router-{i}" for i in range(1, args.node_count + 1)]
+    if args.model is not None:
+        data["model"] = args.model
+    if args.tick_policy is not None:
+        data["tick_policy"] = args.tick_policy
+    if args.workers is not None:
+        data["workers"] = args.workers
+    if args.metrics_port is not None:
+        data["metrics_port"] = args.metrics_port
     if args.sink is not None:
         data["sink"]["type"] = args.sink
+    if args.sink_format is not None:
+        data["sink"]["format"] = args.sink_format
     if args.file_path is not None:
-        data["sink"]["file_path"] = args.file_path
+        data["sink"]["path"] = args.file_path
     if args.http_url is not None:
         data["sink"]["url"] = args.http_url
     
     return SimulatorConfig.model_validate(data)
 
 
+def shard_seed(seed: int, shard: int) -> int:
+    """Seed for one worker, derived only from the run seed and the shard number."""
+    return int(np.random.SeedSequence(seed, spawn_key=(shard,)).generate_state(1)[0])
+
+def shard_config(cfg: SimulatorConfig, shard: int, workers: int) -> SimulatorConfig:
+    data = cfg.model_dump()
+    data["nodes"] = cfg.nodes[shard::workers]
+    data["seed"] = shard_seed(cfg.seed, shard)
+    data["workers"] = 1
+    if cfg.metrics_port is not None:
+        data["metrics_port"] = cfg.metrics_port + shard
+    if cfg.sink.type == "file":
+        # one file per shard: workers can't share a buffered handle
+        stem, ext = os.path.splitext(cfg.sink.path)
+        data["sink"]["path"] = f"{stem}.shard{shard}{ext}"
+    return SimulatorConfig.model_validate(data)
+
+async def simulate(cfg: SimulatorConfig, start: Optional[float] = None, base_time: Optional[float] = None, label: str = "") -> None:
+    incidents = build_incidents([i.model_dump() for i in cfg.incidents], base_time=base_time)
+    timeline = IncidentTimeline(incidents)
+    scheduler = TickScheduler(cfg.emit_hz, start=start, policy=cfg.tick_policy)
+    sink = make_sink(cfg.sink)
+    if cfg.metrics_port is not None:
+        if hasattr(sink, "stats"):
+            metrics.registry.gauge("sim_sink", "Sink counters", lambda: {
+                (k,): v for k, v in sink.stats().items() if isinstance(v, (int, float))
+            }, labels=("stat",))
+        metrics.serve(metrics.registry, cfg.metrics_port)
+
+    try:
+        await run(cfg, timeline, sink, scheduler)
+    finally:
+        if hasattr(sink, "aclose"):
+            await sink.aclose()
+            print(f"{label}sink {sink.stats()}", file=sys.stderr)
+        elif hasattr(sink, "close"):
+            sink.close()  # flushes buffered lines and fsyncs
+        print(f"{label}scheduler {scheduler.stats()}", file=sys.stderr)
+
+def _run_shard(cfg_data: dict, shard: int, workers: int, start: float, base_time: float) -> None:
+    cfg = shard_config(SimulatorConfig.model_validate(cfg_data), shard, workers)
+    try:
+        asyncio.run(simulate(cfg, start=start, base_time=base_time, label=f"[shard {shard}] "))
+    except KeyboardInterrupt:
+        pass
+
+def run_sharded(cfg: SimulatorConfig) -> None:
+    """Split the nodes round-robin over `cfg.workers` processes sharing one tick clock."""
+    # same first deadline and incident schedule for every shard
+    start = math.ceil(time.time()) + 1.0
+    base_time = time.time()
+    ctx = multiprocessing.get_context("spawn")
+    procs = [
+        ctx.Process(target=_run_shard, args=(cfg.model_dump(), shard, cfg.workers, start, base_time), daemon=True)
+        for shard in range(cfg.workers)
+    ]
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        for p in procs:
+            p.join(timeout=10)
+
 async def main():
     args = parse_args()
     cfg = load_config(args.config)
     cfg = apply_overrides(cfg, args)
 
+    if cfg.workers > 1:
+        run_sharded(cfg)  # nothing else runs on this loop; the shards have their own
+        return
+    await simulate(cfg)
+
+async def emit_tick(sink, events, sink_type: str = "") -> None:
+    # async sinks buffer and send in the background; sync ones write inline
+    try:
+        result = sink.emit_many(events)
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        # one failed tick shouldn't stop the simulation
+        metrics.sink_errors.inc((sink_type,))
+        print(f"sink error: {e!r}", file=sys.stderr)
+        return
+    metrics.events_emitted.inc((sink_type,), len(events))
+
+async def next_tick(scheduler: TickScheduler) -> float:
+    t = await scheduler.next_tick()
+    metrics.ticks.inc()
+    metrics.tick_lag_seconds.observe(max(0.0, scheduler.lag_s))
+    return t
+
+async def run(cfg: SimulatorConfig, timeline: IncidentTimeline, sink, scheduler: TickScheduler) -> None:
+    if cfg.model == "fleet":
+        fleet = FleetModel(cfg.nodes, seed=cfg.seed)
+        while True:
+            now = await next_tick(scheduler)
+            timeline.advance(now)
+            tick = fleet.generate(now, timeline.active())
+            # rows are only materialized here, at the sink boundary
+            await emit_tick(sink, tick.to_events(), cfg.sink.type)
+
     rng = random.Random(cfg.seed)
     models = [NodeModel(name, rng) for name in cfg.nodes]
-
-    incidents = build_incidents([i.model_dump() for i in cfg.incidents])
-    sink = make_sink(cfg.sink)
-
-    interval = 1.0 / cfg.emit_hz
     while True:
-        now = time.time()
-        for m in models:
-            effects = effect_for_node(m.name, incidents, now)
-            event = m.generate(now, effects)
-            sink.emit(event)
-        await asyncio.sleep(interval)
+        now = await next_tick(scheduler)
+        timeline.advance(now)
+        events = [m.generate(now, timeline.effects_for(m.name)) for m in models]
+        await emit_tick(sink, events, cfg.sink.type)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
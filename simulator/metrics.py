@@ -0,0 +1,14 @@
+"""
+Simulator metrics, served in Prometheus text format when --metrics-port is set.
+"""
+from simulator.utils.metrics import Registry, serve  # noqa: F401
+
+registry = Registry()
+
+events_emitted = registry.counter("sim_events_emitted_total", "Events handed to the sink", labels=("sink",))
+sink_errors = registry.counter("sim_sink_errors_total", "Sink calls that raised", labels=("sink",))
+ticks = registry.counter("sim_ticks_total", "Ticks generated")
+tick_lag_seconds = registry.histogram(
+    "sim_tick_lag_seconds", "How late each tick started versus its deadline",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
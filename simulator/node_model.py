@@ -1,6 +1,5 @@
 import math 
 import random
-import time
 from simulator.models import TelemetryEvent
 
 class NodeModel:
@@ -91,6 +90,6 @@ class NodeModel:
             throughput_mbps=round(throughput, 2),
             cpu_pct=round(cpu, 2),
             mem_pct=round(mem, 2),
-            timestamp=int(time.time()),
+            timestamp=int(t),  # the scheduled tick time, not when this ran
             status=status,
         )
\ No newline at end of file
@@ -0,0 +1,77 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Literal, Optional
+
+TickPolicy = Literal["skip", "catch_up"]
+
+class TickScheduler:
+    """
+    Fixed-rate ticks on absolute deadlines start + k / hz.
+
+    Sleeping until the next deadline (instead of sleeping one interval after
+    the work) keeps the long-run rate at exactly `hz` no matter how long a
+    tick takes. When a tick is late by a whole interval or more:
+
+    - "skip" drops the deadlines already missed and resumes on the next
+      one, counting them in `missed`;
+    - "catch_up" returns every missed deadline back to back, so no tick
+      timestamp is lost, counting them in `late`.
+    """
+
+    def __init__(
+        self,
+        hz: float,
+        start: Optional[float] = None,
+        policy: TickPolicy = "skip",
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], Awaitable] = asyncio.sleep,
+    ):
+        self.interval = 1.0 / hz
+        self.policy = policy
+        self.clock = clock
+        self.sleep = sleep
+        self.start = clock() if start is None else start
+        self._k = 0
+
+        self.ticks = 0
+        self.missed = 0
+        self.late = 0
+        self.lag_s = 0.0
+        self.max_lag_s = 0.0
+        self._lag_total = 0.0
+
+    async def next_tick(self) -> float:
+        """Wait for the next deadline and return it (the tick's scheduled time)."""
+        deadline = self.start + self._k * self.interval
+        now = self.clock()
+        if now < deadline:
+            await self.sleep(deadline - now)
+            now = self.clock()
+
+        lag = now - deadline
+        if lag >= self.interval:
+            if self.policy == "skip":
+                behind = int(lag // self.interval)
+                self.missed += behind
+                self._k += behind
+                deadline = self.start + self._k * self.interval
+                lag = now - deadline
+            else:
+                self.late += 1
+
+        self._k += 1
+        self.ticks += 1
+        self.lag_s = lag
+        self.max_lag_s = max(self.max_lag_s, lag)
+        self._lag_total += lag
+        return deadline
+
+    def stats(self) -> dict:
+        return {
+            "ticks": self.ticks,
+            "missed": self.missed,
+            "late": self.late,
+            "lag_ms_last": round(1000 * self.lag_s, 3),
+            "lag_ms_avg": round(1000 * self._lag_total / self.ticks, 3) if self.ticks else 0.0,
+            "lag_ms_max": round(1000 * self.max_lag_s, 3),
+        }
@@ -10,13 +10,35 @@ class IncidentConfig(BaseModel):
     severity: float = 1.0
 
 class SinkConfig(BaseModel):
-    type: Literal["stdout","file", "http"] = "stdout"
+    type: Literal["stdout","file", "http", "http_async"] = "stdout"
     path: str = "telemetry.jsonl"# used when type="file"
-    url: str = "http://localhost:8000/ingest"# used when type="http"
+    # file / http_async: longest an event waits in the sink's buffer
+    flush_interval_ms: int = Field(default=50, gt=0)
+    # type="file" only
+    buffer_bytes: int = Field(default=1 << 20, gt=0)  # write once this much JSONL is pending
+    rotate_bytes: Optional[int] = Field(default=None, gt=0)  # uncompressed bytes per file
+    rotate_interval_s: Optional[float] = Field(default=None, gt=0)
+    compression: Literal["none", "gzip", "zstd"] = "none"  # zstd needs the zstandard package
+    url: str = "http://localhost:8000/ingest"# used when type="http" / "http_async"
+    # type="http_async" only
+    batch_url: Optional[str] = None  # defaults to <url>/batch
+    batch_size: int = Field(default=1, gt=0)  # >1 posts JSON arrays to batch_url
+    max_in_flight: int = Field(default=8, gt=0)  # concurrent requests / pooled connections
+    max_buffer: int = Field(default=10_000, gt=0)
+    overflow: Literal["block", "drop_oldest", "drop_newest"] = "block"
+    max_retries: int = Field(default=3, ge=0)
+    backoff_base_ms: int = Field(default=50, gt=0)  # full jitter, doubling per attempt
+    backoff_max_ms: int = Field(default=2000, gt=0)
+    timeout_s: float = Field(default=2.0, gt=0)
+    format: Literal["json", "wire"] = "json"  # "wire" posts binary batches (simulator.wire) to batch_url
 
 class SimulatorConfig(BaseModel):
     emit_hz: float = Field(default=1.0, gt=0)
     seed: int = 7
+    model: Literal["node", "fleet"] = "node"  # "fleet" generates each tick vectorized with NumPy
+    tick_policy: Literal["skip", "catch_up"] = "skip"  # overdue ticks: drop them, or emit them back to back
+    workers: int = Field(default=1, gt=0)  # >1 shards the nodes across processes
+    metrics_port: Optional[int] = None  # serve Prometheus metrics at :port/metrics
     nodes: list[str] = Field(default_factory=lambda: ["router-1"])
     sink: SinkConfig = Field(default_factory=SinkConfig)
     incidents: list[IncidentConfig] = Field(default_factory=list)
@@ -0,0 +1,198 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Iterable, Literal, Optional
+
+import httpx
+
+from simulator import wire
+from simulator.models import TelemetryEvent
+
+Overflow = Literal["block", "drop_oldest", "drop_newest"]
+
+# worth another attempt; any other 4xx means the payload itself is wrong
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class AsyncHttpSink:
+    """
+    Non-blocking HTTP sink for the asyncio loop in simulator.main.
+
+    Events go into a bounded buffer; a dispatcher drains it into requests
+    (one event per POST to `url`, or up to `batch_size` per POST to
+    `batch_url`) sent concurrently over one pooled keep-alive AsyncClient,
+    at most `max_in_flight` at a time. Failed sends are retried with full
+    jitter backoff. When the buffer is full, `overflow` decides: wait for
+    room ("block"), evict the oldest event, or drop the new one.
+
+    format="wire" sends every request to `batch_url` as a binary batch
+    (simulator.wire) instead of JSON.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        batch_url: Optional[str] = None,
+        batch_size: int = 1,
+        flush_interval_s: float = 0.05,
+        max_in_flight: int = 8,
+        max_buffer: int = 10_000,
+        overflow: Overflow = "block",
+        max_retries: int = 3,
+        backoff_base_s: float = 0.05,
+        backoff_max_s: float = 2.0,
+        timeout_s: float = 2.0,
+        format: Literal["json", "wire"] = "json",
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.url = url
+        self.batch_url = batch_url or url.rstrip("/") + "/batch"
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.max_in_flight = max_in_flight
+        self.max_buffer = max_buffer
+        self.overflow = overflow
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.timeout_s = timeout_s
+        self.format = format
+        self._transport = transport
+
+        self._buf: deque = deque()
+        self._cond: Optional[asyncio.Condition] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._in_flight: set[asyncio.Task] = set()
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._closing = False
+        self._rng = random.Random()
+
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.retries = 0
+        self.requests = 0
+        self._latencies: deque = deque(maxlen=1024)
+
+    async def start(self) -> None:
+        if self._dispatcher is not None:
+            return
+        self._cond = asyncio.Condition()
+        self._sem = asyncio.Semaphore(self.max_in_flight)
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout_s,
+            transport=self._transport,
+            limits=httpx.Limits(max_connections=self.max_in_flight, max_keepalive_connections=self.max_in_flight),
+        )
+        self._closing = False
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def emit(self, event: TelemetryEvent) -> None:
+        await self.emit_many([event])
+
+    async def emit_many(self, events: Iterable[TelemetryEvent]) -> None:
+        if self._dispatcher is None:
+            await self.start()
+        async with self._cond:
+            for event in events:
+                if len(self._buf) >= self.max_buffer:
+                    if self.overflow == "drop_newest":
+                        self.dropped += 1
+                        continue
+                    if self.overflow == "drop_oldest":
+                        self._buf.popleft()
+                        self.dropped += 1
+                    else:
+                        self._cond.notify_all()
+                        await self._cond.wait_for(lambda: len(self._buf) < self.max_buffer or self._closing)
+                self._buf.append(event.model_dump())
+            self._cond.notify_all()
+
+    async def aclose(self) -> None:
+        """Send everything still buffered, then close the connection pool."""
+        if self._dispatcher is None:
+            return
+        async with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        await self._dispatcher
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight)
+        await self._client.aclose()
+        self._dispatcher = None
+        self._client = None
+
+    async def _dispatch(self) -> None:
+        while True:
+            async with self._cond:
+                if not self._buf:
+                    if self._closing:
+                        return
+                    await self._cond.wait_for(lambda: self._buf or self._closing)
+                    continue
+                if len(self._buf) < self.batch_size and not self._closing:
+                    # give a partial batch up to flush_interval_s to fill
+                    try:
+                        await asyncio.wait_for(
+                            self._cond.wait_for(lambda: len(self._buf) >= self.batch_size or self._closing),
+                            self.flush_interval_s,
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                n = min(self.batch_size, len(self._buf))
+                batch = [self._buf.popleft() for _ in range(n)]
+                self._cond.notify_all()  # room for blocked producers
+            if not batch:
+                continue
+            await self._sem.acquire()
+            task = asyncio.create_task(self._send(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, batch: list) -> None:
+        try:
+            if self.format == "wire":
+                headers = {"Content-Type": wire.CONTENT_TYPE}
+                url, kw = self.batch_url, {"content": wire.encode(batch), "headers": headers}
+            elif self.batch_size > 1:
+                url, kw = self.batch_url, {"json": batch}
+            else:
+                url, kw = self.url, {"json": batch[0]}
+            for attempt in range(self.max_retries + 1):
+                t0 = time.perf_counter()
+                try:
+                    r = await self._client.post(url, **kw)
+                    self.requests += 1
+                    retry = r.status_code in _RETRY_STATUS
+                    if r.is_success:
+                        self._latencies.append(time.perf_counter() - t0)
+                        self.sent += len(batch)
+                        return
+                except httpx.TransportError:
+                    self.requests += 1
+                    retry = True
+                if not retry or attempt == self.max_retries:
+                    break
+                self.retries += 1
+                cap = min(self.backoff_max_s, self.backoff_base_s * 2 ** attempt)
+                await asyncio.sleep(self._rng.uniform(0, cap))
+            self.failed += len(batch)
+        finally:
+            self._sem.release()
+
+    def stats(self) -> dict:
+        lat = sorted(self._latencies)
+        pct = lambda q: round(1000 * lat[int(q * (len(lat) - 1))], 3) if lat else None  # noqa: E731
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "retries": self.retries,
+            "requests": self.requests,
+            "buffered": len(self._buf),
+            "in_flight": len(self._in_flight),
+            "latency_ms_p50": pct(0.5),
+            "latency_ms_p99": pct(0.99),
+            "latency_ms_max": round(1000 * lat[-1], 3) if lat else None,
+        }
@@ -1,10 +1,136 @@
+import gzip
+import os
+import time
+from typing import BinaryIO, Iterable, Literal, Optional
+
 from simulator.models import TelemetryEvent
 
+Compression = Literal["none", "gzip", "zstd"]
+
+_SUFFIX = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+def zstd_available() -> bool:
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
 class FileSink:
-    def __init__(self, path: str):
-        self.path = path
+    """
+    JSONL file sink with a persistent handle.
+
+    Lines are collected in memory and written once `buffer_bytes` have
+    accumulated or `flush_interval_s` has passed since the last write. The
+    file rotates after `rotate_bytes` (uncompressed) or `rotate_interval_s`;
+    rotated files are renamed to `<stem>-<UTC time>-<seq><ext>`. gzip output
+    is always available, zstd needs the optional `zstandard` package. Call
+    close() on shutdown: it flushes, finishes the compressed stream and fsyncs.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        buffer_bytes: int = 1 << 20,
+        flush_interval_s: float = 1.0,
+        rotate_bytes: Optional[int] = None,
+        rotate_interval_s: Optional[float] = None,
+        compression: Compression = "none",
+    ):
+        if compression == "zstd" and not zstd_available():
+            raise ValueError("compression='zstd' needs the zstandard package")
+        suffix = _SUFFIX[compression]
+        self.path = path if path.endswith(suffix) else path + suffix
+        self.buffer_bytes = buffer_bytes
+        self.flush_interval_s = flush_interval_s
+        self.rotate_bytes = rotate_bytes
+        self.rotate_interval_s = rotate_interval_s
+        self.compression = compression
+
+        self._pending: list[bytes] = []
+        self._pending_bytes = 0
+        self._last_flush = time.monotonic()
+        self._raw: Optional[BinaryIO] = None
+        self._out: Optional[BinaryIO] = None
+        self._opened_at = 0.0
+        self._file_bytes = 0
+        self._seq = 0
+        self.rotated: list[str] = []
+
+    def _open(self) -> None:
+        dirname = os.path.dirname(self.path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self._raw = open(self.path, "ab")
+        if self.compression == "gzip":
+            # appending a new gzip member to an existing file is still valid gzip
+            self._out = gzip.GzipFile(fileobj=self._raw, mode="ab", compresslevel=6)
+        elif self.compression == "zstd":
+            import zstandard
+            self._out = zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._out = self._raw
+        self._opened_at = time.monotonic()
+        self._file_bytes = 0
+
+    def _close_file(self, durable: bool) -> None:
+        if self._raw is None:
+            return
+        if self._out is not self._raw:
+            self._out.close()  # writes the gzip trailer / zstd frame end
+        self._raw.flush()
+        if durable:
+            os.fsync(self._raw.fileno())
+        self._raw.close()
+        self._raw = self._out = None
+
+    def _rotate(self) -> None:
+        self._close_file(durable=True)
+        base = self.path[: len(self.path) - len(_SUFFIX[self.compression])]
+        stem, ext = os.path.splitext(base)
+        self._seq += 1
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        target = f"{stem}-{stamp}-{self._seq:04d}{ext}{_SUFFIX[self.compression]}"
+        os.replace(self.path, target)
+        self.rotated.append(target)
+
+    def _due_for_rotation(self) -> bool:
+        if self.rotate_bytes is not None and self._file_bytes >= self.rotate_bytes:
+            return True
+        if self.rotate_interval_s is not None and time.monotonic() - self._opened_at >= self.rotate_interval_s:
+            return True
+        return False
+
+    def flush(self) -> None:
+        """Write buffered lines to the file (to the OS, not necessarily to disk)."""
+        if self._pending:
+            if self._raw is None:
+                self._open()
+            data = b"".join(self._pending)
+            self._out.write(data)
+            self._file_bytes += len(data)
+            self._pending.clear()
+            self._pending_bytes = 0
+            self._out.flush()
+        self._last_flush = time.monotonic()
+        if self._raw is not None and self._file_bytes and self._due_for_rotation():
+            self._rotate()
 
     def emit(self, event: TelemetryEvent) -> None:
-        # JSONL: 1 JSON object per line
-        with open(self.path, 'a', encoding="utf-8") as f:
-            f.write(event.model_dump_json() + "\n")
\ No newline at end of file
+        self.emit_many([event])
+
+    def emit_many(self, events: Iterable[TelemetryEvent]) -> None:
+        for event in events:
+            # JSONL: 1 JSON object per line
+            line = event.model_dump_json().encode("utf-8") + b"\n"
+            self._pending.append(line)
+            self._pending_bytes += len(line)
+        if (
+            self._pending_bytes >= self.buffer_bytes
+            or time.monotonic() - self._last_flush >= self.flush_interval_s
+        ):
+            self.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._close_file(durable=True)
@@ -1,4 +1,6 @@
 import httpx 
+from typing import Iterable
+
 from simulator.models import TelemetryEvent
 
 class HttpSink:
@@ -9,4 +11,11 @@ class HttpSink:
     def emit(self, event: TelemetryEvent) -> None:
         with httpx.Client(timeout=self.timeout_s) as client:
             r = client.post(self.url, json=event.model_dump())
-            r.raise_for_status()
\ No newline at end of file
+            r.raise_for_status()
+
+    def emit_many(self, events: Iterable[TelemetryEvent]) -> None:
+        # one connection for the whole tick
+        with httpx.Client(timeout=self.timeout_s) as client:
+            for event in events:
+                r = client.post(self.url, json=event.model_dump())
+                r.raise_for_status()
@@ -1,5 +1,12 @@
+from typing import Iterable
+
 from simulator.models import TelemetryEvent
 
 class StdoutSink:
     def emit(self, event: TelemetryEvent) -> None:
-        print(event.model_dump_json())
\ No newline at end of file
+        print(event.model_dump_json())
+
+    def emit_many(self, events: Iterable[TelemetryEvent]) -> None:
+        lines = [e.model_dump_json() for e in events]
+        if lines:
+            print("\n".join(lines))
@@ -0,0 +1,173 @@
+"""
+Minimal Prometheus-style metrics shared by the simulator and the backend.
+
+Updates are lock-free: every thread writes to its own shard (a dict keyed by
+label values), registered once per thread and metric. A scrape sums the
+shards. Under the GIL a shard only ever has one writer, so an increment is
+a thread-local lookup plus a dict update - well under a microsecond.
+"""
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+class _Sharded:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _snapshot(self) -> List[dict]:
+        with self._lock:
+            shards = list(self._shards)
+        # copy each shard: its owner thread may insert keys while we read
+        return [dict(s) for s in shards]
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def inc(self, labels: Tuple = (), n: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + n
+
+    def values(self) -> Dict[Tuple, float]:
+        out: Dict[Tuple, float] = {}
+        for shard in self._snapshot():
+            for k, v in shard.items():
+                out[k] = out.get(k, 0) + v
+        return out
+
+    def render(self) -> Iterable[str]:
+        for labels, v in sorted(self.values().items()):
+            yield f"{self.name}{_fmt_labels(self.labels, labels)} {_fmt_value(v)}"
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Tuple = ()) -> None:
+        shard = self._shard()
+        state = shard.get(labels)
+        if state is None:
+            # per-bucket (non-cumulative) counts + [sum, count]
+            state = shard[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def values(self) -> Dict[Tuple, Tuple[List[int], float, int]]:
+        out: Dict[Tuple, list] = {}
+        for shard in self._snapshot():
+            for k, (counts, total, n) in shard.items():
+                acc = out.get(k)
+                if acc is None:
+                    out[k] = [list(counts), total, n]
+                else:
+                    acc[0] = [a + b for a, b in zip(acc[0], counts)]
+                    acc[1] += total
+                    acc[2] += n
+        return {k: (v[0], v[1], v[2]) for k, v in out.items()}
+
+    def render(self) -> Iterable[str]:
+        for labels, (counts, total, n) in sorted(self.values().items()):
+            running = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                running += c
+                le = 'le="' + _fmt_value(bound) + '"'
+                yield f"{self.name}_bucket{_fmt_labels(self.labels, labels, le)} {running}"
+            yield f"{self.name}_sum{_fmt_labels(self.labels, labels)} {_fmt_value(total)}"
+            yield f"{self.name}_count{_fmt_labels(self.labels, labels)} {n}"
+
+class Gauge:
+    """Read at scrape time from a callback returning {label values: value}."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Callable[[], Dict[Tuple, float]], labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.fn = fn
+
+    def render(self) -> Iterable[str]:
+        for labels, v in sorted(self.fn().items()):
+            yield f"{self.name}{_fmt_labels(self.labels, labels)} {_fmt_value(v)}"
+
+class Registry:
+    def __init__(self):
+        self.metrics: list = []
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name: str, help: str, fn: Callable[[], Dict[Tuple, float]], labels: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help, fn, labels))
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for m in self.metrics:
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+def serve(registry: Registry, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Expose `registry` at http://host:port/metrics from a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
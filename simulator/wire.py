@@ -0,0 +1,162 @@
+"""
+Compact binary framing for batches of telemetry events.
+
+Shared by the simulator's http_async sink (encode) and the backend's
+/ingest/batch endpoint (decode + validate), as an alternative to a JSON
+array. Little-endian throughout:
+
+    header      "TLW1"  u8 version  u8 reserved  u16 n_nodes  u32 n_events
+    dictionary  n_nodes x (u8 length, utf-8 name), zero-padded to 8 bytes
+    columns     timestamp i64, latency_ms f64, packet_loss f64,
+                throughput_mbps f64, cpu_pct f64, mem_pct f64,
+                node u16 (index into the dictionary), status u8
+
+Each column holds n_events values, widest first, so every column starts
+aligned. Node names are sent once per batch instead of once per event; a
+1000-node tick is ~62 bytes per event versus ~168 as JSON. Metrics stay
+float64 so values round-trip exactly.
+"""
+import struct
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+CONTENT_TYPE = "application/vnd.telemetry.batch"
+MAGIC = b"TLW1"
+VERSION = 1
+
+STATUSES = ("OK", "WARN", "CRITICAL")
+METRICS = ("latency_ms", "packet_loss", "throughput_mbps", "cpu_pct", "mem_pct")
+
+_HEADER = struct.Struct("<4sBxHI")
+_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("timestamp", "<i8"),
+    *((m, "<f8") for m in METRICS),
+    ("node", "<u2"),
+    ("status", "u1"),
+)
+_STATUS_INDEX = {s: i for i, s in enumerate(STATUSES)}
+
+# same bounds as TelemetryEvent's Field(ge=..., le=...)
+BOUNDS: Dict[str, Tuple[float, float]] = {
+    "latency_ms": (0.0, np.inf),
+    "packet_loss": (0.0, 1.0),
+    "throughput_mbps": (0.0, np.inf),
+    "cpu_pct": (0.0, 100.0),
+    "mem_pct": (0.0, 100.0),
+}
+
+class WireError(ValueError):
+    """The body is not a well-formed batch (bad magic, version or length)."""
+
+def _pad8(n: int) -> int:
+    return -n % 8
+
+def encode(rows: Sequence[Mapping]) -> bytes:
+    """Pack event dicts (TelemetryEvent.model_dump() shape) into one batch."""
+    index: Dict[str, int] = {}
+    node_idx = [index.setdefault(r["node"], len(index)) for r in rows]
+    if len(index) > 0xFFFF:
+        raise WireError("more than 65535 distinct nodes in one batch")
+
+    names = [n.encode("utf-8") for n in index]
+    if any(len(n) > 255 for n in names):
+        raise WireError("node names are limited to 255 bytes")
+    dictionary = b"".join(bytes((len(n),)) + n for n in names)
+    parts = [
+        _HEADER.pack(MAGIC, VERSION, len(index), len(rows)),
+        dictionary,
+        b"\0" * _pad8(_HEADER.size + len(dictionary)),
+    ]
+    for name, dtype in _COLUMNS:
+        if name == "node":
+            values = node_idx
+        elif name == "status":
+            values = [_STATUS_INDEX[r.get("status", "OK")] for r in rows]
+        else:
+            values = [r[name] for r in rows]
+        parts.append(np.asarray(values, dtype=dtype).tobytes())
+    return b"".join(parts)
+
+@dataclass
+class WireBatch:
+    nodes: List[str]  # the batch's node dictionary
+    columns: Dict[str, np.ndarray]  # read-only views into the body
+
+    def __len__(self) -> int:
+        return len(self.columns["timestamp"])
+
+    def validate(self) -> Tuple[np.ndarray, List[Tuple[int, str, str]]]:
+        """
+        Range-check every column at once. Returns a boolean mask of valid
+        events and (index, field, message) for each failed check; NaN fails.
+        """
+        ok = np.ones(len(self), dtype=bool)
+        errors: List[Tuple[int, str, str]] = []
+        checks = []
+        for field, (lo, hi) in BOUNDS.items():
+            col = self.columns[field]
+            checks.append((field, (col >= lo) & (col <= hi), f"must be between {lo} and {hi}"))
+        checks.append(("node", self.columns["node"] < len(self.nodes), "unknown node index"))
+        checks.append(("status", self.columns["status"] < len(STATUSES), "unknown status"))
+        for field, good, msg in checks:
+            if not good.all():
+                bad = np.flatnonzero(~good)
+                errors += [(int(i), field, msg) for i in bad]
+                ok &= good
+        return ok, sorted(errors)
+
+    def to_dicts(self, mask=None) -> List[dict]:
+        """Rows as TelemetryEvent-shaped dicts (optionally only where `mask`)."""
+        cols = {k: (v if mask is None else v[mask]) for k, v in self.columns.items()}
+        nodes, statuses = self.nodes, STATUSES
+        names = [nodes[i] for i in cols["node"].tolist()]
+        status = [statuses[i] for i in cols["status"].tolist()]
+        fields = [cols[m].tolist() for m in METRICS]
+        ts = cols["timestamp"].tolist()
+        return [
+            {"node": n, "latency_ms": lat, "packet_loss": loss, "throughput_mbps": thr,
+             "cpu_pct": cpu, "mem_pct": mem, "timestamp": t, "status": s}
+            for n, lat, loss, thr, cpu, mem, t, s in zip(names, *fields, ts, status)
+        ]
+
+def peek_count(buf: bytes) -> int:
+    """Number of events a batch claims to hold, from the header alone."""
+    return _read_header(buf)[2]
+
+def _read_header(buf: bytes) -> Tuple[int, int, int]:
+    if len(buf) < _HEADER.size:
+        raise WireError("truncated header")
+    magic, version, n_nodes, n_events = _HEADER.unpack_from(buf)
+    if magic != MAGIC:
+        raise WireError("not a telemetry batch (bad magic)")
+    if version != VERSION:
+        raise WireError(f"unsupported version {version}")
+    return version, n_nodes, n_events
+
+def decode(buf: bytes) -> WireBatch:
+    _, n_nodes, n_events = _read_header(buf)
+    pos = _HEADER.size
+    nodes: List[str] = []
+    try:
+        for _ in range(n_nodes):
+            n = buf[pos]
+            if pos + 1 + n > len(buf):
+                raise IndexError("name runs past the end of the body")
+            nodes.append(bytes(buf[pos + 1:pos + 1 + n]).decode("utf-8"))
+            pos += 1 + n
+    except (IndexError, UnicodeDecodeError) as e:
+        raise WireError(f"bad node dictionary: {e}") from None
+    pos += _pad8(pos)
+
+    columns: Dict[str, np.ndarray] = {}
+    for name, dtype in _COLUMNS:
+        size = np.dtype(dtype).itemsize * n_events
+        if pos + size > len(buf):
+            raise WireError(f"truncated column {name}")
+        columns[name] = np.frombuffer(buf, dtype=dtype, count=n_events, offset=pos)
+        pos += size
+    if pos != len(buf):
+        raise WireError(f"{len(buf) - pos} trailing bytes")
+    return WireBatch(nodes, columns)
@@ -0,0 +1,22 @@
+import os
+import tempfile
+
+import pytest
+
+# Point the backend at a throwaway database before backend.app.db is imported,
+# so API tests never touch the checked-in telemetry.db.
+_tmpdir = tempfile.mkdtemp(prefix="telemetry-tests-")
+os.environ.setdefault("TELEMETRY_DB_URL", f"sqlite:///{_tmpdir}/telemetry.db")
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from backend.app.db import Base, engine, init_db
+    from backend.app.main import app
+
+    init_db()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with TestClient(app) as c:
+        yield c
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from simulator.models import TelemetryEvent
+from simulator.sinks.async_http_sink import AsyncHttpSink
+
+
+class _StandIn:
+    """Local stand-in for the backend: records bodies, fails the first `fail_first` requests with 503."""
+
+    def __init__(self, fail_first: int = 0):
+        self.bodies = []
+        self.paths = []
+        self.fail_first = fail_first
+        self.lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stand_in.lock:
+                    fail = stand_in.fail_first > 0
+                    if fail:
+                        stand_in.fail_first -= 1
+                    else:
+                        stand_in.bodies.append(body)
+                        stand_in.paths.append(self.path)
+                self.send_response(503 if fail else 200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/ingest"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_in():
+    servers = []
+
+    def make(**kw):
+        servers.append(_StandIn(**kw))
+        return servers[-1]
+
+    yield make
+    for s in servers:
+        s.close()
+
+
+def _events(n):
+    return [
+        TelemetryEvent(node=f"router-{i % 5}", latency_ms=10.0, packet_loss=0.0, throughput_mbps=100.0,
+                       cpu_pct=20.0, mem_pct=30.0, timestamp=1000 + i)
+        for i in range(n)
+    ]
+
+
+def test_batches_go_to_batch_endpoint(stand_in):
+    server = stand_in()
+
+    async def go():
+        sink = AsyncHttpSink(server.url, batch_size=50, max_in_flight=4)
+        await sink.emit_many(_events(230))
+        await sink.aclose()
+        return sink.stats()
+
+    stats = asyncio.run(go())
+    assert stats["sent"] == 230 and stats["failed"] == 0
+    assert set(server.paths) == {"/ingest/batch"}
+    assert sorted(e["timestamp"] for body in server.bodies for e in body) == list(range(1000, 1230))
+    assert stats["requests"] < 230 and stats["latency_ms_p50"] is not None
+
+
+def test_retries_transient_errors(stand_in):
+    server = stand_in(fail_first=3)
+
+    async def go():
+        sink = AsyncHttpSink(server.url, max_retries=5, backoff_base_s=0.001, max_in_flight=1)
+        await sink.emit_many(_events(4))
+        await sink.aclose()
+        return sink.stats()
+
+    stats = asyncio.run(go())
+    assert stats["sent"] == 4 and stats["retries"] == 3
+    assert [b["timestamp"] for b in server.bodies] == [1000, 1001, 1002, 1003]
+
+
+def test_drop_oldest_bounds_the_buffer(stand_in):
+    server = stand_in()
+
+    async def go():
+        sink = AsyncHttpSink(server.url, batch_size=10, max_buffer=10, overflow="drop_oldest")
+        await sink.emit_many(_events(25))  # no awaits in between: the dispatcher can't drain yet
+        await sink.aclose()
+        return sink.stats()
+
+    stats = asyncio.run(go())
+    assert stats["dropped"] == 15 and stats["sent"] == 10
+    assert [e["timestamp"] for e in server.bodies[0]] == list(range(1015, 1025))
@@ -0,0 +1,39 @@
+import csv
+import io
+import json
+
+import pytest
+
+
+def _batch(n: int):
+    return [
+        {
+            "node": f"router-{i % 2}", "latency_ms": float(i), "packet_loss": 0.0, "throughput_mbps": 100.0,
+            "cpu_pct": 10.0, "mem_pct": 10.0, "timestamp": 1000 + i,
+        }
+        for i in range(n)
+    ]
+
+
+def test_export_streams_ndjson_and_csv(client):
+    client.post("/ingest/batch", json=_batch(250))
+
+    r = client.get("/export", params={"start_ts": 1010, "end_ts": 1209, "node": "router-0", "chunk_size": 100})
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert len(rows) == 100
+    assert [row["timestamp"] for row in rows] == list(range(1010, 1210, 2))
+
+    r = client.get("/export", params={"format": "csv", "gzip": "true"})
+    assert r.headers["content-encoding"] == "gzip"
+    parsed = list(csv.DictReader(io.StringIO(r.text)))
+    assert len(parsed) == 250
+    assert parsed[0]["node"] == "router-0"
+
+
+def test_export_arrow(client):
+    pa = pytest.importorskip("pyarrow")
+    client.post("/ingest/batch", json=_batch(30))
+    r = client.get("/export", params={"format": "arrow", "chunk_size": 100})
+    table = pa.ipc.open_stream(r.content).read_all()
+    assert table.num_rows == 30
+    assert table.column("timestamp").to_pylist()[:3] == [1000, 1001, 1002]
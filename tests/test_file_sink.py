@@ -0,0 +1,35 @@
+import gzip
+import json
+
+from simulator.models import TelemetryEvent
+from simulator.sinks.file_sink import FileSink
+
+
+def _events(n, start=1000):
+    return [
+        TelemetryEvent(node="router-1", latency_ms=10.0, packet_loss=0.0, throughput_mbps=100.0,
+                       cpu_pct=20.0, mem_pct=30.0, timestamp=start + i)
+        for i in range(n)
+    ]
+
+
+def test_buffers_until_threshold_and_flushes_on_close(tmp_path):
+    path = tmp_path / "out.jsonl"
+    sink = FileSink(str(path), buffer_bytes=1 << 20, flush_interval_s=3600)
+    sink.emit_many(_events(10))
+    assert not path.exists() or path.read_text() == ""
+    sink.close()
+    assert [json.loads(line)["timestamp"] for line in path.read_text().splitlines()] == list(range(1000, 1010))
+
+
+def test_rotates_by_size_with_gzip(tmp_path):
+    path = tmp_path / "out.jsonl"
+    sink = FileSink(str(path), buffer_bytes=1, rotate_bytes=2000, compression="gzip")
+    for e in _events(100):
+        sink.emit(e)
+    sink.close()
+
+    assert len(sink.rotated) >= 3
+    files = sink.rotated + [str(path) + ".gz"]
+    lines = [line for f in files for line in gzip.open(f, "rt").read().splitlines()]
+    assert [json.loads(line)["timestamp"] for line in lines] == list(range(1000, 1100))
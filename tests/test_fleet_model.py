@@ -0,0 +1,34 @@
+import numpy as np
+
+from simulator.fleet_model import FleetModel
+from simulator.incident_model import build_incidents
+from simulator.models import TelemetryEvent
+
+
+def test_fleet_is_deterministic_for_same_seed_and_time():
+    names = [f"router-{i}" for i in range(1, 501)]
+    a = FleetModel(names, seed=42)
+    b = FleetModel(names, seed=42)
+
+    for t in (123456.0, 123457.0):
+        assert a.generate(t).to_dicts() == b.generate(t).to_dicts()
+
+
+def test_fleet_events_are_valid_telemetry():
+    tick = FleetModel([f"router-{i}" for i in range(200)], seed=1).generate(1000.0)
+    for d in tick.to_dicts():
+        TelemetryEvent.model_validate(d)
+    assert len(tick.to_events()) == 200
+
+
+def test_incidents_only_hit_their_node():
+    names = ["router-1", "router-2", "router-3"]
+    incidents = build_incidents(
+        [{"type": "latency_spike", "node": "router-2", "start_after_s": 0, "duration_s": 10, "severity": 10.0}],
+        base_time=1000.0,
+    )
+    calm = FleetModel(names, seed=3).generate(1005.0)
+    spiked = FleetModel(names, seed=3).generate(1005.0, incidents)
+
+    assert np.array_equal(calm.latency_ms[[0, 2]], spiked.latency_ms[[0, 2]])
+    assert spiked.latency_ms[1] > calm.latency_ms[1] * 5
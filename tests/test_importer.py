@@ -0,0 +1,106 @@
+import gzip
+import json
+
+from sqlalchemy import create_engine, inspect, text
+
+from backend.app.importer import import_files
+
+
+def _line(node: str, ts: float, **overrides) -> str:
+    ev = {
+        "node": node, "latency_ms": 20.0, "packet_loss": 0.001, "throughput_mbps": 500.0,
+        "cpu_pct": 30.0, "mem_pct": 40.0, "timestamp": ts, "status": "OK",
+    }
+    ev.update(overrides)
+    return json.dumps(ev) + "\n"
+
+
+def _query(db_path, sql):
+    engine = create_engine(f"sqlite:///{db_path}")
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text(sql)).fetchall()
+    finally:
+        engine.dispose()
+
+
+def test_imports_gzip_with_float_timestamps_and_rejections(tmp_path):
+    lines = [_line(f"router-{i % 3}", 1767310869.0 + i) for i in range(10)]
+    lines[4] = "not json\n"
+    lines[7] = _line("router-1", 1767310876.0, packet_loss=2.0)
+    lines.insert(5, "\n")
+    path = tmp_path / "capture.jsonl.gz"
+    with gzip.open(path, "wt") as f:
+        f.writelines(lines)
+
+    db = tmp_path / "t.db"
+    [res] = import_files(str(db), [str(path)], chunk_size=3)
+    assert (res.rows, res.rejected) == (8, 2)
+    assert res.offset == len("".join(lines).encode())
+
+    assert _query(db, "SELECT count(*), min(typeof(timestamp)), min(timestamp) FROM telemetry_events") == [
+        (8, "integer", 1767310869)
+    ]
+    engine = create_engine(f"sqlite:///{db}")
+    indexes = {i["name"] for i in inspect(engine).get_indexes("telemetry_events")}
+    engine.dispose()
+    assert {"ix_node_timestamp", "ix_telemetry_events_timestamp"} <= indexes
+    assert _query(db, "SELECT sum(count) FROM telemetry_rollups WHERE resolution_s = 60") == [(8,)]
+    assert _query(db, "SELECT count(DISTINCT node) FROM telemetry_sketches") == [(3,)]
+
+
+def test_resumes_from_checkpoint(tmp_path):
+    path = tmp_path / "capture.jsonl"
+    path.write_text("".join(_line("router-1", 1000 + i) for i in range(5)))
+    db = tmp_path / "t.db"
+
+    assert import_files(str(db), [str(path)])[0].rows == 5
+    assert import_files(str(db), [str(path)])[0].rows == 0  # nothing new
+
+    with open(path, "a") as f:
+        f.write("".join(_line("router-1", 2000 + i) for i in range(3)))
+    res = import_files(str(db), [str(path)], chunk_size=2)[0]
+    assert (res.start_offset, res.rows) == (len(_line("router-1", 1000)) * 5, 3)
+    assert _query(db, "SELECT count(*), count(DISTINCT timestamp) FROM telemetry_events") == [(8, 8)]
+    assert _query(db, "SELECT rows, rejected FROM import_checkpoints") == [(8, 0)]
+
+
+
+def test_partial_last_line_waits_for_the_next_run(tmp_path):
+    path = tmp_path / "capture.jsonl"
+    done, rest = _line("router-1", 1000), _line("router-1", 1001)
+    path.write_text(done + rest[:20])  # writer still mid-line
+    db = tmp_path / "t.db"
+
+    res = import_files(str(db), [str(path)])[0]
+    assert (res.rows, res.rejected, res.offset) == (1, 0, len(done))
+
+    with open(path, "a") as f:
+        f.write(rest[20:])
+    res = import_files(str(db), [str(path)])[0]
+    assert (res.rows, res.rejected, res.offset) == (1, 0, len(done + rest))
+    assert _query(db, "SELECT count(*), count(DISTINCT timestamp) FROM telemetry_events") == [(2, 2)]
+
+def test_import_adds_to_compacted_rollups(tmp_path):
+    # router-1's hour only survives as rollups and sketches, as after a retention pass
+    db = tmp_path / "t.db"
+    old = tmp_path / "old.jsonl"
+    old.write_text("".join(_line("router-1", 3600 * 10 + i, latency_ms=float(i)) for i in range(100)))
+    import_files(str(db), [str(old)])
+    engine = create_engine(f"sqlite:///{db}")
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM telemetry_events"))
+    engine.dispose()
+    before = _query(db, "SELECT resolution_s, bucket_ts, count, latency_max FROM telemetry_rollups "
+                        "WHERE node = 'router-1' ORDER BY 1, 2")
+    sketches = _query(db, "SELECT count(*) FROM telemetry_sketches WHERE node = 'router-1'")
+
+    new = tmp_path / "new.jsonl"
+    new.write_text(_line("router-2", 3600 * 10 + 30))
+    assert import_files(str(db), [str(new)])[0].rows == 1
+
+    assert _query(db, "SELECT resolution_s, bucket_ts, count, latency_max FROM telemetry_rollups "
+                      "WHERE node = 'router-1' ORDER BY 1, 2") == before
+    assert sum(r[2] for r in before) == 300  # 100 events x 3 resolutions
+    assert _query(db, "SELECT count(*) FROM telemetry_sketches WHERE node = 'router-1'") == sketches
+    assert _query(db, "SELECT sum(count) FROM telemetry_rollups WHERE node = 'router-2'") == [(3,)]
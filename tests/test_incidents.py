@@ -12,4 +12,31 @@ def test_incident_active_only_in_window():
     assert inc.active(base + 9) is False
     assert inc.active(base + 10) is True
     assert inc.active(base + 12) is True
-    assert inc.active(base + 16) is False
\ No newline at end of file
+    assert inc.active(base + 16) is False
+
+def test_timeline_matches_full_scan():
+    import random
+
+    from simulator.incident_model import IncidentTimeline
+    from simulator.main import effect_for_node
+
+    rng = random.Random(5)
+    nodes = [f"router-{i}" for i in range(1, 21)]
+    cfg = [
+        {
+            "type": rng.choice(["latency_spike", "packet_loss_burst", "throughput_drop", "cpu_spike"]),
+            "node": rng.choice(nodes + [None]),
+            "start_after_s": rng.randint(0, 300),
+            "duration_s": rng.randint(0, 60),
+            "severity": round(rng.uniform(1, 5), 1),
+        }
+        for _ in range(200)
+    ]
+    base = 1000.0
+    incidents = build_incidents(cfg, base_time=base)
+    timeline = IncidentTimeline(incidents)
+
+    for now in [base + s * 0.5 for s in range(800)] + [base + 42]:  # ends with a jump back in time
+        timeline.advance(now)
+        for node in nodes:
+            assert timeline.effects_for(node) == effect_for_node(node, incidents, now)
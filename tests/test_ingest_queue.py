@@ -0,0 +1,104 @@
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.db import Base
+from backend.app.db_models import TelemetryEventRow
+from backend.app.ingest_queue import QueueFull, WriteBehindQueue
+from simulator.models import TelemetryEvent
+
+
+def _session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/queue.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+
+def _event(ts: int) -> TelemetryEvent:
+    return TelemetryEvent(
+        node="router-1", latency_ms=10, packet_loss=0.0, throughput_mbps=100,
+        cpu_pct=10, mem_pct=10, timestamp=ts,
+    )
+
+
+def test_queue_flushes_everything_on_stop(tmp_path):
+    SessionLocal = _session_factory(tmp_path)
+    q = WriteBehindQueue(SessionLocal, max_size=1000, batch_size=64, flush_interval_s=10.0)
+    q.start()
+    q.put_many([_event(t) for t in range(300)])
+    q.stop()
+
+    with SessionLocal() as db:
+        assert db.execute(select(func.count(TelemetryEventRow.id))).scalar() == 300
+    stats = q.stats()
+    assert stats["depth"] == 0
+    assert stats["committed"] == 300
+    assert stats["commits"] >= 300 // 64
+
+
+def test_queue_backpressure_policies(tmp_path):
+    SessionLocal = _session_factory(tmp_path)
+
+    # writer not started, so nothing drains
+    q = WriteBehindQueue(SessionLocal, max_size=3, backpressure="reject")
+    q.put_many([_event(t) for t in range(3)])
+    with pytest.raises(QueueFull):
+        q.put(_event(3))
+
+    q = WriteBehindQueue(SessionLocal, max_size=3, backpressure="drop_oldest")
+    q.put_many([_event(t) for t in range(5)])
+    assert q.stats()["dropped"] == 2
+    assert [e.timestamp for e in q._buf] == [2, 3, 4]
+
+
+def test_block_enqueues_a_batch_whole_or_not_at_all(tmp_path):
+    SessionLocal = _session_factory(tmp_path)
+
+    # writer not started: the batch doesn't fit, times out, and none of it is queued
+    q = WriteBehindQueue(SessionLocal, max_size=100, backpressure="block", block_timeout_s=0.05)
+    q.put_many([_event(t) for t in range(60)])
+    with pytest.raises(QueueFull):
+        q.put_many([_event(t) for t in range(60, 150)])
+    assert (q.stats()["depth"], q.stats()["rejected"]) == (60, 90)
+    # larger than the whole queue: rejected without waiting
+    with pytest.raises(QueueFull):
+        q.put_many([_event(t) for t in range(150)])
+    assert q.stats()["rejected"] == 240
+
+    # an idle writer (long flush interval, batch_size above the queue size) is woken to make room
+    q = WriteBehindQueue(SessionLocal, max_size=100, batch_size=500, flush_interval_s=10.0, block_timeout_s=5.0)
+    q.start()
+    q.put_many([_event(t) for t in range(60)])
+    q.put_many([_event(t) for t in range(60, 150)])
+    q.stop()
+    stats = q.stats()
+    assert (stats["enqueued"], stats["committed"], stats["rejected"]) == (150, 150, 0)
+    assert stats["max_depth"] == 90
+
+
+def test_writer_publishes_only_committed_events(tmp_path, monkeypatch):
+    from backend.app import main, pubsub
+    from backend.app.store import InMemoryTelemetryStore
+
+    published = []
+    monkeypatch.setattr(main, "store", InMemoryTelemetryStore())
+    monkeypatch.setattr(pubsub.broker, "publish_events", lambda events: published.extend(events))
+    SessionLocal = _session_factory(tmp_path)
+
+    # events dropped from a full queue never reach the cache or the streams
+    q = WriteBehindQueue(SessionLocal, max_size=3, backpressure="drop_oldest", on_commit=main._after_queue_commit)
+    q.put_many([_event(t) for t in range(5)])
+    assert published == [] and main.store.latest("router-1") == (False, None)
+    q.start()
+    q.stop()
+    assert [e.timestamp for e in published] == [2, 3, 4]
+    assert main.store.latest("router-1")[1].timestamp == 4
+
+    # nor do events whose commit failed
+    published.clear()
+    monkeypatch.setattr("backend.app.crud.insert_events", lambda db, events: 1 / 0)
+    q = WriteBehindQueue(SessionLocal, on_commit=main._after_queue_commit)
+    q.start()
+    q.put_many([_event(t) for t in range(5, 8)])
+    q.stop()
+    assert published == [] and q.stats()["failed"] == 3
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+from backend.app import metrics
+from simulator.utils.metrics import Registry
+
+
+def test_sharded_counters_sum_across_threads():
+    reg = Registry()
+    c = reg.counter("things_total", "Things", labels=("kind",))
+    h = reg.histogram("wait_seconds", "Waits", buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            c.inc(("a",))
+            h.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    text = reg.render()
+    assert 'things_total{kind="a"} 8000' in text
+    assert 'wait_seconds_bucket{le="0.1"} 0' in text
+    assert 'wait_seconds_bucket{le="1"} 8000' in text
+    assert 'wait_seconds_bucket{le="+Inf"} 8000' in text
+    assert "wait_seconds_count 8000" in text
+
+
+def test_counter_overhead_is_microseconds():
+    c = Registry().counter("hot_total", "Hot path", labels=("endpoint", "result"))
+    n = 100_000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        c.inc(("batch", "accepted"))
+    assert (time.perf_counter() - t0) / n < 5e-6
+
+
+
+def test_failed_statements_leave_no_timing_state_on_the_connection():
+    engine = create_engine("sqlite://")
+    metrics.instrument_engine(engine)
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql("SELECT * FROM missing")
+        assert conn.exec_driver_sql("SELECT 1").scalar() == 1
+        assert not conn.info.get("_stmt_t0")
+    engine.dispose()
+
+def _event(ts):
+    return {"node": "router-1", "latency_ms": 999.0, "packet_loss": 0.001, "throughput_mbps": 500.0,
+            "cpu_pct": 40.0, "mem_pct": 50.0, "timestamp": ts}
+
+
+def test_metrics_endpoint_reports_requests_ingest_db_and_alerts(client):
+    client.post("/ingest/batch", json=[_event(1000), _event(1001), {"node": "bad"}])
+    client.get("/history", params={"node": "router-1"})
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    text = r.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/history",status="200"}' in text
+    assert 'ingest_events_total{endpoint="batch",result="invalid"}' in text
+    assert 'db_statement_duration_seconds_count{kind="INSERT"}' in text
+    assert "db_commit_duration_seconds_count" in text
+    assert 'alerts_total{rule_id="latency_high",outcome="opened"}' in text
+    assert 'alerts_total{rule_id="latency_high",outcome="suppressed"}' in text
+    assert 'db_pool_connections{state="checkedout"}' in text
@@ -0,0 +1,88 @@
+import time
+
+from backend.app.response_cache import TELEMETRY, ResponseCache
+
+
+def _event(node: str, ts: int, latency: float = 20.0) -> dict:
+    return {
+        "node": node, "latency_ms": latency, "packet_loss": 0.001, "throughput_mbps": 500.0,
+        "cpu_pct": 30.0, "mem_pct": 40.0, "timestamp": ts,
+    }
+
+
+def _responses(client) -> dict:
+    return client.get("/cache/responses").json()
+
+
+def test_history_is_cached_until_its_node_is_written(client):
+    now = int(time.time())
+    client.post("/ingest/batch", json=[_event("router-1", now - 2), _event("router-2", now - 2)])
+
+    first = client.get("/history", params={"node": "router-1"})
+    etag = first.headers["etag"]
+    assert client.get("/history", params={"node": "router-1"}).content == first.content
+    assert _responses(client)["hits"] == 1
+
+    not_modified = client.get("/history", params={"node": "router-1"}, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    # a write to another node leaves the entry alone...
+    client.post("/ingest", json=_event("router-2", now - 1))
+    assert client.get("/history", params={"node": "router-1"}, headers={"If-None-Match": etag}).status_code == 304
+    # ...a write to this node invalidates it and changes the ETag
+    client.post("/ingest", json=_event("router-1", now - 1))
+    fresh = client.get("/history", params={"node": "router-1"}, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert [e["timestamp"] for e in fresh.json()] == [now - 2, now - 1]
+
+    # fleet-wide /stats depends on every node; an explicit window keeps the key fixed across a second boundary
+    window = {"start_ts": now - 60, "end_ts": now + 60}
+    stats = client.get("/stats", params=window)
+    assert {s["node"]: s["count"] for s in stats.json()} == {"router-1": 2, "router-2": 2}
+    client.post("/ingest", json=_event("router-2", now))
+    assert {s["node"]: s["count"] for s in client.get("/stats", params=window).json()}["router-2"] == 3
+    assert _responses(client)["invalidated"] == 2
+
+
+def test_alert_open_and_resolve_invalidate_alert_lists(client):
+    now = int(time.time())
+    assert client.get("/alerts").json() == []
+    assert client.get("/alerts", params={"node": "router-1"}).json() == []
+
+    client.post("/ingest", json=_event("router-1", now, latency=500.0))
+    opened = client.get("/alerts").json()
+    assert [(a["node"], a["rule_id"], a["is_active"]) for a in opened] == [("router-1", "latency_high", True)]
+    assert len(client.get("/alerts", params={"node": "router-1"}).json()) == 1
+
+    client.post(f"/alerts/{opened[0]['id']}/resolve")
+    assert client.get("/alerts", params={"node": "router-1"}).json()[0]["is_active"] is False
+    assert client.get("/alerts", params={"is_active": True}).json() == []
+
+
+def test_bounds_and_ttl():
+    cache = ResponseCache(max_entries=2, max_bytes=10_000, ttl_s=60)
+    for i in range(3):
+        cache.put(("k", i), b"x" * 100, TELEMETRY, ["router-1"], cache.versions(TELEMETRY, ["router-1"]))
+    assert cache.get(("k", 0)) is None
+    assert cache.get(("k", 2)) is not None
+    assert cache.stats()["evictions"] == 1
+
+    cache.put(("big",), b"x" * 6_000, TELEMETRY, None, cache.versions(TELEMETRY, None))
+    cache.put(("big", 2), b"x" * 6_000, TELEMETRY, None, cache.versions(TELEMETRY, None))
+    assert cache.stats()["memory_bytes"] <= 10_000
+    assert cache.get(("big",)) is None
+
+    # a put computed under versions that moved during the query is stale on arrival
+    versions = cache.versions(TELEMETRY, ["router-1"])
+    cache.bump(TELEMETRY, ["router-1"])
+    cache.put(("late",), b"[]", TELEMETRY, ["router-1"], versions)
+    assert cache.get(("late",)) is None
+
+    short = ResponseCache(ttl_s=0.01)
+    short.put(("k",), b"[]", TELEMETRY, None, short.versions(TELEMETRY, None))
+    time.sleep(0.02)
+    assert short.get(("k",)) is None
+    assert short.stats()["expired"] == 1
@@ -0,0 +1,113 @@
+import random
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import crud, rollups
+from backend.app.db import Base
+from simulator.models import TelemetryEvent
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/rollups.db")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+
+
+def _events(n: int, start: int, seed: int = 1):
+    rng = random.Random(seed)
+    return [
+        TelemetryEvent(
+            node=f"router-{rng.randint(1, 3)}",
+            latency_ms=round(rng.uniform(5, 400), 2),
+            packet_loss=round(rng.uniform(0, 0.05), 4),
+            throughput_mbps=round(rng.uniform(50, 1200), 2),
+            cpu_pct=round(rng.uniform(0, 100), 2),
+            mem_pct=round(rng.uniform(0, 100), 2),
+            timestamp=start + rng.randint(0, 3 * 3600),
+        )
+        for _ in range(n)
+    ]
+
+
+def _raw_stats(db, **kw):
+    rollups.enabled = False
+    try:
+        return crud.get_node_stats(db, **kw)
+    finally:
+        rollups.enabled = True
+
+
+def _assert_same(a, b):
+    assert [s.node for s in a] == [s.node for s in b]
+    for x, y in zip(a, b):
+        for field, value in x.model_dump().items():
+            assert getattr(y, field) == pytest.approx(value, rel=1e-12), field
+
+
+def test_plan_uses_coarsest_buckets_and_raw_edges():
+    segments, raw = rollups.plan(3590, 7500)
+    assert segments == [(3600, 3600, 7200), (300, 7200, 7500)]
+    assert raw == [(3590, 3599), (7500, 7500)]
+
+
+def test_rollup_stats_match_raw_aggregate(db):
+    base = 1_700_000_000
+    events = _events(3000, base)
+    for i in range(0, len(events), 250):
+        crud.insert_events(db, events[i:i + 250])
+    crud.insert_event(db, events[0])
+
+    for lo, hi in [(base, base + 3 * 3600), (base + 123, base + 7321), (base + 61, base + 119)]:
+        got = crud.get_node_stats(db, start_ts=lo, end_ts=hi)
+        _assert_same(_raw_stats(db, start_ts=lo, end_ts=hi), got)
+
+    got = crud.get_node_stats(db, nodes=["router-2"], start_ts=base, end_ts=base + 5000)
+    _assert_same(_raw_stats(db, nodes=["router-2"], start_ts=base, end_ts=base + 5000), got)
+
+
+def test_backfill_rebuilds_rollups(db):
+    base = 1_700_000_000
+    rollups.enabled = False
+    try:
+        crud.insert_events(db, _events(500, base, seed=2))
+    finally:
+        rollups.enabled = True
+
+    assert rollups.ensure_backfilled(db) is True
+    lo, hi = base + 17, base + 9000
+    _assert_same(_raw_stats(db, start_ts=lo, end_ts=hi), crud.get_node_stats(db, start_ts=lo, end_ts=hi))
+
+
+def test_every_metric_keeps_min_and_max(db):
+    from sqlalchemy import select
+    from backend.app.db_models import TelemetryRollupRow as R
+
+    events = _events(800, 1_700_000_000, seed=3)
+    for i in range(0, len(events), 100):
+        crud.insert_events(db, events[i:i + 100])
+    cols = [R.resolution_s, R.node, R.bucket_ts, R.count] + [
+        getattr(R, f"{p}_{m}") for p in ("latency", "packet_loss", "throughput", "cpu", "mem") for m in ("min", "max")
+    ]
+    incremental = db.execute(select(*cols).order_by(R.resolution_s, R.node, R.bucket_ts)).all()
+
+    rollups.backfill(db)
+    assert db.execute(select(*cols).order_by(R.resolution_s, R.node, R.bucket_ts)).all() == incremental
+    hourly = [e for e in events if e.node == "router-1" and e.timestamp < 1_700_002_800]
+    first = next(r for r in incremental if r.resolution_s == 3600 and r.node == "router-1")
+    assert (first.cpu_min, first.cpu_max) == (min(e.cpu_pct for e in hourly), max(e.cpu_pct for e in hourly))
+
+
+def test_init_db_adds_columns_to_an_older_table(tmp_path):
+    from sqlalchemy import inspect, text
+    from backend.app.db import init_db
+
+    engine = create_engine(f"sqlite:///{tmp_path}/old.db")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE telemetry_rollups (resolution_s INTEGER, node VARCHAR, bucket_ts INTEGER, "
+                          "count INTEGER, PRIMARY KEY (resolution_s, node, bucket_ts))"))
+    init_db(bind=engine)
+    assert {"cpu_min", "mem_max"} <= {c["name"] for c in inspect(engine).get_columns("telemetry_rollups")}
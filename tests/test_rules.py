@@ -0,0 +1,65 @@
+import json
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import crud
+from backend.app.db import Base
+from backend.app.rules import RuleConfig, RuleEngine, load_rules
+from simulator.models import TelemetryEvent
+
+
+def _session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/rules.db")
+    Base.metadata.create_all(bind=engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+    return sessionmaker(bind=engine)(), statements
+
+
+def _event(ts: int, latency: float) -> TelemetryEvent:
+    return TelemetryEvent(
+        node="router-1", latency_ms=latency, packet_loss=0.0, throughput_mbps=100,
+        cpu_pct=10, mem_pct=10, timestamp=ts,
+    )
+
+
+def test_rules_load_from_json(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"rules": [{"id": "lat", "metric": "latency_ms", "threshold": 100}]}))
+    rules = load_rules(str(path))
+    assert [r.id for r in rules] == ["lat"]
+    assert rules[0].cooldown_s == 30
+
+
+def test_engine_common_path_runs_no_queries(tmp_path):
+    db, statements = _session(tmp_path)
+    rules = [RuleConfig(id="lat", metric="latency_ms", threshold=100, cooldown_s=3600)]
+    engine = RuleEngine(rules)
+    engine.warm(db)
+
+    assert len(engine.evaluate(db, _event(1, 150))) == 1
+
+    statements.clear()
+    for ts in range(2, 50):
+        # quiet events and re-fires inside the cooldown stay in memory
+        assert engine.evaluate(db, _event(ts, 150 if ts % 2 else 20)) == []
+    assert statements == []
+
+    # a restarted engine picks the open alert back up from the table
+    restarted = RuleEngine(rules)
+    restarted.warm(db)
+    assert restarted.evaluate(db, _event(60, 150)) == []
+
+
+def test_engine_auto_resolve_closes_alert(tmp_path):
+    db, _ = _session(tmp_path)
+    engine = RuleEngine([RuleConfig(id="lat", metric="latency_ms", threshold=100, auto_resolve=True)])
+    engine.evaluate(db, _event(1, 150))
+    engine.evaluate(db, _event(2, 20))
+
+    alerts = crud.list_alerts(db, node="router-1")
+    assert len(alerts) == 1
+    assert alerts[0].is_active is False
+    assert alerts[0].resolved_ts is not None
+    assert engine.active_count() == 0
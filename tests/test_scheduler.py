@@ -0,0 +1,63 @@
+import asyncio
+
+from simulator.main import shard_config, shard_seed
+from simulator.node_model import NodeModel
+from simulator.scheduler import TickScheduler
+from simulator.settings import SimulatorConfig
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, s):
+        self.now += s
+
+
+def _ticks(scheduler, clock, n, work_s):
+    async def go():
+        out = []
+        for _ in range(n):
+            out.append(await scheduler.next_tick())
+            clock.now += work_s
+        return out
+    return asyncio.run(go())
+
+
+def test_deadlines_do_not_drift():
+    clock = FakeClock(1000.0)
+    s = TickScheduler(2.0, start=1000.0, clock=clock, sleep=clock.sleep)
+    # 0.3s of work per 0.5s tick: the rate holds and nothing is missed
+    assert _ticks(s, clock, 5, 0.3) == [1000.0, 1000.5, 1001.0, 1001.5, 1002.0]
+    assert s.missed == 0 and s.late == 0
+
+
+def test_skip_drops_overdue_ticks():
+    clock = FakeClock(1000.0)
+    s = TickScheduler(1.0, start=1000.0, clock=clock, sleep=clock.sleep)
+    assert _ticks(s, clock, 3, 2.5) == [1000.0, 1002.0, 1005.0]
+    assert s.missed == 3
+
+
+def test_catch_up_emits_every_deadline():
+    clock = FakeClock(1000.0)
+    s = TickScheduler(1.0, start=1000.0, policy="catch_up", clock=clock, sleep=clock.sleep)
+    assert _ticks(s, clock, 4, 2.5) == [1000.0, 1001.0, 1002.0, 1003.0]
+    assert s.missed == 0 and s.late == 3
+
+
+def test_node_model_stamps_tick_time():
+    import random
+    assert NodeModel("router-1", random.Random(1)).generate(1234.9, {}).timestamp == 1234
+
+
+def test_shards_partition_nodes_with_stable_seeds():
+    cfg = SimulatorConfig(seed=7, nodes=[f"router-{i}" for i in range(10)], workers=3)
+    shards = [shard_config(cfg, i, 3) for i in range(3)]
+    assert sorted(n for s in shards for n in s.nodes) == sorted(cfg.nodes)
+    assert len({s.seed for s in shards}) == 3
+    assert [s.seed for s in shards] == [shard_seed(7, i) for i in range(3)]
+    assert shard_seed(7, 0) != shard_seed(8, 0)
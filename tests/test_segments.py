@@ -0,0 +1,119 @@
+import os
+import random
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import crud, segments
+from backend.app.db import Base
+from backend.app.pagination import decode_cursor
+from simulator.models import TelemetryEvent
+
+
+def _events(n: int, seed: int = 11):
+    rng = random.Random(seed)
+    base = 1_700_000_000
+    return [
+        TelemetryEvent(
+            node=f"router-{rng.randint(1, 4)}",
+            latency_ms=round(rng.uniform(5, 400), 2),
+            packet_loss=round(rng.uniform(0, 0.05), 4),
+            throughput_mbps=round(rng.uniform(50, 1200), 2),
+            cpu_pct=round(rng.uniform(0, 100), 2),
+            mem_pct=round(rng.uniform(0, 100), 2),
+            # ~3 hourly partitions, out-of-order arrivals and duplicate timestamps
+            timestamp=base + rng.randint(0, 3 * 3600) // 7 * 7,
+            status=rng.choice(["OK", "WARN", "CRITICAL"]),
+        )
+        for _ in range(n)
+    ]
+
+
+@pytest.fixture
+def engines(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/seg.db")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    store = segments.SegmentStore(str(tmp_path / "segments"))
+
+    events = _events(3000)
+    for i in range(0, len(events), 400):
+        crud.insert_events(db, events[i:i + 400])
+        store.insert_events(events[i:i + 400])
+
+    def both(fn, *args, **kwargs):
+        segments.active_store = None
+        expected = fn(db, *args, **kwargs)
+        segments.active_store = store
+        try:
+            return expected, fn(db, *args, **kwargs)
+        finally:
+            segments.active_store = None
+
+    yield both, store
+    db.close()
+
+
+def test_segment_reads_match_sqlite(engines):
+    both, _ = engines
+    for node in (None, "router-2"):
+        expected, got = both(crud.get_latest, node)
+        assert got == expected
+    expected, got = both(crud.get_history, "router-3", limit=50)
+    assert got == expected
+
+    kw = dict(nodes=["router-1", "router-4"], start_ts=1_700_000_500, end_ts=1_700_009_000, limit=37)
+    expected, got = both(crud.query_events_page, **kw)
+    assert got == expected
+    after = decode_cursor(expected[1])
+    assert both(crud.query_events_page, after=after, **kw)[1] == both(crud.query_events_page, after=after, **kw)[0]
+    expected, got = both(crud.query_events_page, limit=25, offset=1000)
+    assert got == expected
+
+
+def test_segment_stats_match_sqlite(engines):
+    both, _ = engines
+    expected, got = both(crud.get_node_stats, start_ts=1_700_000_123, end_ts=1_700_008_765)
+    assert [s.node for s in got] == [s.node for s in expected]
+    for g, e in zip(got, expected):
+        assert g.count == e.count
+        assert (g.first_ts, g.last_ts, g.latency_min, g.latency_max) == (e.first_ts, e.last_ts, e.latency_min, e.latency_max)
+        for field in ("latency_avg", "packet_loss_avg", "throughput_avg", "cpu_avg", "mem_avg"):
+            assert getattr(g, field) == pytest.approx(getattr(e, field), rel=1e-12)
+        # exact percentiles vs. 1%-accurate sketches
+        assert g.latency_p95 == pytest.approx(e.latency_p95, rel=0.02)
+
+
+def test_segments_seal_prune_and_reopen(engines, tmp_path):
+    _, store = engines
+    assert len(store._segments) == 4
+    store.seal_all()
+    newest = max(store._segments)
+    assert store._snapshot(None, newest + 1, None)[0][0].start == newest
+    assert len(store._snapshot(None, newest + 1, None)) == 1
+
+    # late data reopens a sealed segment
+    oldest = store._segments[min(store._segments)]
+    store.insert_events([_events(1)[0].model_copy(update={"timestamp": oldest.start})])
+    assert not oldest.sealed and store._segments[newest].sealed
+
+    reopened = segments.SegmentStore(str(tmp_path / "segments"))
+    assert reopened.get_latest() == store.get_latest()
+    assert reopened._next_id == 3002
+
+
+def test_many_sealed_segments_keep_fds_bounded(tmp_path):
+    store = segments.SegmentStore(str(tmp_path / "segments"), partition_s=60, max_open_segments=8)
+    events = _events(3000)  # ~3h at 60s partitions -> ~180 segments
+    store.insert_events(events)
+    store.seal_all()
+    assert len(store._segments) > 100
+
+    before = len(os.listdir("/proc/self/fd"))
+    stats = store.get_node_stats()
+    store.get_latest()
+    after = len(os.listdir("/proc/self/fd"))
+    assert sum(s.count for s in stats) == len(events)
+    assert after - before <= 8 * len(segments.COLUMNS)
+    assert len(store._open) == 8
@@ -0,0 +1,130 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import crud, export, shards
+from backend.app.db import Base
+from backend.app.pagination import decode_cursor
+from simulator.models import TelemetryEvent
+
+NODES = [f"router-{i}" for i in range(1, 13)]
+
+
+def _events():
+    # duplicate timestamps across nodes exercise the (timestamp, id) tie-break
+    return [
+        TelemetryEvent(
+            node=NODES[i % len(NODES)], latency_ms=float(i), packet_loss=0.001, throughput_mbps=500.0,
+            cpu_pct=30.0, mem_pct=40.0, timestamp=1_700_000_000 + i // 5,
+        )
+        for i in range(300)
+    ]
+
+
+def _plain_session(path, **info):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, info=info)()
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    shards.active_store = shards.ShardedStore(str(tmp_path / "s" / "telemetry-{shard}.db"), 3)
+    try:
+        yield _plain_session(tmp_path / "main.db")
+    finally:
+        shards.active_store.close()
+        shards.active_store = None
+
+
+def _pages(db, **kw):
+    rows, after = [], None
+    while True:
+        page, cursor = crud.query_events_page(db, limit=7, after=after, **kw)
+        rows += page
+        if cursor is None:
+            return rows
+        after = decode_cursor(cursor)
+
+
+def test_fanout_reads_match_a_single_database(sharded, tmp_path):
+    # marked as a shard session, crud keeps it on the plain single-file path
+    plain = _plain_session(tmp_path / "plain.db", shard=0)
+    crud.insert_events(plain, _events())
+    assert crud.insert_events(sharded, _events()) == 300
+
+    key = lambda e: (e.timestamp, e.latency_ms)  # noqa: E731
+    paged = _pages(sharded)
+    assert len(paged) == 300
+    assert [e.timestamp for e in paged] == sorted((e.timestamp for e in paged), reverse=True)
+    assert sorted(map(key, paged)) == sorted(map(key, _pages(plain)))
+    # offset pages agree with cursor pages
+    by_offset = crud.query_events(sharded, limit=7, offset=14)
+    assert by_offset == paged[14:21]
+
+    subset = ["router-2", "router-7"]
+    assert sorted(map(key, _pages(sharded, nodes=subset))) == sorted(map(key, _pages(plain, nodes=subset)))
+
+    assert crud.get_latest(sharded).timestamp == crud.get_latest(plain).timestamp
+    assert crud.get_latest(sharded, "router-3") == crud.get_latest(plain, "router-3")
+    assert crud.get_history(sharded, "router-3", limit=10) == crud.get_history(plain, "router-3", limit=10)
+
+    stats = crud.get_node_stats(sharded, start_ts=1_700_000_000, end_ts=1_700_000_100)
+    expected = crud.get_node_stats(plain, start_ts=1_700_000_000, end_ts=1_700_000_100)
+    assert [(s.node, s.count, s.latency_avg) for s in stats] == [(s.node, s.count, s.latency_avg) for s in expected]
+
+    exported = [r for chunk in export.iter_chunks(lambda: sharded, chunk_size=50) for r in chunk]
+    assert len(exported) == 300
+    assert [r[6] for r in exported] == sorted(r[6] for r in exported)
+
+
+def test_alerts_route_by_global_id(sharded):
+    opened = [crud.create_alert(sharded, node, "latency_high", "WARN", "x") for node in NODES]
+    assert len({a.id for a in opened}) == len(NODES)
+
+    resolved = crud.resolve_alert(sharded, opened[4].id)
+    assert (resolved.id, resolved.node, resolved.is_active) == (opened[4].id, NODES[4], False)
+    [auto] = crud.resolve_active_alerts(sharded, NODES[5], "latency_high")
+    assert (auto.id, auto.is_active) == (opened[5].id, False)
+
+    active = crud.active_alerts(sharded)
+    assert {a.node for a in active} == set(NODES) - {NODES[4], NODES[5]}
+    assert crud.get_active_alert(sharded, NODES[0], "latency_high").id == opened[0].id
+
+    rows, after = [], None
+    while True:
+        page, cursor = crud.list_alerts_page(sharded, limit=5, after=after)
+        rows += page
+        if cursor is None:
+            break
+        after = decode_cursor(cursor)
+    assert sorted(a.id for a in rows) == sorted(a.id for a in opened)
+    assert crud.list_alerts(sharded, node=NODES[4])[0].is_active is False
+
+
+def test_reshard_preserves_data(sharded, tmp_path):
+    crud.insert_events(sharded, _events())
+    crud.create_alert(sharded, "router-1", "latency_high", "WARN", "x")
+    # the first minute survives only in rollups, as after a retention pass
+    for path in shards.active_store.paths:
+        engine = create_engine(f"sqlite:///{path}")
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM telemetry_events WHERE timestamp < 1700000040"))
+        engine.dispose()
+    window = dict(start_ts=1_699_999_980, end_ts=1_700_000_099)  # whole minutes, read from rollups
+    before = crud.get_node_stats(sharded, **window)
+    assert sum(s.count for s in before) == 300
+
+    counts = shards.reshard(shards.active_store.paths, str(tmp_path / "r" / "t-{shard}.db"), 2)
+    assert (counts["events"], counts["alerts"]) == (100, 1)
+    assert counts["rollups"] and counts["sketches"]
+    with pytest.raises(FileExistsError):
+        shards.reshard(shards.active_store.paths, str(tmp_path / "r" / "t-{shard}.db"), 2)
+
+    shards.active_store.close()
+    shards.active_store = shards.ShardedStore(str(tmp_path / "r" / "t-{shard}.db"), 2)
+    after = crud.get_node_stats(sharded, **window)
+    assert [(s.node, s.count, s.latency_avg, s.latency_p50) for s in after] == [
+        (s.node, s.count, s.latency_avg, s.latency_p50) for s in before
+    ]
+    assert [a.node for a in crud.active_alerts(sharded)] == ["router-1"]
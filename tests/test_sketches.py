@@ -0,0 +1,59 @@
+import random
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import crud
+from backend.app.db import Base
+from backend.app.sketches import QUANTILES, RELATIVE_ACCURACY, DDSketch
+from simulator.models import TelemetryEvent
+
+
+def _exact(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    rng = random.Random(3)
+    values = [rng.lognormvariate(3, 1.2) for _ in range(20_000)] + [0.0] * 50
+
+    left, right = DDSketch(), DDSketch()
+    for i, v in enumerate(values):
+        (left if i % 2 else right).add(v)
+    left.merge(DDSketch.from_bytes(right.to_bytes()))
+
+    assert left.count == len(values)
+    for q in QUANTILES + (0.001, 0.999):
+        exact = _exact(values, q)
+        assert left.quantile(q) == pytest.approx(exact, rel=RELATIVE_ACCURACY, abs=1e-12)
+
+
+def test_stats_percentiles_match_exact_values(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/sketch.db")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    rng = random.Random(5)
+    base = 1_700_000_000
+    events = [
+        TelemetryEvent(
+            node="router-1", latency_ms=round(rng.uniform(5, 500), 2), packet_loss=round(rng.uniform(0, 0.1), 4),
+            throughput_mbps=round(rng.uniform(10, 1000), 2), cpu_pct=50, mem_pct=50,
+            timestamp=base + rng.randint(0, 1800),
+        )
+        for _ in range(4000)
+    ]
+    for i in range(0, len(events), 500):
+        crud.insert_events(db, events[i:i + 500])
+
+    lo, hi = base + 45, base + 1500  # unaligned edges come from raw rows
+    in_range = [e for e in events if lo <= e.timestamp <= hi]
+    [stats] = crud.get_node_stats(db, start_ts=lo, end_ts=hi)
+
+    for field, prefix in (("latency_ms", "latency"), ("packet_loss", "packet_loss"), ("throughput_mbps", "throughput")):
+        values = [getattr(e, field) for e in in_range]
+        for q in QUANTILES:
+            got = getattr(stats, f"{prefix}_p{round(q * 100)}")
+            assert got == pytest.approx(_exact(values, q), rel=RELATIVE_ACCURACY, abs=1e-12)
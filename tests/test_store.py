@@ -0,0 +1,78 @@
+from backend.app.models import TelemetryEvent
+from backend.app.store import InMemoryTelemetryStore
+
+
+def _event(node: str, ts: int) -> TelemetryEvent:
+    return TelemetryEvent(
+        node=node, latency_ms=float(ts), packet_loss=0.0, throughput_mbps=100,
+        cpu_pct=10, mem_pct=10, timestamp=ts,
+    )
+
+
+def test_ring_buffer_serves_short_history_and_misses_deep_history():
+    store = InMemoryTelemetryStore(max_events_per_node=4)
+    store.add_many([_event("r1", ts) for ts in range(10)])
+
+    assert [e.timestamp for e in store.history("r1", limit=3)] == [7, 8, 9]
+    # only the newest 4 are cached and older rows may exist in the DB
+    assert store.history("r1", limit=5) is None
+    assert store.latest("r1") == (True, _event("r1", 9))
+
+    # a node warmed from the DB with fewer rows than the capacity is complete
+    store.warm_node("r2", [_event("r2", 1), _event("r2", 2)])
+    assert [e.timestamp for e in store.history("r2", limit=100)] == [1, 2]
+
+    stats = store.stats()
+    assert stats["hits"] == 3 and stats["misses"] == 1
+
+
+def test_fleet_latest_needs_warmup_and_nodes_are_lru_bounded():
+    store = InMemoryTelemetryStore(max_events_per_node=4, max_nodes=2)
+    store.add(_event("r1", 5))
+    assert store.latest() == (False, None)
+
+    store.warm_fleet_latest(_event("r0", 7))
+    store.add(_event("r2", 6))
+    store.add(_event("r3", 6))
+    assert store.latest()[1].node == "r0"
+    assert store.stats()["evictions"] == 1
+    assert store.latest("r1") == (False, None)
+
+
+def test_out_of_order_event_drops_node_ring():
+    store = InMemoryTelemetryStore(max_events_per_node=4)
+    store.add_many([_event("r1", 10), _event("r1", 5)])
+    assert store.history("r1", limit=1) is None
+
+
+def test_latest_and_history_endpoints_use_cache(client):
+    from backend.app import main
+
+    for ts in (1, 2, 3):
+        client.post("/ingest", json=_event("router-9", ts).model_dump())
+    main.store.clear()
+
+    assert client.get("/latest", params={"node": "router-9"}).json()["timestamp"] == 3
+    hits_before = main.store.hits
+    assert [e["timestamp"] for e in client.get("/history", params={"node": "router-9", "limit": 2}).json()] == [2, 3]
+    assert main.store.hits == hits_before + 1
+
+
+def test_warm_merges_into_a_ring_created_by_ingest():
+    store = InMemoryTelemetryStore(max_events_per_node=8)
+    # ingest since startup; the DB also holds older rows and one event (7) whose write-through is still pending
+    store.add_many([_event("r1", 5), _event("r1", 6)])
+    assert store.history("r1", limit=4) is None
+    store.warm_node("r1", [_event("r1", ts) for ts in (2, 3, 4, 5)] + [_event("r1", 6), _event("r1", 7)])
+    assert [e.timestamp for e in store.history("r1", limit=8)] == [2, 3, 4, 5, 6, 7]  # complete now
+    store.add(_event("r1", 7))  # the late write-through is not appended twice
+    store.add(_event("r1", 8))
+    assert [e.timestamp for e in store.history("r1", limit=8)] == [2, 3, 4, 5, 6, 7, 8]
+
+    # events written through before their commit survive a warm from an older read
+    store.add(_event("r1", 9))
+    store.warm_node("r1", [_event("r1", ts) for ts in range(2, 9)])
+    assert [e.timestamp for e in store.history("r1", limit=8)] == [2, 3, 4, 5, 6, 7, 8, 9]
+    store.add(_event("r1", 10))
+    assert store.history("r1", limit=8)[-1].timestamp == 10
+    assert store.history("r1", limit=9) is None  # the oldest row was overwritten
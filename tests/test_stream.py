@@ -0,0 +1,125 @@
+import asyncio
+import json
+import time
+
+from backend.app import pubsub
+from simulator.models import TelemetryEvent
+
+
+def _event(node="router-1", ts=None, latency_ms=20.0):
+    return {
+        "node": node,
+        "latency_ms": latency_ms,
+        "packet_loss": 0.001,
+        "throughput_mbps": 500.0,
+        "cpu_pct": 30.0,
+        "mem_pct": 40.0,
+        "timestamp": ts or int(time.time()),
+    }
+
+
+def test_ws_receives_filtered_telemetry_and_alerts(client):
+    with client.websocket_connect("/stream/ws?node=router-2") as ws:
+        client.post("/ingest", json=_event("router-1"))
+        client.post("/ingest/batch", json=[_event("router-2", latency_ms=21.0), _event("router-3")])
+        # built-in latency rule opens an alert for router-2
+        client.post("/ingest", json=_event("router-2", latency_ms=900.0))
+
+        seen = []
+        while len(seen) < 3:
+            seen += json.loads(ws.receive_text())
+
+    assert [m["topic"] for m in seen] == ["telemetry", "telemetry", "alerts"]
+    assert {m["data"]["node"] for m in seen} == {"router-2"}
+    assert seen[0]["data"]["latency_ms"] == 21.0
+    assert seen[2]["data"]["event"] == "opened"
+    assert seen[2]["data"]["rule_id"] == "latency_high"
+
+
+def test_ws_alert_resolve_is_pushed(client):
+    client.post("/ingest", json=_event("router-1", latency_ms=900.0))
+    alert_id = client.get("/alerts", params={"is_active": True}).json()[0]["id"]
+
+    with client.websocket_connect("/stream/ws?topic=alerts") as ws:
+        client.post(f"/alerts/{alert_id}/resolve")
+        (msg,) = json.loads(ws.receive_text())
+
+    assert msg["topic"] == "alerts"
+    assert msg["data"]["event"] == "resolved"
+    assert msg["data"]["id"] == alert_id
+    assert msg["data"]["is_active"] is False
+
+
+def test_stream_rejects_unknown_topic(client):
+    assert client.get("/stream/sse", params={"topic": "nope"}).status_code == 422
+    assert client.get("/stream/stats").json()["subscribers"] == 0
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _tel(node, ts):
+    return TelemetryEvent.model_validate(_event(node, ts))
+
+
+def test_broker_disconnects_slow_consumer():
+    async def scenario():
+        broker = pubsub.Broker(max_buffer=5)
+        sub = broker.subscribe()
+        broker.publish_events([_tel("r1", 1_700_000_000 + i) for i in range(6)])
+        try:
+            await sub.get(timeout_s=1.0)
+        except pubsub.SlowConsumer:
+            pass
+        else:
+            raise AssertionError("expected SlowConsumer")
+        broker.unsubscribe(sub)
+        return broker.stats()
+
+    stats = _run(scenario())
+    assert stats["subscribers"] == 0
+    assert stats["disconnected_slow"] == 1
+
+
+def test_broker_coalesces_latest_per_node():
+    async def scenario():
+        broker = pubsub.Broker()
+        sub = broker.subscribe(topics=["telemetry"], coalesce_s=0.05)
+        other = broker.subscribe(nodes=["r2"])
+        broker.publish_events([_tel("r1", 1), _tel("r2", 1)])
+        first = await sub.get(timeout_s=1.0)
+        t0 = time.monotonic()
+        broker.publish_events([_tel("r1", 2), _tel("r1", 3), _tel("r2", 2)])
+        second = await sub.get(timeout_s=1.0)
+        waited = time.monotonic() - t0
+        return first, second, waited, await other.get(timeout_s=1.0)
+
+    first, second, waited, other = _run(scenario())
+    assert len(first) == 2
+    # one update per node per interval, and it is the newest one
+    assert sorted((m[1], json.loads(m[2])["timestamp"]) for m in second) == [("r1", 3), ("r2", 2)]
+    assert waited >= 0.04
+    # uncoalesced, node-filtered subscriber sees every r2 event
+    assert [json.loads(m[2])["timestamp"] for m in other] == [1, 2]
+
+
+def test_ws_auto_resolve_sends_the_full_alert(client, monkeypatch):
+    from backend.app import main
+    from backend.app.rules import RuleConfig, RuleEngine
+
+    engine = RuleEngine([RuleConfig(id="lat", metric="latency_ms", threshold=100, auto_resolve=True)])
+    monkeypatch.setattr(main, "rule_engine", engine)
+    with client.websocket_connect("/stream/ws?topic=alerts") as ws:
+        client.post("/ingest", json=_event("router-1", latency_ms=150.0))
+        client.post("/ingest", json=_event("router-1", latency_ms=20.0))
+        seen = []
+        while len(seen) < 2:
+            seen += json.loads(ws.receive_text())
+
+    opened, resolved = (m["data"] for m in seen)
+    assert (opened["event"], resolved["event"]) == ("opened", "resolved")
+    # same AlertOut shape as an API resolve, so clients can match on id
+    assert resolved.keys() == opened.keys()
+    assert resolved["id"] == opened["id"]
+    assert (resolved["is_active"], resolved["resolved_ts"] is not None) == (False, True)